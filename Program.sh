@@ -3,8 +3,11 @@
 # Start pigpiod as a background process with sudo
 sudo pigpiod
 
-# Wait for pigpiod to initialize (you can adjust the sleep time as needed)
-sleep 1
+# Wait for pigpiod to initialize (poll the daemon instead of a fixed sleep, give up after 2 seconds)
+for attempt in $(seq 1 40); do
+    pigs t > /dev/null 2>&1 && break
+    sleep 0.05
+done
 
 # Define the duration for attempting to mount (in seconds)
 mount_timeout=10
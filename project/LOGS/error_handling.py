@@ -4,6 +4,10 @@ from PyQt5 import QtWidgets, uic, QtGui
 from PyQt5.QtCore import Qt
 from buzzer import Buzzer
 
+# Templates are resolved relative to this file, not to the current working directory
+ui_templates_dir = os.path.join(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))), "ui_templates")
+
 
 class ErrorDialog(QtWidgets.QDialog):
 
@@ -13,8 +17,6 @@ class ErrorDialog(QtWidgets.QDialog):
         self.buzzer = buzzer
         self.error_title = error_title
         # Load template
-        current_dir = os.getcwd()
-        ui_templates_dir = os.path.join(current_dir, "project/ui_templates")
         uic.loadUi(os.path.join(
             ui_templates_dir, "error_dialog.ui"), self)
         self: QtWidgets.QDialog
@@ -35,28 +37,43 @@ class ErrorDialog(QtWidgets.QDialog):
         font = QtGui.QFont(QtGui.QFont("Tahoma", 36))
         font.setBold(True)
         self.errorTitle_label.setFont(font)
-        self.errorTitle_label.setText(f"!! {error_title} !!")
         self.errorTitle_label.setWordWrap(True)
 
         # Configure errorText_label
         self.errorText_label: QtWidgets.QLabel
-        self.errorText_label.setText(eror_desc)
         self.errorText_label.setWordWrap(True)
 
         # Configure confirm_pushButton
         self.confirm_pushButton: QtWidgets.QPushButton
         self.confirm_pushButton.clicked.connect(self.__confirm_error)
+        self.__confirm_text = self.confirm_pushButton.text()
 
         # Configure retry_pushButton
         self.retry_pushButton: QtWidgets.QPushButton
+        self.retry_pushButton.clicked.connect(self.__retry)
+
+        # Dialog may be pre-built by `DialogCache` without an error to show
+        if error_title is not None:
+            self.set_error(error_title, eror_desc, printer_error)
+
+    def set_error(self, error_title: str, eror_desc: str, printer_error: bool = False):
+        """
+        Fill the dialog with a new error and activate the buzzer signal.
+        Allows the same dialog object to be reused for subsequent errors.
+        """
+        self.error_title = error_title
+        self.errorTitle_label.setText(f"!! {error_title} !!")
+        self.errorText_label.setText(eror_desc)
+
         if not printer_error:
+            self.confirm_pushButton.setText(self.__confirm_text)
             self.retry_pushButton.hide()
         else:
             self.confirm_pushButton.setText("Kontynuuj bez etykiety")
-            self.retry_pushButton.clicked.connect(self.__retry)
+            self.retry_pushButton.show()
 
         # Activate buzzer signal
-        buzzer.signal('error')
+        self.buzzer.signal('error')
 
     # Handle clicked event for confirm_pushButton
     def __confirm_error(self):
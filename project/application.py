@@ -0,0 +1,246 @@
+import sys
+import os
+# Profiler goes first, so the timeline covers the imports below
+from startup_profiler import profiler
+
+with profiler.phase("imports"):
+    from PyQt5.QtWidgets import QApplication, QMainWindow, QDialog, QMenuBar, QTabWidget, QMenu, QAction, QTabWidget
+    from PyQt5 import uic
+    from PyQt5.QtCore import Qt, QTimer, QObject, QEvent
+    import pigpio
+    from loguru import logger
+    from dotenv import load_dotenv
+
+    from encoder import Encoder
+    from machine_control import MachineControl
+    from buzzer import Buzzer
+    from tab_manual_steering import ManualSteeringTab
+    from tab_manual_insert import ManualInsertingTab
+    from tab_statistics import StatisticsTab
+    from orders.tab_orders import OrdersTab
+    from settings.settings import SettingsDialog
+    from dialog_cache import DialogCache
+    from executors import executors
+    from db.service import db_service
+    from db.replication import replicator, ReplicationLabel
+    from winding_in_progress_operations.checkpoint import journal
+    from db.temp_scanner import temp_scanner
+    from db.read_csv import parser_pool
+    from performance_monitor import PerformanceMonitor, PerformanceOverlay
+
+# Load .env variables
+load_dotenv()
+# Set Current mail file
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Set path to templates
+ui_templates_dir = os.path.join(current_dir, "ui_templates")
+# Set Logger
+logger.add(os.path.join(current_dir, "LOGS/RopeCutter.log"), rotation='1 day')
+
+
+class FirstPaintWatcher(QObject):
+    """
+    Calls `callback` once, on the first paint of any widget belonging to `window`
+    """
+
+    def __init__(self, window: QMainWindow, callback):
+        super().__init__()
+        self.__window = window
+        self.__callback = callback
+        QApplication.instance().installEventFilter(self)
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Paint and obj.isWidgetType() and obj.window() is self.__window:
+            QApplication.instance().removeEventFilter(self)
+            self.__callback()
+        return super().eventFilter(obj, event)
+
+
+class UI(QMainWindow):
+    def __init__(self):
+        super(UI, self).__init__()
+        
+        # Make sure that Taskbar is hidden
+        self.setWindowFlags(self.windowFlags() | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+        # Make sure that curosor is hidden
+        self.setCursor(Qt.BlankCursor)
+
+        # Create pigpio instance
+        with profiler.phase("pigpio connect"):
+            self.pi: pigpio.pi = pigpio.pi()
+        with profiler.phase("hardware init"):
+            # Create buzzer instance
+            self.buzzer = Buzzer(self.pi)
+            # Create machine_control instance
+            self.machine_control = MachineControl(self.pi)
+            # Create encoder instance
+            self.encoder = Encoder(pi=self.pi)
+
+        # Create cache of frequently used dialogs (built after the window is shown)
+        self.dialog_cache = DialogCache(
+            self,
+            ui_templates_dir,
+            self.machine_control,
+            self.encoder,
+            self.buzzer
+        )
+
+        # Load main_window.ui file
+        with profiler.phase("main window template"):
+            uic.loadUi(os.path.join(ui_templates_dir, "main_window.ui"), self)
+
+        self.tabWidget: QTabWidget
+        self.tabWidget.removeTab(0)
+        # Add module with orders
+        with profiler.phase("tab: orders"):
+            self.orders_tab = OrdersTab(
+                self,
+                ui_templates_dir,
+                self.machine_control,
+                self.encoder,
+                self.buzzer
+            )
+
+        # Define events
+        # menuBar -> menuHelp -> actionInformation
+        self.actionInformation: QAction
+        self.actionInformation.triggered.connect(self.openInfo)
+        # menuBar -> menuHelp -> actionPerformance
+        self.actionPerformance: QAction
+        self.actionPerformance.toggled.connect(self.togglePerformanceOverlay)
+        # menuBar -> menuHelp -> actionReloadOrders
+        self.actionReloadOrders: QAction
+        self.actionReloadOrders.triggered.connect(self.orders_tab.reloadOrders)
+        # menuBar -> settings
+        self.menuSettings: QMenu
+        self.menuSettings.triggered.connect(self.openSettings)
+
+        # Measure event loop lag of the GUI thread, overlay is built on first use
+        self.performance_monitor = PerformanceMonitor(self.encoder)
+        self.__performance_overlay: PerformanceOverlay = None
+
+        # State of the copy of the database on the shared directory
+        self.statusBar.addPermanentWidget(ReplicationLabel(replicator))
+
+        # Remaining tabs and cached dialogs are built after the first paint
+        self.__first_paint_watcher = FirstPaintWatcher(
+            self, self.__after_first_paint)
+
+        # Show the app
+        self.showFullScreen()
+        logger.success("Apllication mounted")
+
+    def __after_first_paint(self):
+        profiler.mark("first paint")
+        # Build remaining tabs once the event loop is running
+        QTimer.singleShot(0, self.__build_deferred_tabs)
+
+    def __build_deferred_tabs(self):
+        # Add module with mnual steering
+        with profiler.phase("tab: manual steering"):
+            ManualSteeringTab(
+                self,
+                ui_templates_dir,
+                self.machine_control,
+                self.encoder,
+                self.pi,
+                self.buzzer
+            )
+        # Add module with manual insert
+        with profiler.phase("tab: manual insert"):
+            ManualInsertingTab(
+                self,
+                ui_templates_dir,
+                self.machine_control,
+                self.encoder,
+                self.buzzer
+            )
+        # Add module with production statistics
+        with profiler.phase("tab: statistics"):
+            StatisticsTab(self, ui_templates_dir)
+        profiler.finish()
+        # Build cached dialogs off the critical path
+        QTimer.singleShot(0, self.dialog_cache.warm_up)
+        # Order interrupted by a crash or a power loss is offered to be resumed
+        QTimer.singleShot(0, self.orders_tab.offerResume)
+        # Worker processes parsing the drops of `.csv` files are started off the critical path
+        QTimer.singleShot(0, parser_pool.start)
+
+    # Event handler functions
+
+    def openSettings(self):
+        """
+        Open `settingsDialog`
+        """
+        settings_dialog = SettingsDialog(self, ui_templates_dir)
+        settings_dialog.exec_()
+
+    def openInfo(self):
+        """
+        Open `infoDialog`
+        """
+        infoDialog = QDialog()
+        infoDialog = uic.loadUi(os.path.join(
+            ui_templates_dir, "info.ui"), infoDialog)
+        infoDialog.exec_()
+
+    def togglePerformanceOverlay(self, visible: bool):
+        """
+        Show or hide the overlay with the event loop lag and the rates of signals and encoder edges
+        """
+        if self.__performance_overlay is None:
+            self.__performance_overlay = PerformanceOverlay(
+                self.performance_monitor)
+        self.__performance_overlay.setVisible(visible)
+
+    def enableMainWindow(self, currentTab: int, state: bool):
+        self.tabWidget: QTabWidget
+        for tab in range(self.tabWidget.count()):
+            if state:
+                self.tabWidget.setTabEnabled(tab, state)
+            else:
+                enabled = tab == currentTab
+                self.tabWidget.setTabEnabled(tab, enabled)
+
+        self.menuBar: QMenuBar
+        self.menuBar.setEnabled(state)
+
+    def __del__(self):
+        self.pi.stop()
+
+
+@logger.catch
+def main():
+    # To run this script via SSH first use command: `export DISPLAY=:0`
+    # Do not forget to run `sudo pigpiod` and `sudo mount /home/admin/Dokumenty/project/windows_SHARED`
+
+    # Use `--profile-startup` to print the startup phases breakdown
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        profiler.dump = True
+
+    with profiler.phase("QApplication init"):
+        app = QApplication(sys.argv)
+    # Local database is replicated to the shared directory in the background
+    with profiler.phase("DB replication"):
+        replicator.start()
+        db_service.listeners.append(replicator.notify)
+    ui = UI()
+    # New orders in the TEMP directory are ingested in the background
+    temp_scanner.start()
+    app.exec_()
+    temp_scanner.stop()
+    logger.info(f"TEMP scanner: {temp_scanner.format_stats()}")
+    parser_pool.stop()
+    logger.info(f"Executors: {executors.format_stats()}")
+    logger.info(f"Performance: {ui.performance_monitor.format_stats()}")
+    # Queued database requests are executed before the exit
+    db_service.stop()
+    logger.info(f"DB service: {db_service.format_stats()}")
+    # Last changes are copied to the shared directory before the exit
+    replicator.stop()
+    logger.info(f"DB replication: {replicator.format_stats()}")
+    # Queued checkpoints of the winding process are synced before the exit
+    journal.stop()
+    logger.info(f"Winding journal: {journal.format_stats()}")
+
@@ -0,0 +1,87 @@
+"""
+Benchmark of reading the CSV drop (`CSVReader.read_orders`): previous reading (`chardet` on the whole file,
+then the file is read again) vs. detection on the first `ENCODING_SAMPLE_SIZE` bytes and one decoding pass,
+for `cp1250` and `UTF-8` files. `late` files have only ASCII customers in the sample and Polish characters
+after it: both files are read as UTF-8 first and read again when it fails, the first one with `cp1250`,
+the next file of the same name pattern with the encoding cached for the pattern.
+
+`chardet` on the whole file takes minutes for large files, the previous reading is measured
+up to `LEGACY_MAX_ROWS` rows.
+
+Run from the `project` directory: `python -m benchmarks.csv_encoding [sizes...]`, e.g. `python -m benchmarks.csv_encoding 1000 100000`
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+from db import read_csv
+from db.read_csv import CSVReader, Row
+from benchmarks.ingest import write_csv
+from benchmarks.synthetic import order_rows
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LEGACY_MAX_ROWS = 100_000
+
+
+def legacy_read(file: str) -> list[Row]:
+    """
+    Copy of the previous reading of one file by `CSVReader.read_orders`
+    """
+    import chardet
+    with open(file, 'rb') as f:
+        encoding = chardet.detect(f.read())['encoding']
+    with open(file, 'r', encoding=encoding) as f:
+        return [Row(*row) for row in csv.reader(f, delimiter=';')]
+
+
+def reader_read(temp_dir: str) -> tuple[float, list[dict]]:
+    reader = CSVReader()
+    reader.path_to_temp_dir = temp_dir
+    start = time.perf_counter()
+    reader.read_orders()
+    return time.perf_counter() - start, reader.timings
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    print(f"{'rows':>9}{'file':>8}{'MB':>7}{'previous [s]':>14}{'sampled [s]':>13}{'detect [ms]':>13}"
+          f"  encoding (source)")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            rows = order_rows(size, done_ratio=0.0)
+            ascii_rows = [row for row in rows if row["customer_name"].isascii()]
+            polish_rows = [row for row in rows if not row["customer_name"].isascii()]
+            cases = (
+                ("cp1250", rows, "cp1250"),
+                ("utf-8", rows, "utf-8"),
+                ("late", ascii_rows + polish_rows, "cp1250"),
+                ("late 2", ascii_rows + polish_rows, "cp1250"),
+            )
+            read_csv.encoding_cache.clear()
+            for name, case_rows, encoding in cases:
+                temp_dir = os.path.join(tmp_dir, f"TEMP_{size}_{name.replace(' ', '_')}") + os.sep
+                os.makedirs(temp_dir)
+                path = os.path.join(temp_dir, f"{size}{len(name)}.csv")
+                write_csv(path, case_rows, encoding)
+                megabytes = os.path.getsize(path) / 1_000_000
+
+                legacy_text = "-"
+                if size <= LEGACY_MAX_ROWS:
+                    start = time.perf_counter()
+                    try:
+                        legacy_read(path)
+                        legacy_text = f"{time.perf_counter() - start:.2f}"
+                    except UnicodeDecodeError:
+                        # `chardet` on the whole file reported an encoding which does not decode it
+                        legacy_text = "error"
+                sampled, timings = reader_read(temp_dir)
+                timing = timings[0]
+                print(f"{size:>9}{name:>8}{megabytes:>7.1f}{legacy_text:>14}{sampled:>13.2f}"
+                      f"{timing['detect_ms']:>13.2f}  {timing['encoding']} ({timing['source']})")
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark of the ingestion of several CSV drops at once: previous `OrdersDB.ingest_csv_files` (files read one by one,
+`insert_row`, then `archive_read_files`) vs. `OrdersDB.ingest_csv_files` with the files read in this process
+(`parser_pool` not started) and by the started `parser_pool`, orders and the manifest of the files written
+in one transaction and the files archived after the commit.
+
+Each case is measured on a new database with the files written again, throughput is in rows per second.
+The pool gains only with more CPUs than one (`os.cpu_count()` is printed), on one CPU it shows the cost of the workers.
+
+Run from the `project` directory: `python -m benchmarks.csv_ingest [rows per file] [processes]`,
+e.g. `python -m benchmarks.csv_ingest 2000 4`
+"""
+import os
+import sys
+import tempfile
+import time
+from loguru import logger
+
+import db.db
+from db.db import OrdersDB
+from db import read_csv
+from db.read_csv import CSVReader, ParserPool
+from benchmarks.ingest import write_csv
+from benchmarks.synthetic import order_rows, create_db
+
+FILES = [1, 10, 100]
+ROWS_PER_FILE = 2_000
+
+
+def legacy_ingest(orders_db: OrdersDB, files: list[str]):
+    """
+    Copy of the previous `OrdersDB.ingest_csv_files`
+    """
+    reader = db.db.CSVReader()
+    data = reader.read_orders(files, parallel=False)
+    orders_db.insert_row(data)
+    reader.archive_read_files()
+
+
+def main():
+    rows_per_file = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS_PER_FILE
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    print(f"{os.cpu_count()} CPUs, {processes} worker processes, {rows_per_file} rows per file")
+    print(f"{'files':>6}{'rows':>9}{'previous [s]':>14}{'1 process [s]':>15}{'pool [s]':>10}"
+          f"{'previous [rows/s]':>19}{'pool [rows/s]':>15}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        temp_dir = os.path.join(tmp_dir, "TEMP") + os.sep
+        archive_dir = os.path.join(tmp_dir, "ARCHIVE") + os.sep
+        os.makedirs(temp_dir)
+        os.makedirs(archive_dir)
+
+        class Reader(CSVReader):
+            def __init__(self):
+                super().__init__()
+                self.path_to_temp_dir = temp_dir
+                self.path_to_archive_dir = archive_dir
+
+        # `OrdersDB` reads and archives the files of the temporary directories
+        db.db.CSVReader = Reader
+
+        for count in FILES:
+            rows = order_rows(count * rows_per_file, done_ratio=0.0)
+            times = []
+            for case in ("previous", "1 process", "pool"):
+                files = []
+                for i in range(count):
+                    files.append(os.path.join(temp_dir, f"{20000 + i}.csv"))
+                    write_csv(files[-1], rows[i * rows_per_file:(i + 1) * rows_per_file])
+                path = os.path.join(tmp_dir, f"orders_{count}_{case}.db")
+                create_db(path, [])
+                orders_db = OrdersDB(path)
+                # `CSVReader` reads the files by the pool only when it is started
+                read_csv.parser_pool = ParserPool(processes)
+                if case == "pool":
+                    read_csv.parser_pool.start(wait=True)
+
+                start = time.perf_counter()
+                if case == "previous":
+                    legacy_ingest(orders_db, files)
+                else:
+                    orders_db.ingest_csv_files(files)
+                times.append(time.perf_counter() - start)
+                read_csv.parser_pool.stop()
+
+                assert not os.listdir(temp_dir)
+                assert orders_db.connection.execute("SELECT COUNT(*) FROM orders;").fetchone()[0] == len(rows)
+                orders_db.connection.close()
+                for name in os.listdir(archive_dir):
+                    os.remove(os.path.join(archive_dir, name))
+
+            previous, sequential, pool = times
+            print(f"{count:>6}{len(rows):>9}{previous:>14.3f}{sequential:>15.3f}{pool:>10.3f}"
+                  f"{len(rows) / previous:>19.0f}{len(rows) / pool:>15.0f}")
+
+
+if __name__ == "__main__":
+    # Each file is written to the log, only the results are printed
+    logger.remove()
+    main()
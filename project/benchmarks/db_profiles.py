@@ -0,0 +1,68 @@
+"""
+Benchmark of the SQLite connection profiles (`db/tuning.py`): ingest of orders (`insert_row`),
+status updates committed one by one (`set_done_status`) and full reads (`get_all_rows`).
+
+All profiles are measured on a local temporary directory; `network` shows the cost of its journal settings only,
+not the latency of the CIFS mount.
+
+Run from the `project` directory: `python -m benchmarks.db_profiles [sizes...]`, e.g. `python -m benchmarks.db_profiles 1000 100000`
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from db.db import OrdersDB
+from db.read_csv import Row
+from db.tuning import PROFILES
+from benchmarks.synthetic import order_rows, create_db
+
+SIZES = [1_000, 100_000, 1_000_000]
+UPDATES = 1_000
+
+
+def csv_rows(rows: list[dict]) -> list[Row]:
+    return [Row(row["order_id"], "", str(row["quantity"]), str(row["diameter"]),
+                str(row["length"] / 1000), row["customer_name"]) for row in rows]
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    print(f"{'orders':>9}{'profile':>9}{'ingest [s]':>12}{'[us/row]':>10}"
+          f"{'status update [ms]':>20}{'full read [ms]':>16}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            rows = order_rows(size, done_ratio=0.0)
+            to_insert = csv_rows(rows)
+            for name, profile in PROFILES.items():
+                path = os.path.join(tmp_dir, f"orders_{size}_{name}.db")
+                create_db(path, [])
+                db = OrdersDB(path, profile)
+
+                start = time.perf_counter()
+                db.insert_row(to_insert)
+                ingest = time.perf_counter() - start
+
+                count = min(UPDATES, size)
+                start = time.perf_counter()
+                for row in rows[:count]:
+                    db.set_done_status(row["order_id"], 100, "2024-01-01 00:00")
+                update = (time.perf_counter() - start) * 1000 / count
+
+                reads = []
+                for _ in range(3 if size < 1_000_000 else 1):
+                    start = time.perf_counter()
+                    result = db.get_all_rows()
+                    reads.append((time.perf_counter() - start) * 1000)
+                assert len(result) == size
+                db.connection.close()
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+                print(f"{size:>9}{name:>9}{ingest:>12.2f}{ingest * 1e6 / size:>10.1f}"
+                      f"{update:>20.3f}{statistics.median(reads):>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
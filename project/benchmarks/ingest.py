@@ -0,0 +1,99 @@
+"""
+Benchmark of the ingestion of a CSV drop: previous `insert_row` (`INSERT` of each row, `UPDATE` after
+`IntegrityError`) vs. `OrdersDB.insert_row` (`INSERT ... ON CONFLICT DO UPDATE` by one `executemany` in one transaction).
+Each path is measured for a new drop (all rows inserted), the same drop sent again (all rows updated)
+and a drop in which half of the orders are new.
+
+Run from the `project` directory: `python -m benchmarks.ingest [rows]`, e.g. `python -m benchmarks.ingest 50000`
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from db.db import OrdersDB
+from db.read_csv import CSVReader, Row
+from benchmarks.synthetic import order_rows, create_db
+
+ROWS = 50_000
+
+
+def legacy_insert_row(connection: sqlite3.Connection, data: list[Row]):
+    """
+    Copy of the previous `OrdersDB.insert_row`
+    """
+    cursor = connection.cursor()
+    for row_data in data:
+        try:
+            cursor.execute("""
+                INSERT INTO orders (order_id, customer_name, quantity, length, diameter) VALUES (?, ?, ?, ?, ?);
+                """, (row_data.order_id, row_data.customer_name, row_data.quantity, row_data.length, row_data.diameter))
+        except sqlite3.IntegrityError as e:
+            if e.__str__() == "UNIQUE constraint failed: orders.order_id":
+                cursor.execute("""
+                    UPDATE orders SET customer_name=?, quantity=?, length=?, diameter=?,
+                        status='TODO', done_date=null, production_time=null
+                    WHERE order_id=?
+                    """, (row_data.customer_name, row_data.quantity, row_data.length, row_data.diameter,
+                          row_data.order_id))
+    cursor.close()
+    connection.commit()
+
+
+def write_csv(path: str, rows: list[dict], encoding: str = "cp1250"):
+    """
+    Write orders as the CSV drop of the office system (`;` separated, decimal commas, `cp1250`)
+    """
+    with open(path, "w", encoding=encoding, newline="") as f:
+        for row in rows:
+            order_num, position = row["order_id"].rsplit("/", 1)
+            diameter = f"{row['diameter']}".replace(".", ",")
+            length = f"{row['length'] / 1000}".replace(".", ",")
+            f.write(f"{order_num};{position};{row['quantity']};{diameter};{length};{row['customer_name']}\r\n")
+
+
+def read_csv(tmp_dir: str, rows: list[dict]) -> list[Row]:
+    temp_dir = os.path.join(tmp_dir, "TEMP") + os.sep
+    os.makedirs(temp_dir, exist_ok=True)
+    write_csv(os.path.join(temp_dir, "orders.csv"), rows)
+    reader = CSVReader()
+    reader.path_to_temp_dir = temp_dir
+    data = reader.read_orders()
+    os.remove(os.path.join(temp_dir, "orders.csv"))
+    return data
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rows = order_rows(size * 3 // 2, done_ratio=0.0)
+        start = time.perf_counter()
+        drop = read_csv(tmp_dir, rows[:size])
+        print(f"CSV read: {size} rows in {time.perf_counter() - start:.2f} s")
+        # Half of the orders already in the database, half new
+        mixed = read_csv(tmp_dir, rows[size // 2:size * 3 // 2])
+
+        print(f"{'drop':>10}{'previous [s]':>14}{'upsert [s]':>12}{'speedup':>9}  counts")
+        results = {}
+        for name in ("legacy", "upsert"):
+            path = os.path.join(tmp_dir, f"orders_{name}.db")
+            create_db(path, [])
+            db = OrdersDB(path)
+            for drop_name, data in (("new", drop), ("sent again", drop), ("half new", mixed)):
+                start = time.perf_counter()
+                if name == "legacy":
+                    legacy_insert_row(db.connection, data)
+                    counts = None
+                else:
+                    counts = db.insert_row(data)
+                results.setdefault(drop_name, []).append(
+                    (time.perf_counter() - start, counts))
+            db.connection.close()
+
+        for drop_name, ((legacy, _), (upsert, counts)) in results.items():
+            print(f"{drop_name:>10}{legacy:>14.2f}{upsert:>12.2f}{legacy / upsert:>8.1f}x  {counts}")
+
+
+if __name__ == "__main__":
+    main()
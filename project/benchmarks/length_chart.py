@@ -0,0 +1,78 @@
+"""
+Benchmark of the length chart of the winding dialog: cost of adding a sample and of a repaint
+(min/max decimation to the widget width) for buffers of different fill, compared with a polyline of all samples.
+
+Run from the `project` directory: `python -m benchmarks.length_chart`
+"""
+import os
+import statistics
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QPainter, QPixmap, QPolygonF
+from PyQt5.QtWidgets import QApplication
+
+from winding_in_progress_operations.length_chart import LengthChart, SampleRingBuffer
+
+SAMPLES = [1_000, 10_000, LengthChart.CAPACITY, 10 * LengthChart.CAPACITY]
+WIDTH, HEIGHT = 800, 400
+REPEAT = 20
+
+
+def measure(fcn, repeat: int = REPEAT) -> float:
+    """
+    Returns median time [ms]
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fcn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def full_polyline(buffer: SampleRingBuffer, target: QPixmap):
+    """
+    Chart drawn without decimation, one point for each sample
+    """
+    times, lengths = buffer.samples()
+    scale_x = WIDTH / max(times[-1] - times[0], 1e-9)
+    scale_y = HEIGHT / max(lengths.max(), 1.0)
+    points = QPolygonF([QPointF((t - times[0]) * scale_x, HEIGHT - length * scale_y)
+                        for t, length in zip(times.tolist(), lengths.tolist())])
+    painter = QPainter(target)
+    painter.drawPolyline(points)
+    painter.end()
+
+
+def main():
+    app = QApplication([])
+    chart = LengthChart()
+    chart.resize(WIDTH, HEIGHT)
+    pixmap = QPixmap(WIDTH, HEIGHT)
+    # Wound length of a 10 m rope at 1 m/s with noise of the encoder
+    rng = np.random.default_rng(1)
+
+    print(f"{'samples':>10}{'add [us]':>10}{'repaint [ms]':>14}{'all points [ms]':>17}")
+    for count in SAMPLES:
+        lengths = np.linspace(0, 10_000, count) + rng.normal(0, 2, count)
+        chart.reset(10_000)
+        start = time.perf_counter()
+        for length in lengths.tolist():
+            chart.add_sample(length)
+        add = (time.perf_counter() - start) * 1e6 / count
+        repaint = measure(lambda: chart.render(pixmap))
+
+        buffer = SampleRingBuffer(count)
+        for i, length in enumerate(lengths.tolist()):
+            buffer.append(i / 1000, length)
+        polyline = measure(lambda: full_polyline(buffer, pixmap), repeat=3)
+        print(f"{count:>10}{add:>10.2f}{repaint:>14.2f}{polyline:>17.2f}")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark of the archive of old `DONE` orders: size of the `orders` table and time of the queries of the orders tab
+(first page of done orders, filter by customer, full read) before and after the oldest 90% of done orders are moved
+to `orders_archive` in batches of `ARCHIVE_BATCH_SIZE` (`OrdersDB.archive_done_orders`), and the time of one batch.
+
+Run from the `project` directory: `python -m benchmarks.orders_archive [sizes...]`, e.g. `python -m benchmarks.orders_archive 100000`
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from db.db import OrdersDB, ARCHIVE_BATCH_SIZE
+from orders.order import OrderStatus
+from orders.orders_filter import OrdersFilter
+from benchmarks.synthetic import order_rows, create_db
+
+SIZES = [100_000, 1_000_000]
+KEPT_RATIO = 0.1
+
+
+def measure(fcn, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fcn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def report(db: OrdersDB, size: int, label: str):
+    customer_filter = OrdersFilter(statuses=(OrderStatus.DONE,), customer_prefix="ALFA")
+    hot = db.connection.execute("SELECT COUNT(*) FROM orders;").fetchone()[0]
+    page = measure(lambda: db.get_rows_page("DONE"))
+    customer = measure(lambda: db.filter_orders(customer_filter), 3)
+    full = measure(db.get_all_rows, 1)
+    print(f"{size:>9}{label:>8}{hot:>10}{page:>17.2f}{customer:>21.1f}{full:>16.1f}")
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    print(f"{'orders':>9}{'':>8}{'hot rows':>10}{'first page [ms]':>17}{'customer filter [ms]':>21}{'full read [ms]':>16}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, f"orders_{size}.db")
+            rows = order_rows(size)
+            create_db(path, rows)
+            db = OrdersDB(path)
+            done_dates = sorted(row["done_date"] for row in rows if row["status"] == "DONE")
+            older_than = done_dates[int(len(done_dates) * (1 - KEPT_RATIO))]
+
+            report(db, size, "before")
+            batches = []
+            while True:
+                start = time.perf_counter()
+                count = db.archive_done_orders(older_than)
+                batches.append((time.perf_counter() - start) * 1000)
+                if count < ARCHIVE_BATCH_SIZE:
+                    break
+            report(db, size, "after")
+            print(f"{'':>9} {len(batches)} batches of {ARCHIVE_BATCH_SIZE}: median {statistics.median(batches):.1f} ms, "
+                  f"max {max(batches):.1f} ms")
+            db.connection.close()
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
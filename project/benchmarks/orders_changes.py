@@ -0,0 +1,67 @@
+"""
+Benchmark of the refresh of the orders tab: previous snapshot diff (all rows read and compared with the
+snapshot of the previous refresh) vs. `OrdersDB.get_changes_since` (only rows with a newer `row_version`),
+after 1 and 100 status updates.
+
+Run from the `project` directory: `python -m benchmarks.orders_changes [sizes...]`, e.g. `python -m benchmarks.orders_changes 100000`
+"""
+import os
+import sys
+import tempfile
+import time
+
+from db.db import OrdersDB
+from benchmarks.synthetic import order_rows, create_db
+
+SIZES = [10_000, 100_000, 1_000_000]
+CHANGES = [1, 100]
+
+
+def legacy_diff(db: OrdersDB, snapshot: dict) -> tuple[list, list, dict]:
+    """
+    Copy of the previous `OrdersDB.get_changes` (`diff_rows` of all rows)
+    """
+    rows = db.get_all_rows()
+    new_snapshot = {row["order_id"]: tuple(row.values()) for row in rows}
+    upserted = [row for row in rows
+                if snapshot.get(row["order_id"]) != new_snapshot[row["order_id"]]]
+    deleted = [order_id for order_id in snapshot if order_id not in new_snapshot]
+    return upserted, deleted, new_snapshot
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    print(f"{'orders':>9}{'changes':>9}{'snapshot diff [ms]':>20}{'changes since [ms]':>20}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, f"orders_{size}.db")
+            rows = order_rows(size, done_ratio=0.5)
+            create_db(path, rows)
+            db = OrdersDB(path)
+            todo = [row["order_id"] for row in rows if row["status"] == "TODO"]
+
+            _, _, snapshot = legacy_diff(db, {})
+            version = db.get_changes_since().version
+            for count in CHANGES:
+                for order_id in todo[:count]:
+                    db.set_done_status(order_id, 100, "2099-01-01 00:00")
+                todo = todo[count:]
+
+                start = time.perf_counter()
+                upserted, _, snapshot = legacy_diff(db, snapshot)
+                diff = (time.perf_counter() - start) * 1000
+                assert len(upserted) == count
+
+                start = time.perf_counter()
+                changes = db.get_changes_since(version)
+                since = (time.perf_counter() - start) * 1000
+                assert len(changes.upserted) == count
+                version = changes.version
+
+                print(f"{size:>9}{count:>9}{diff:>20.1f}{since:>20.2f}")
+            db.connection.close()
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark of faceted filtering of orders: facet counts from `order_facets`, filter queries,
+Python scan of all orders for comparison and the cost of trigger maintained counts on status updates.
+
+Run from the `project` directory: `python -m benchmarks.orders_filter`
+"""
+import os
+import statistics
+import tempfile
+import time
+
+from db.db import OrdersDB
+from orders.order import Order, OrderStatus
+from orders.orders_filter import OrdersFilter
+from benchmarks.synthetic import order_rows, create_db
+
+SIZES = [1_000, 10_000, 100_000]
+REPEAT = 5
+UPDATES = 1_000
+
+TODO_GROUP = (OrderStatus.INTERRUPTED, OrderStatus.TODO)
+DONE_GROUP = (OrderStatus.DONE,)
+
+
+def measure(fcn, repeat: int = REPEAT) -> tuple[float, object]:
+    """
+    Returns median time [ms] and the result of the last call
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fcn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def filters(rows: list[dict]) -> list[tuple[str, OrdersFilter]]:
+    last_date = max(row["done_date"] for row in rows if row["done_date"])
+    month_begin = last_date[:8] + "01 00:00"
+    return [
+        ("customer 'Ż'", OrdersFilter(DONE_GROUP, customer_prefix="Ż")),
+        ("diameter 3.0", OrdersFilter(DONE_GROUP, diameter=3.0)),
+        ("length 5000-6000", OrdersFilter(DONE_GROUP,
+         length_min=5000, length_max=6000)),
+        ("last month", OrdersFilter(DONE_GROUP, date_from=month_begin)),
+        ("todo, NITUS, 4.0", OrdersFilter(TODO_GROUP,
+         customer_prefix="NITUS", diameter=4.0)),
+    ]
+
+
+def status_updates(db: OrdersDB, order_ids: list[str]) -> float:
+    """
+    Returns mean time [ms] of the status update committed one by one
+    """
+    start = time.perf_counter()
+    for order_id in order_ids:
+        db.connection.execute(
+            "UPDATE orders SET status='DONE', done_date='2024-01-01 00:00' WHERE order_id=?;", (order_id,))
+        db.connection.commit()
+    return (time.perf_counter() - start) * 1000 / len(order_ids)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in SIZES:
+            path = os.path.join(tmp_dir, f"orders_{size}.db")
+            rows = order_rows(size)
+            create_db(path, rows)
+
+            start = time.perf_counter()
+            db = OrdersDB(path)
+            migration = (time.perf_counter() - start) * 1000
+            facets_time, facets = measure(db.get_facets)
+            orders = [Order(**row) for row in rows]
+
+            print(f"\n{size} orders: schema migration (facet backfill) {migration:.1f} ms, "
+                  f"facet counts read {facets_time:.2f} ms, DONE orders: {facets.status_count(OrderStatus.DONE)}")
+            print(f"{'filter':<20}{'rows':>8}{'SQL [ms]':>12}{'Python scan [ms]':>20}")
+            for name, orders_filter in filters(rows):
+                sql_time, result = measure(
+                    lambda: db.filter_orders(orders_filter))
+                scan_time, scanned = measure(
+                    lambda: [order for order in orders if orders_filter.matches(order)])
+                assert len(result) == len(scanned)
+                print(
+                    f"{name:<20}{len(result):>8}{sql_time:>12.2f}{scan_time:>20.2f}")
+
+            # Status updates with and without triggers which maintain the counts
+            todo = [row["order_id"]
+                    for row in rows if row["status"] != "DONE"]
+            count = min(UPDATES, len(todo) // 2)
+            with_triggers = status_updates(db, todo[:count])
+            for trigger in ("order_facets_insert", "order_facets_delete", "order_facets_update"):
+                db.connection.execute(f"DROP TRIGGER {trigger};")
+            without_triggers = status_updates(db, todo[count:2 * count])
+            print(f"status update: {with_triggers:.3f} ms with facet triggers, "
+                  f"{without_triggers:.3f} ms without ({count} updates)")
+            db.connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark of the in-memory read mirror of `OrdersDB`: reads served by the database file (`mirror=False`)
+vs. the mirror, the cost of a refresh without changes (`get_changes_since` of the current version),
+of the first read after a change of this connection (`set_done_status`) and after a change of another connection
+(detected by `PRAGMA data_version`), both of them load the mirror again.
+
+Run from the `project` directory: `python -m benchmarks.orders_mirror [sizes...]`, e.g. `python -m benchmarks.orders_mirror 100000`
+"""
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from db.db import OrdersDB
+from orders.order import OrderStatus
+from orders.orders_filter import OrdersFilter
+from benchmarks.synthetic import order_rows, create_db
+
+SIZES = [10_000, 100_000, 1_000_000]
+NO_CHANGE_CALLS = 1000
+
+
+def measure(fcn, repeat: int = 5) -> float:
+    """
+    Returns median time [ms]
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fcn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    customer_filter = OrdersFilter(statuses=(OrderStatus.DONE,), customer_prefix="ALFA")
+    print(f"{'orders':>9}{'':>8}{'no change [us]':>16}{'first page [ms]':>17}{'filter [ms]':>13}"
+          f"{'facets [ms]':>13}{'local write [ms]':>18}{'external [ms]':>15}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, f"orders_{size}.db")
+            rows = order_rows(size, done_ratio=0.5)
+            create_db(path, rows)
+            todo = iter([row["order_id"] for row in rows if row["status"] == "TODO"])
+            other = sqlite3.connect(path)
+
+            for label, mirror in (("file", False), ("mirror", True)):
+                db = OrdersDB(path, mirror=mirror)
+                version = db.get_changes_since().version
+
+                start = time.perf_counter()
+                for _ in range(NO_CHANGE_CALLS):
+                    db.get_changes_since(version)
+                no_change = (time.perf_counter() - start) / NO_CHANGE_CALLS * 1_000_000
+
+                page = measure(lambda: db.get_rows_page("DONE"))
+                filtered = measure(lambda: db.filter_orders(customer_filter), 3)
+                facets = measure(db.get_facets)
+
+                # Change of this connection, the change set is read after the mirror is loaded again
+                def local_write():
+                    nonlocal version
+                    changes = db.set_done_status(next(todo), 100, "2099-01-01 00:00", version)
+                    assert len(changes.upserted) == 1
+                    version = changes.version
+                local = measure(local_write)
+
+                # Change of another connection, detected by `PRAGMA data_version`
+                def external_write():
+                    nonlocal version
+                    other.execute("UPDATE orders SET status = 'DONE' WHERE order_id = ?;", (next(todo),))
+                    other.commit()
+                    start = time.perf_counter()
+                    changes = db.get_changes_since(version)
+                    assert len(changes.upserted) == 1
+                    version = changes.version
+                    return (time.perf_counter() - start) * 1000
+                external = statistics.median(external_write() for _ in range(5))
+
+                print(f"{size:>9}{label:>8}{no_change:>16.1f}{page:>17.2f}{filtered:>13.1f}"
+                      f"{facets:>13.2f}{local:>18.1f}{external:>15.1f}")
+                db.connection.close()
+            other.close()
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
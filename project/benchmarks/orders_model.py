@@ -0,0 +1,84 @@
+"""
+Benchmark of the orders tree: previous `QStandardItemModel` build vs. `OrdersTreeModel`.
+
+Run from the `project` directory: `python -m benchmarks.orders_model`
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QTreeView
+from PyQt5.QtGui import QStandardItemModel, QStandardItem, QColor, QFont
+
+from orders.order import Order
+from orders.orders_model import OrdersTreeModel, STATUS_COLORS, STATUS_LABELS, order_details
+from benchmarks.synthetic import order_rows
+
+SIZES = [100, 10_000, 100_000]
+
+
+def legacy_item(txt: str, color: QColor = QColor(127, 127, 127), font_size: int = 20, set_bold: bool = False, set_enabled: bool = False) -> QStandardItem:
+    """
+    Copy of the previous `TreeItem`, a new font for each item
+    """
+    item = QStandardItem()
+    fnt = QFont("Open Sans", font_size)
+    fnt.setBold(set_bold)
+    item.setEditable(False)
+    if color:
+        item.setForeground(color)
+    item.setFont(fnt)
+    item.setText(txt)
+    item.setSelectable(False)
+    item.setEnabled(set_enabled)
+    return item
+
+
+def legacy_build(model: QStandardItemModel, orders: list[Order]):
+    root = model.invisibleRootItem()
+    for order in orders:
+        color = QColor(STATUS_COLORS[order.status])
+        order_item = legacy_item(order.order_id, set_bold=True,
+                                 font_size=24, color=color, set_enabled=True)
+        status = legacy_item(STATUS_LABELS[order.status], color=color)
+        for label, value in order_details(order):
+            order_item.appendRow(
+                [legacy_item(label), legacy_item(value, set_bold=True)])
+        root.appendRow([order_item, status])
+
+
+def measure(fcn) -> float:
+    start = time.perf_counter()
+    fcn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    app = QApplication(sys.argv)
+    print(f"{'orders':>8}{'legacy build [ms]':>20}{'legacy refresh [ms]':>22}{'model build [ms]':>19}{'model refresh [ms]':>21}{'expand 10 [ms]':>17}")
+    for size in SIZES:
+        orders = [Order(**row) for row in order_rows(size, done_ratio=1.0)]
+
+        legacy_view = QTreeView()
+        legacy_model = QStandardItemModel()
+        legacy_view.setModel(legacy_model)
+        legacy = measure(lambda: legacy_build(legacy_model, orders))
+        legacy_refresh = measure(lambda: (legacy_model.removeRows(
+            0, legacy_model.rowCount()), legacy_build(legacy_model, orders)))
+
+        view = QTreeView()
+        model = OrdersTreeModel()
+        view.setModel(model)
+        built = measure(lambda: model.set_orders(orders))
+        refresh = measure(lambda: model.set_orders(orders))
+        expand = measure(lambda: [view.expand(model.index(row, 0))
+                                  for row in range(min(10, size))])
+
+        print(f"{size:>8}{legacy:>20.1f}{legacy_refresh:>22.1f}{built:>19.1f}{refresh:>21.1f}{expand:>17.1f}")
+        app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark of reading orders for the tree: the whole table sorted by `get_all_rows` vs. keyset pages of
+`get_rows_page` (first page, page in the middle and the last page of `DONE` orders), without and with
+the `orders_status_done_date` index. Query plans of the page queries are printed for each size.
+
+Run from the `project` directory: `python -m benchmarks.orders_pages [sizes...]`, e.g. `python -m benchmarks.orders_pages 100000`
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from db.db import OrdersDB, SELECT_ORDERS, ORDERS_ORDER_BY, PAGE_SIZE
+from benchmarks.synthetic import order_rows, create_db
+
+SIZES = [10_000, 100_000, 1_000_000]
+INDEX = "orders_status_done_date"
+
+
+def measure(fcn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fcn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def query_plan(db: OrdersDB, sql: str, params: tuple) -> str:
+    return "; ".join(row[3] for row in db.connection.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    print(f"{'orders':>9}{'index':>7}{'full read [ms]':>16}{'first page [ms]':>17}"
+          f"{'middle page [ms]':>18}{'last page [ms]':>16}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, f"orders_{size}.db")
+            rows = order_rows(size)
+            create_db(path, rows)
+            db = OrdersDB(path)
+            # Keys of the pages in the middle and at the end of `DONE` orders
+            done = sorted((row for row in rows if row["status"] == "DONE"),
+                          key=lambda row: (row["done_date"], row["order_id"]), reverse=True)
+            middle = done[len(done) // 2]
+            last = done[max(len(done) - PAGE_SIZE - 1, 0)]
+            middle_key = (middle["done_date"], middle["order_id"])
+            last_key = (last["done_date"], last["order_id"])
+            repeat = 3 if size < 1_000_000 else 1
+
+            plans = []
+            for indexed in (False, True):
+                if not indexed:
+                    db.connection.execute(f"DROP INDEX {INDEX};")
+                else:
+                    db.connection.execute(
+                        f"CREATE INDEX {INDEX} ON orders (status, done_date DESC, order_id);")
+                db.connection.execute("ANALYZE;")
+
+                assert len(db.get_rows_page("DONE", last_key)) == PAGE_SIZE
+                full = measure(db.get_all_rows, repeat)
+                first = measure(lambda: db.get_rows_page("DONE"), 20)
+                middle_page = measure(lambda: db.get_rows_page("DONE", middle_key), 20)
+                last_page = measure(lambda: db.get_rows_page("DONE", last_key), 20)
+                print(f"{size:>9}{'yes' if indexed else 'no':>7}{full:>16.1f}{first:>17.2f}"
+                      f"{middle_page:>18.2f}{last_page:>16.2f}")
+                plans.append((indexed, query_plan(
+                    db, f"{SELECT_ORDERS} WHERE status = ? AND done_date < ? {ORDERS_ORDER_BY} LIMIT ?;",
+                    ("DONE", middle_key[0], PAGE_SIZE))))
+
+            for indexed, plan in plans:
+                print(f"{'':>9} page query plan ({'index' if indexed else 'no index'}): {plan}")
+            db.connection.close()
+            os.remove(path)
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark of the statistics tab: production of the period read from the `daily_stats` summary
+(`OrdersDB.get_production_stats`) vs. the same aggregates computed from the orders at view time,
+and the cost added to `set_done_status` by the trigger which maintains the summary.
+
+Run from the `project` directory: `python -m benchmarks.production_stats [sizes...]`, e.g. `python -m benchmarks.production_stats 100000`
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from db.db import OrdersDB
+from benchmarks.synthetic import order_rows, create_db
+
+SIZES = [10_000, 100_000, 1_000_000]
+# Aggregation of the orders without the summary, the query of the tab before `daily_stats`
+FROM_ORDERS = """
+    SELECT date(done_date), diameter, COUNT(*), SUM(quantity), SUM(quantity * length) / 1000.0,
+        SUM(production_time) / NULLIF(SUM(CASE WHEN production_time IS NULL THEN 0 ELSE quantity END), 0)
+    FROM orders WHERE status = 'DONE' AND done_date IS NOT NULL GROUP BY 1, 2;
+"""
+
+
+def measure(fcn, repeat: int = 5) -> float:
+    """
+    Returns median time [ms]
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fcn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    print(f"{'orders':>9}{'summary rows':>14}{'summary [ms]':>14}{'from orders [ms]':>18}{'set done [ms]':>15}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, f"orders_{size}.db")
+            rows = order_rows(size, done_ratio=0.5)
+            create_db(path, rows)
+            todo = iter([row["order_id"] for row in rows if row["status"] == "TODO"])
+            db = OrdersDB(path, mirror=False)
+            summary_rows = db.connection.execute("SELECT COUNT(*) FROM daily_stats;").fetchone()[0]
+
+            summary = measure(db.get_production_stats)
+            from_orders = measure(lambda: db.connection.execute(FROM_ORDERS).fetchall())
+            set_done = measure(lambda: db.set_done_status(next(todo), 100, "2099-01-01 00:00"))
+
+            print(f"{size:>9}{summary_rows:>14}{summary:>14.2f}{from_orders:>18.1f}{set_done:>15.2f}")
+            db.connection.close()
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
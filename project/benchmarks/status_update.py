@@ -0,0 +1,100 @@
+"""
+Benchmark of "Przenieś do wykonanych": time from the request of `set_done_status` to the update of the orders tree
+in the GUI thread, through the database thread (`DBService`) and the queued `done` signal:
+- full table - the action returns all rows (`get_all_rows`), `Order` objects are built for all of them
+  and the model is filled again (the original implementation),
+- refresh - the action is followed by `read_csv_and_update_db` (the previous implementation),
+- change set - the action returns only changes since the version of the tab (`apply_changes` of the updated order).
+
+Run from the `project` directory: `python -m benchmarks.status_update [sizes...]`, e.g. `python -m benchmarks.status_update 100000`
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QEventLoop
+from PyQt5.QtWidgets import QApplication, QTreeView
+
+from db.db import OrdersDBActions, OrdersDBWorker
+from db.service import DBService
+from orders.order import Order
+from orders.orders_model import OrdersTreeModel
+from benchmarks.synthetic import order_rows, create_db
+
+SIZES = [10_000, 100_000, 1_000_000]
+PRESSES = 5
+
+
+def request(service: DBService, action: OrdersDBActions, *args):
+    """
+    Queue the action and wait (processing events of the GUI thread) for its `done` signal, returns its result
+    """
+    loop = QEventLoop()
+    result = []
+    worker = OrdersDBWorker(action, *args)
+    worker.signals.done.connect(lambda value: (result.append(value), loop.quit()))
+    service.start(worker)
+    loop.exec_()
+    return result[0]
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    print(f"{'orders':>9}{'full table [ms]':>17}{'refresh [ms]':>14}{'change set [ms]':>17}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, f"orders_{size}.db")
+            rows = order_rows(size, done_ratio=0.5)
+            create_db(path, rows)
+            todo = iter([row["order_id"] for row in rows if row["status"] == "TODO"])
+            service = DBService(path)
+            view = QTreeView()
+            model = OrdersTreeModel()
+            view.setModel(model)
+            version = request(service, OrdersDBActions.reload_orders).version
+
+            def first_page():
+                model.set_orders([Order(*row) for row in request(
+                    service, OrdersDBActions.get_rows_page, "TODO", None, model.PAGE_SIZE)])
+
+            def full_table():
+                request(service, OrdersDBActions.set_done_status, next(todo), 100, "2099-01-01 00:00")
+                # The original action returned all rows
+                result = request(service, OrdersDBActions.get_all_rows)
+                model.set_orders([Order(**row) for row in result])
+
+            def refresh():
+                nonlocal version
+                request(service, OrdersDBActions.set_done_status, next(todo), 100, "2099-01-01 00:00")
+                changes = request(service, OrdersDBActions.read_csv_and_update_db, version)
+                version = changes.version
+                model.apply_changes([Order(**row) for row in changes.upserted], changes.deleted)
+
+            def change_set():
+                nonlocal version
+                changes = request(service, OrdersDBActions.set_done_status, next(todo), 100,
+                                  "2099-01-01 00:00", version)
+                version = changes.version
+                model.apply_changes([Order(**row) for row in changes.upserted], changes.deleted)
+
+            results = []
+            for press in (full_table, refresh, change_set):
+                first_page()
+                times = []
+                for _ in range(PRESSES if size < 1_000_000 or press is not full_table else 1):
+                    start = time.perf_counter()
+                    press()
+                    times.append((time.perf_counter() - start) * 1000)
+                results.append(statistics.median(times))
+            service.stop()
+            print(f"{size:>9}{results[0]:>17.1f}{results[1]:>14.1f}{results[2]:>17.1f}")
+
+
+if __name__ == "__main__":
+    # Application of the views and the queued signals, kept for the whole run
+    app = QApplication(sys.argv)
+    main()
@@ -0,0 +1,57 @@
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+CUSTOMERS = ["NITUS", "ALFA", "BETA", "GAMMA", "Jan Kowalski", "Żuraw Sp. z o.o.", "Ośrodek Łódź"]
+DIAMETERS = [2.0, 2.5, 3.0, 3.2, 4.0, 5.0, 6.0]
+
+
+def order_id(num: int) -> str:
+    """
+    Returns valid `order_id` for the given number
+    """
+    return f"{num % 1000000:06d}/{num % 12 + 1:02d}/2023/{num // 1000000 + 1}/{num % 9 + 1}"
+
+
+def order_rows(count: int, done_ratio: float = 0.9, seed: int = 0) -> list[dict]:
+    """
+    Returns `count` synthetic orders in the format of `OrdersDB.get_all_rows`
+    """
+    rnd = random.Random(seed)
+    begin = datetime(2023, 1, 1)
+    rows = []
+    for num in range(count):
+        done = rnd.random() < done_ratio
+        status = "DONE" if done else rnd.choice(["TODO", "TODO", "INTERRUPTED"])
+        production_time = rnd.randint(60, 3600) if status != "TODO" else None
+        done_date = (begin + timedelta(minutes=num)).strftime("%Y-%m-%d %H:%M") \
+            if status != "TODO" else None
+        rows.append({
+            "order_id": order_id(num),
+            "status": status,
+            "quantity": rnd.randint(1, 20),
+            "length": rnd.randint(1500, 12000),
+            "diameter": rnd.choice(DIAMETERS),
+            "customer_name": rnd.choice(CUSTOMERS),
+            "production_time": production_time,
+            "done_date": done_date,
+        })
+    return rows
+
+
+def create_db(path: str, rows: list[dict]):
+    """
+    Create the `orders` table (`create_new_table.sql`) in the database at `path` and insert `rows`
+    """
+    sql_path = os.path.join(os.path.dirname(__file__), "..",
+                            "windows_SHARED", "DB", "create_new_table.sql")
+    connection = sqlite3.connect(path)
+    with open(sql_path) as f:
+        connection.executescript(f.read())
+    connection.executemany(
+        "INSERT INTO orders (order_id, status, quantity, length, diameter, customer_name, production_time, done_date) "
+        "VALUES (:order_id, :status, :quantity, :length, :diameter, :customer_name, :production_time, :done_date);",
+        rows)
+    connection.commit()
+    connection.close()
@@ -0,0 +1,58 @@
+"""
+Simulation of the winding process: `WindingEngine` driven by `SimulatedMachine` without Qt and hardware.
+Checks that no order gets stuck (no pending event and the dialog neither accepted nor rejected)
+and measures how many process cycles per second the engine handles.
+
+Run from the `project` directory: `python -m benchmarks.winding_simulation`
+"""
+import time
+
+from winding_in_progress_operations.simulation import SimulatedMachine, SimulationFaults
+
+ORDERS = 2_000
+# Length [mm] and quantity of the simulated orders
+LENGTH_TARGET = 5_000
+QUANTITY_TARGET = 10
+
+SCENARIOS = [
+    ("clean", SimulationFaults()),
+    ("operator", SimulationFaults(pause=0.05, cancel=0.01, early_release=0.1)),
+    ("machine faults", SimulationFaults(winder_fail=0.05, cut_fail=0.05,
+                                        reset_fail=0.05, monitor_error=0.05)),
+    ("all faults", SimulationFaults(winder_fail=0.05, cut_fail=0.05, reset_fail=0.05, monitor_error=0.05,
+                                    pause=0.05, cancel=0.01, early_release=0.1, rope_pull=0.02)),
+]
+
+
+def main():
+    print(f"{ORDERS} orders of {QUANTITY_TARGET} x {LENGTH_TARGET} mm")
+    print(f"{'scenario':<16}{'completed':>10}{'rejected':>10}{'stuck':>7}"
+          f"{'ropes/s':>10}{'triggers/s':>12}{'sim. order [s]':>16}")
+    for name, faults in SCENARIOS:
+        machine = SimulatedMachine(faults=faults, seed=1)
+        completed = rejected = ropes = dispatched = 0
+        simulated_time = 0.0
+        stuck = {}
+        start = time.perf_counter()
+        for _ in range(ORDERS):
+            result = machine.run_order(LENGTH_TARGET, QUANTITY_TARGET,
+                                       print_labels=True, print_every_other=True)
+            ropes += result.quantity
+            dispatched += result.dispatched
+            simulated_time += result.time
+            if result.completed is None:
+                stuck[result.stuck_state] = stuck.get(
+                    result.stuck_state, 0) + 1
+            elif result.completed:
+                completed += 1
+            else:
+                rejected += 1
+        elapsed = time.perf_counter() - start
+        print(f"{name:<16}{completed:>10}{rejected:>10}{sum(stuck.values()):>7}"
+              f"{ropes / elapsed:>10.0f}{dispatched / elapsed:>12.0f}{simulated_time / ORDERS:>16.1f}")
+        for state, count in stuck.items():
+            print(f"  stuck in {state}: {count}")
+
+
+if __name__ == "__main__":
+    main()
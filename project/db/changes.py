@@ -0,0 +1,27 @@
+class OrdersChangeSet:
+    """
+    OrdersChangeSet
+    ---
+
+    Set of changes of the `orders` table returned by the `OrdersDB` actions.
+
+    - `upserted` - inserted or updated rows as dictionaries (the same format as `OrdersDB.get_all_rows`),
+    - `deleted` - `order_id` of removed rows,
+    - `version` - version of the table (`orders_version`) which includes the changes. Pass it to the next
+      `OrdersDB.get_changes_since` call to get only newer changes,
+    - `full` - `True` if there was no previous version, all displayed rows have to be read again (`upserted` is empty).
+    """
+
+    def __init__(self, upserted: list[dict], deleted: list[str], version: int, full: bool = False):
+        self.upserted = upserted
+        self.deleted = deleted
+        self.version = version
+        self.full = full
+
+    def __bool__(self) -> bool:
+        return self.full or bool(self.upserted) or bool(self.deleted)
+
+    def __str__(self):
+        if self.full:
+            return f"full load at version {self.version}"
+        return f"upserted: {len(self.upserted)} deleted: {len(self.deleted)} version: {self.version}"
@@ -1,39 +1,170 @@
+import os
+import glob
 import sqlite3
 import time
+from shutil import move
 from enum import Enum, auto
 from loguru import logger
-from PyQt5.QtCore import QRunnable, pyqtSignal, QThreadPool, QObject
+from concurrent.futures import Future
+from PyQt5.QtCore import pyqtSignal, QObject
 
 from db.read_csv import CSVReader, Row
+from db.changes import OrdersChangeSet
+from db.schema import migrate
+from orders.orders_filter import OrdersFilter, OrdersFacets
+from startup_profiler import profiler
+from db.service import db_service, resolve_db_path
+from db.tuning import ConnectionProfile, connect
+from winding_in_progress_operations.rope_events import RopeEvent
+
+
+# Columns of the orders returned by the actions, SQL texts are constant so prepared statements are reused
+ORDER_COLUMNS = ("order_id", "status", "quantity", "length", "diameter",
+                 "customer_name", "production_time", "done_date")
+SELECT_ORDERS = f"SELECT {', '.join(ORDER_COLUMNS)} FROM orders"
+SELECT_ARCHIVED_ORDERS = f"SELECT {', '.join(ORDER_COLUMNS)} FROM orders_archive"
+ORDERS_ORDER_BY = "ORDER BY status, done_date DESC, order_id"
+# Insert of the order, the order with the same `order_id` is updated and goes back to `TODO`
+UPSERT_ORDER = """
+    INSERT INTO orders (order_id, customer_name, quantity, length, diameter)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (order_id) DO UPDATE SET
+        customer_name = excluded.customer_name,
+        quantity = excluded.quantity,
+        length = excluded.length,
+        diameter = excluded.diameter,
+        status = 'TODO',
+        done_date = NULL,
+        production_time = NULL;
+"""
+# Files of the orders committed by `ingest_csv_files`, deleted when the file is moved to the archive
+INSERT_MANIFEST = """
+    INSERT OR REPLACE INTO csv_manifest (file, archive_path, size, mtime_ns)
+    VALUES (?, ?, ?, ?);
+"""
+# Default number of rows of `get_rows_page`
+PAGE_SIZE = 200
+# Default number of orders moved to the archive by one `archive_done_orders` call
+ARCHIVE_BATCH_SIZE = 500
+# Columns copied between `orders` and `orders_archive`
+ARCHIVE_COLUMNS = ", ".join(ORDER_COLUMNS + ("created_at",))
+INSERT_ROPE_EVENT = f"""
+    INSERT INTO rope_events ({', '.join(RopeEvent.__slots__)})
+    VALUES ({', '.join('?' * len(RopeEvent.__slots__))});
+"""
+# Aggregates of `rope_events` returned by `get_order_rope_stats` and `get_rope_stats_by_diameter`:
+# overrun is the length wound after the stop of the winder (final length - trigger length)
+ROPE_STATS_COLUMNS = ("ropes", "avg_final_length", "avg_overrun", "max_overrun",
+                      "avg_winding_s", "avg_cycle_s", "confirmation_s", "winding_s", "cutting_s", "reset_s",
+                      "halted_s")
+ROPE_STATS = """
+    COUNT(*), AVG(final_length), AVG(final_length - trigger_length), MAX(final_length - trigger_length),
+    AVG(winding_s), AVG(confirmation_s + winding_s + cutting_s + reset_s + halted_s),
+    SUM(confirmation_s), SUM(winding_s), SUM(cutting_s), SUM(reset_s), SUM(halted_s)
+"""
+# Aggregates of `daily_stats` returned by `get_production_stats`: length in metres,
+# cycle is the production time of one rope of the orders with the time measured
+PRODUCTION_STATS_COLUMNS = ("orders", "ropes", "length_m", "avg_cycle_s")
+PRODUCTION_STATS = """
+    SUM(orders), SUM(ropes), SUM(length_mm) / 1000.0, SUM(production_time) / NULLIF(SUM(timed_ropes), 0)
+"""
+
+
+class UpsertCounts:
+    """
+    Numbers of rows inserted and updated by one `OrdersDB.insert_row` call
+    """
+
+    def __init__(self, inserted: int, updated: int):
+        self.inserted = inserted
+        self.updated = updated
+
+    def __str__(self):
+        return f"inserted: {self.inserted} updated: {self.updated}"
 
 
 class OrdersDBActions(Enum):
     get_all_rows = auto()
+    get_changes_since = auto()
+    get_facets = auto()
+    get_rows_page = auto()
+    filter_orders = auto()
     insert_row = auto()
     read_csv_and_update_db = auto()
+    ingest_csv_files = auto()
+    reload_orders = auto()
     set_done_status = auto()
     set_interrupted_status = auto()
+    archive_done_orders = auto()
+    insert_rope_events = auto()
+    get_order_rope_stats = auto()
+    get_rope_stats_by_diameter = auto()
+    get_production_stats = auto()
 
 
 class OrdersDB:
-    __is_executed = False
+    """
+    OrdersDB
+    ---
 
-    def __init__(self) -> None:
+    Connection to the orders database and its actions. The application uses one `OrdersDB`,
+    owned by the `db_service` thread; actions are requested with `OrdersDBWorker`.
 
-        self.db_path = "project/windows_SHARED/DB/winding_machine.db"
-        self.connection = sqlite3.connect(self.db_path)
+    Parameters
+    ---
+
+    :db_path: path of the database, `None` means `ORDERS_DB_PATH` env or the default path (see `resolve_db_path`)
+    :profile: `ConnectionProfile` of the connection, `None` means chosen by the filesystem of the database (see `db/tuning.py`)
+    :mirror: serve reads from the in-memory mirror, `None` means `ORDERS_DB_MIRROR` env (`True` by default)
+
+    Read mirror
+    ---
+
+    Reads of the GUI (lists, filters, facets, changes, rope stats) are served by a copy of the database in memory,
+    loaded with the backup API. Small writes of the actions (statuses, rope events) are executed on the database file
+    and then on the mirror; bulk writes (`.csv` drops, the archive) only on the file and the mirror is loaded again
+    by the next read, which costs less than the same write on the mirror.
+    Before each read the mirror is checked: `PRAGMA data_version` of the connection changes when another connection
+    committed a change, `total_changes` when this connection wrote anything not written to the mirror.
+    Only then the mirror is loaded again, so a read without changes costs only these checks.
+    """
+
+    def __init__(self, db_path: str = None, profile: ConnectionProfile = None, mirror: bool = None) -> None:
+
+        self.db_path = resolve_db_path(db_path)
+        with profiler.phase("DB open"):
+            self.connection = connect(self.db_path, profile)
+            migrate(self.connection)
+        if mirror is None:
+            mirror = os.getenv("ORDERS_DB_MIRROR", 'True') == 'True'
+        self.__mirror: sqlite3.Connection = sqlite3.connect(
+            ":memory:", cached_statements=128) if mirror else None
+        # `(data_version, total_changes)` of the connection when the mirror was loaded
+        self.__mirror_state: tuple = None
+        self.mirror_loads = 0
         # Define actions object
         self.actions_handler = {
             OrdersDBActions.get_all_rows: self.get_all_rows,
+            OrdersDBActions.get_changes_since: self.get_changes_since,
+            OrdersDBActions.get_facets: self.get_facets,
+            OrdersDBActions.get_rows_page: self.get_rows_page,
+            OrdersDBActions.filter_orders: self.filter_orders,
             OrdersDBActions.insert_row: self.insert_row,
             OrdersDBActions.read_csv_and_update_db: self.read_csv_and_update_db,
+            OrdersDBActions.ingest_csv_files: self.ingest_csv_files,
+            OrdersDBActions.reload_orders: self.reload_orders,
             OrdersDBActions.set_done_status: self.set_done_status,
-            OrdersDBActions.set_interrupted_status: self.set_interrupted_status
+            OrdersDBActions.set_interrupted_status: self.set_interrupted_status,
+            OrdersDBActions.archive_done_orders: self.archive_done_orders,
+            OrdersDBActions.insert_rope_events: self.insert_rope_events,
+            OrdersDBActions.get_order_rope_stats: self.get_order_rope_stats,
+            OrdersDBActions.get_rope_stats_by_diameter: self.get_rope_stats_by_diameter,
+            OrdersDBActions.get_production_stats: self.get_production_stats
         }
 
     def execute(self, action_name: OrdersDBActions, *args, **kwargs):
         """
-        Execute actions in a separate thread available in the `OrdersDBActions` class.
+        Execute actions available in the `OrdersDBActions` class.
         Parametres:
         --
         - `name of action` - goes first
@@ -42,197 +173,450 @@ class OrdersDB:
         IMPORTANT
         --
         The order of parameters is important; the name of the action always goes first.
+        The connection may be used only by the thread which created it (`db_service`).
         """
-        if not OrdersDB.__is_executed:
-            logger.info(f"Exceuting: {action_name.name} ...")
-            OrdersDB.__is_executed = True
-            action = self.actions_handler[action_name]
-            result = action(*args, **kwargs)
-            OrdersDB.__is_executed = False
-            return result
+        logger.info(f"Exceuting: {action_name.name} ...")
+        action = self.actions_handler[action_name]
+        return action(*args, **kwargs)
+
+    def __reader(self) -> sqlite3.Connection:
+        """
+        Returns connection for reads: the mirror (loaded again if the database was changed) or the connection itself
+        """
+        if self.__mirror is None:
+            return self.connection
+        state = (self.connection.execute("PRAGMA data_version;").fetchone()[0],
+                 self.connection.total_changes)
+        if state != self.__mirror_state:
+            started = time.perf_counter()
+            self.connection.backup(self.__mirror)
+            self.__mirror_state = state
+            self.mirror_loads += 1
+            logger.debug(f"Read mirror loaded in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return self.__mirror
 
     def get_all_rows(self):
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(
-                "SELECT order_id, status, quantity, length, diameter, customer_name, production_time, done_date FROM orders ORDER BY status, done_date DESC;")
+            cursor = self.__reader().execute(
+                f"{SELECT_ORDERS} {ORDERS_ORDER_BY};")
             # Fetch all rows as a list of dictionaries
-            columns = [column[0] for column in cursor.description]
-            result = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            result = [dict(zip(ORDER_COLUMNS, row))
+                      for row in cursor.fetchall()]
             cursor.close()
-            if not result:
-                result = []
             return result
 
         except sqlite3.Error as e:
             raise e
 
-    def insert_row(self, data: list[Row] = None):
+    def get_rows_page(self, status: str, after_key: tuple = None, limit: int = PAGE_SIZE,
+                      archived: bool = False) -> list[tuple]:
         """
-        Insert rows into the database.
+        Returns up to `limit` orders with `status` as tuples of `ORDER_COLUMNS`, in the order of `get_all_rows`.
+
+        Parameters:
         --
-        If there is a record with the same `order_id` as the row to insert, then this record is updated.
+        - `status` - status of the orders (`'TODO'`, `'DONE'`, `'INTERRUPTED'`),
+        - `after_key` - `(done_date, order_id)` of the last order of the previous page, `None` for the first page,
+        - `limit` - maximal number of returned orders,
+        - `archived` - read orders moved to `orders_archive` (history) instead of `orders`.
+
+        The page starts right after `after_key` (keyset pagination), so it is read from the `orders_status_done_date`
+        index at the same cost at any depth. `done_date DESC` puts orders without `done_date` last,
+        so the rest of the range is read by up to three queries, each of them a range of the index.
         """
-        try:
-            cursor = self.connection.cursor()
-            for row_data in data:
-                sql = """
-                    INSERT INTO orders (
-                        order_id,
-                        customer_name,
-                        quantity,
-                        length,
-                        diameter
-                    ) VALUES (?, ?, ?, ?, ?);
-                """
-                data_input = (
-                    row_data.order_id,
-                    row_data.customer_name,
-                    row_data.quantity,
-                    row_data.length,
-                    row_data.diameter
-                )
-
-                try:
-                    cursor.execute(sql, data_input)
-                except sqlite3.IntegrityError as e:
-                    if e.__str__() == "UNIQUE constraint failed: orders.order_id":
-                        # If the same order_id is in db then update the recored
-                        sql_update = """
-                        UPDATE orders
-                        SET
-                            customer_name=?,
-                            quantity=?,
-                            length=?,
-                            diameter=?,
-                            status='TODO',
-                            done_date=null,
-                            production_time=null
-                        WHERE order_id=?
-                        """
-                        data_update_input = (
-                            row_data.customer_name,
-                            row_data.quantity,
-                            row_data.length,
-                            row_data.diameter,
-                            row_data.order_id
-                        )
-                        cursor.execute(sql_update, data_update_input)
+        if after_key is None:
+            ranges = [("", ())]
+        else:
+            done_date, order_id = after_key
+            if done_date is None:
+                ranges = [("AND done_date IS NULL AND order_id > ?", (order_id,))]
+            else:
+                ranges = [
+                    ("AND done_date = ? AND order_id > ?", (done_date, order_id)),
+                    ("AND done_date < ?", (done_date,)),
+                    ("AND done_date IS NULL", ()),
+                ]
 
+        select = SELECT_ARCHIVED_ORDERS if archived else SELECT_ORDERS
+        reader = self.__reader()
+        rows = []
+        for condition, params in ranges:
+            cursor = reader.execute(
+                f"{select} WHERE status = ? {condition} {ORDERS_ORDER_BY} LIMIT ?;",
+                (status, *params, limit - len(rows)))
+            rows += cursor.fetchall()
             cursor.close()
-            self.connection.commit()  # Commit at the end
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def get_changes_since(self, version: int = None) -> OrdersChangeSet:
+        """
+        Returns orders inserted, updated and deleted after `version` (taken from the previous `OrdersChangeSet`).
+        If `version` is `None`, then only the current version is returned (`full`), rows are read with `get_rows_page`.
+        Changed rows are read from the `orders_row_version` index, so the cost depends on the number of changes,
+        not on the size of the table.
+        """
+        reader = self.__reader()
+        current = reader.execute(
+            "SELECT version FROM orders_version WHERE id = 0;").fetchone()[0]
+        if version is None:
+            return OrdersChangeSet([], [], current, full=True)
+        if version == current:
+            return OrdersChangeSet([], [], current)
+
+        # Changes newer than `current` (made by the other connection in the meantime) are read by the next call
+        cursor = reader.execute(
+            f"{SELECT_ORDERS} WHERE row_version > ? AND row_version <= ?;", (version, current))
+        upserted = [dict(zip(ORDER_COLUMNS, row)) for row in cursor.fetchall()]
+        cursor = reader.execute(
+            "SELECT order_id FROM orders_tombstones WHERE row_version > ? AND row_version <= ?;", (version, current))
+        deleted = [order_id for order_id, in cursor.fetchall()]
+        cursor.close()
+        return OrdersChangeSet(upserted, deleted, current)
+
+    def get_facets(self) -> OrdersFacets:
+        """
+        Returns precomputed counts of orders by customer, diameter and status
+        """
+        cursor = self.__reader().cursor()
+        cursor.execute(
+            "SELECT facet, value, status, count FROM order_facets;")
+        facets = OrdersFacets(cursor.fetchall())
+        cursor.close()
+        return facets
+
+    def filter_orders(self, orders_filter: OrdersFilter) -> list[dict]:
+        """
+        Returns rows (the same format as `get_all_rows`) which match `orders_filter`,
+        from `orders_archive` if the filter is of the history (`archived`)
+        """
+        where, params = orders_filter.where()
+        select = SELECT_ARCHIVED_ORDERS if orders_filter.archived else SELECT_ORDERS
+        cursor = self.__reader().execute(
+            f"{select} WHERE {where} {ORDERS_ORDER_BY};", params)
+        result = [dict(zip(ORDER_COLUMNS, row)) for row in cursor.fetchall()]
+        cursor.close()
+        return result
+
+    def __write(self, write, *args, mirrored: bool = True):
+        """
+        Execute `write(connection, *args)` on the database, then the same on the mirror, so the mirror does not have
+        to be loaded again after writes of this connection. Returns the result of the write of the database.
+
+        Bulk writes (`mirrored=False`) are executed only on the database and the mirror is loaded again by the next
+        read, also a mirror which is already to be loaded is not loaded for a write.
+        """
+        if self.__mirror is None or self.__mirror_state is None:
+            return write(self.connection, *args)
+        if not mirrored:
+            self.__mirror_state = None
+            return write(self.connection, *args)
+        # Changes of other connections are loaded first, the mirror is then changed in the same way as the database
+        self.__reader()
+        data_version = self.__mirror_state[0]
+        result = write(self.connection, *args)
+        try:
+            mirrored = write(self.__mirror, *args)
         except sqlite3.Error as e:
-            raise e
+            logger.warning(f"Write of the read mirror failed, the mirror is loaded again ({e})")
+            mirrored = None
+        # Different result (or a change committed by another connection in the meantime) loads the mirror again
+        self.__mirror_state = (data_version, self.connection.total_changes) if mirrored == result else None
+        return result
 
-    def read_csv_and_update_db(self):
-        reader = CSVReader()
-        if reader.check_for_files_to_read():
-            data = reader.read_orders()
-            self.insert_row(data)
-            reader.archive_read_files()
-            logger.success("New records inserted to database")
+    def insert_row(self, data: list[Row] = None) -> "UpsertCounts":
+        """
+        Insert rows into the database.
+        --
+        If there is a record with the same `order_id` as the row to insert, then this record is updated
+        (and goes back to `TODO`). All rows are written by one `executemany` in one transaction.
+        Returns `UpsertCounts` of inserted and updated rows.
+        """
+        return self.__insert([row.values() for row in data or ()])
+
+    def __insert(self, rows: list[tuple], manifest: list[tuple] = ()) -> "UpsertCounts":
+        """
+        Upsert `rows` (tuples of `Row.VALUES`), `manifest` entries `(file, archive_path, size, mtime_ns)`
+        of the files of the rows are written in the same transaction (see `ingest_csv_files`)
+        """
+        inserted, updated = self.__write(self.__upsert_rows, rows, manifest, mirrored=False)
+        return UpsertCounts(inserted, updated)
+
+    @staticmethod
+    def __upsert_rows(connection: sqlite3.Connection, rows: list[tuple], manifest: list[tuple] = ()) -> tuple[int, int]:
+        with connection:
+            # Explicit write transaction, so no other connection inserts rows between the counts
+            connection.execute("BEGIN IMMEDIATE;")
+            # New rows get `rowid` greater than the greatest one before the insert
+            last_rowid = connection.execute(
+                "SELECT COALESCE(MAX(rowid), 0) FROM orders;").fetchone()[0]
+            cursor = connection.executemany(UPSERT_ORDER, rows)
+            written = cursor.rowcount
+            inserted = connection.execute(
+                "SELECT COUNT(*) FROM orders WHERE rowid > ?;", (last_rowid,)).fetchone()[0]
+            connection.executemany(INSERT_MANIFEST, manifest)
+        return inserted, written - inserted
+
+    def read_csv_and_update_db(self, version: int = None) -> OrdersChangeSet:
+        if CSVReader().check_for_files_to_read():
+            counts = self.ingest_csv_files()
+            logger.success(f"New records inserted to database ({counts})")
         else:
             logger.info("No .csv files were found")
 
-        return self.get_all_rows()
+        return self.get_changes_since(version)
 
-    def set_done_status(self, order_id, production_time, done_date):
-        try:
-            sql = ''' 
-            UPDATE orders
-            SET
-                status=?,
-                production_time=?,
-                done_date=? 
-            WHERE order_id=?
-            '''
-            data_input = (
-                'DONE',
-                production_time,
-                done_date,
-                order_id
-            )
-            cursor = self.connection.cursor()
-            cursor.execute(sql, data_input)
-            self.connection.commit()
-            return self.get_all_rows()
+    def ingest_csv_files(self, files: list[str] = None) -> UpsertCounts:
+        """
+        Insert orders of the `.csv` files (all files of the `TEMP` directory if `None`) and move the files to the archive
+        --
+        1. Files of the manifest left by a crash are archived (`__archive_ingested`)
+        2. Files are parsed and validated in parallel by `CSVReader.read_order_values`, a file which is not valid
+           raises its exception and nothing is written
+        3. Orders of all files and the manifest of the files (archive path, size and mtime) are written
+           in one transaction
+        4. Files are moved to the archive and deleted from the manifest
 
-        except sqlite3.Error as e:
-            raise e
+        A crash before the commit leaves the files in `TEMP` without any of their orders, a crash after the commit
+        leaves them in the manifest, so they are archived by the next ingestion instead of being read again.
+        Files which are not in the directory anymore (read by another ingestion in the meantime) are skipped.
+        """
+        reader = CSVReader()
+        # Orders of these files are committed, but the files were not moved to the archive
+        committed = self.__archive_ingested()
+        if files is None:
+            files = glob.glob(f"{reader.path_to_temp_dir}*.csv")
+        manifest = []
+        for file in files:
+            if file in committed:
+                continue
+            try:
+                stat = os.stat(file)
+            except FileNotFoundError:
+                continue
+            manifest.append((file, reader.archive_path(file), stat.st_size, stat.st_mtime_ns))
+        if not manifest:
+            return UpsertCounts(0, 0)
 
-    def set_interrupted_status(self, order_id, production_time, done_date):
-        try:
-            sql = ''' 
-            UPDATE orders
-            SET
-                status=?,
-                production_time=?,
-                done_date=? 
-            WHERE order_id=?
-            '''
-            data_input = (
-                'INTERRUPTED',
-                production_time,
-                done_date,
-                order_id
-            )
-            cursor = self.connection.cursor()
-            cursor.execute(sql, data_input)
-            self.connection.commit()
-            return self.get_all_rows()
+        started = time.perf_counter()
+        rows = reader.read_order_values([entry[0] for entry in manifest])
+        read = time.perf_counter()
+        counts = self.__insert(rows, manifest)
+        written = time.perf_counter()
+        self.__archive_ingested()
+        logger.info(f"{len(manifest)} files ({len(rows)} rows) ingested: read in {(read - started) * 1000:.0f} ms, "
+                    f"written in {(written - read) * 1000:.0f} ms, archived in {(time.perf_counter() - written) * 1000:.0f} ms")
+        return counts
 
-        except sqlite3.Error as e:
-            raise e
+    def __archive_ingested(self) -> set[str]:
+        """
+        Move the files of the manifest to the archive and delete them from the manifest. A file which was changed
+        since it was read (sent again) is not moved, it is only deleted from the manifest, so it is read again.
+        Returns the files which were not moved (the shared directory is not available), they are moved
+        by the next ingestion.
+        """
+        manifest = self.connection.execute(
+            "SELECT file, archive_path, size, mtime_ns FROM csv_manifest;").fetchall()
+        archived = []
+        failed = set()
+        for file, archive_path, size, mtime_ns in manifest:
+            try:
+                stat = os.stat(file)
+                if (stat.st_size, stat.st_mtime_ns) == (size, mtime_ns):
+                    move(file, archive_path)
+                else:
+                    logger.warning(f"File {os.path.basename(file)} was changed after its orders were written, "
+                                   "it is read again")
+            except FileNotFoundError:
+                # Moved before the crash, only the manifest was not updated
+                pass
+            except OSError as e:
+                logger.error(f"File {os.path.basename(file)} was NOT moved to the archive: {e}")
+                failed.add(file)
+                continue
+            archived.append((file,))
+        if archived:
+            self.__write(self.__delete_manifest, archived)
+        return failed
+
+    @staticmethod
+    def __delete_manifest(connection: sqlite3.Connection, files: list[tuple]) -> int:
+        with connection:
+            return connection.executemany("DELETE FROM csv_manifest WHERE file = ?;", files).rowcount
+
+    def reload_orders(self) -> OrdersChangeSet:
+        """
+        Explicit full reload: returns the current version as a `full` change set,
+        the displayed orders are dropped and read again with `get_rows_page`
+        """
+        return self.get_changes_since()
+
+    def set_done_status(self, order_id, production_time, done_date, version: int = None) -> OrdersChangeSet:
+        return self.__set_status('DONE', order_id, production_time, done_date, version)
+
+    def set_interrupted_status(self, order_id, production_time, done_date, version: int = None) -> OrdersChangeSet:
+        return self.__set_status('INTERRUPTED', order_id, production_time, done_date, version)
+
+    def __set_status(self, status: str, order_id, production_time, done_date, version: int = None) -> OrdersChangeSet:
+        """
+        Set the status of the order in one transaction. Returns changes since `version` (see `get_changes_since`),
+        which contain the updated order, so only the affected rows are sent back to the GUI.
+        """
+        updated, restored = self.__write(
+            self.__update_status, status, order_id, production_time, done_date)
+        if restored:
+            logger.info(f"Order {order_id} restored from the archive")
+        if not updated:
+            logger.warning(f"Order {order_id} is not in the database, status {status} not set")
+        return self.get_changes_since(version)
+
+    @staticmethod
+    def __update_status(connection: sqlite3.Connection, status: str, order_id, production_time,
+                        done_date) -> tuple[bool, bool]:
+        """
+        Returns `(updated, restored)`, the order which is not in `orders` is restored from `orders_archive`
+        (order run again from the history)
+        """
+        sql = '''
+        UPDATE orders
+        SET
+            status=?,
+            production_time=?,
+            done_date=?
+        WHERE order_id=?
+        '''
+        restored = False
+        with connection:
+            cursor = connection.execute(
+                sql, (status, production_time, done_date, order_id))
+            if cursor.rowcount == 0:
+                cursor = connection.execute(
+                    f"INSERT INTO orders ({ARCHIVE_COLUMNS}) "
+                    f"SELECT {ARCHIVE_COLUMNS} FROM orders_archive WHERE order_id = ?;", (order_id,))
+                restored = cursor.rowcount > 0
+                if restored:
+                    connection.execute(
+                        "DELETE FROM orders_archive WHERE order_id = ?;", (order_id,))
+                    cursor = connection.execute(
+                        sql, (status, production_time, done_date, order_id))
+        return cursor.rowcount > 0, restored
+
+    def archive_done_orders(self, older_than: str, limit: int = ARCHIVE_BATCH_SIZE) -> int:
+        """
+        Move up to `limit` of the oldest `DONE` orders with `done_date` before `older_than` (`YYYY-MM-DD HH:MM`)
+        to `orders_archive`, in one transaction. Returns number of moved orders, less than `limit` if there are no more.
+        Removed orders are reported by `get_changes_since` as deleted.
+        """
+        count = self.__write(self.__archive_orders, older_than, limit, mirrored=False)
+        if count:
+            logger.info(f"{count} DONE orders older than {older_than} moved to the archive")
+        return count
+
+    @staticmethod
+    def __archive_orders(connection: sqlite3.Connection, older_than: str, limit: int) -> int:
+        oldest = ("SELECT rowid FROM orders WHERE status = 'DONE' AND done_date < ? "
+                  "ORDER BY status, done_date, order_id LIMIT ?")
+        with connection:
+            connection.execute("BEGIN IMMEDIATE;")
+            connection.execute(
+                f"INSERT OR REPLACE INTO orders_archive ({ARCHIVE_COLUMNS}) "
+                f"SELECT {ARCHIVE_COLUMNS} FROM orders WHERE rowid IN ({oldest});", (older_than, limit))
+            cursor = connection.execute(
+                f"DELETE FROM orders WHERE rowid IN ({oldest});", (older_than, limit))
+        return cursor.rowcount
+
+    def insert_rope_events(self, events: list[RopeEvent]) -> int:
+        """
+        Insert records of finished ropes, all of them in one transaction. Returns number of inserted rows.
+        """
+        return self.__write(self.__insert_rope_events, [event.as_row() for event in events])
+
+    @staticmethod
+    def __insert_rope_events(connection: sqlite3.Connection, rows: list[tuple]) -> int:
+        with connection:
+            cursor = connection.executemany(INSERT_ROPE_EVENT, rows)
+        return cursor.rowcount
+
+    def get_order_rope_stats(self, order_id: str) -> dict:
+        """
+        Returns aggregates of the ropes of the order (`ROPE_STATS_COLUMNS`), `ropes` is `0` if none was recorded
+        """
+        row = self.__reader().execute(
+            f"SELECT {ROPE_STATS} FROM rope_events WHERE order_id = ?;", (order_id,)).fetchone()
+        return dict(zip(ROPE_STATS_COLUMNS, row))
+
+    def get_rope_stats_by_diameter(self, since: str = None) -> dict[float, dict]:
+        """
+        Returns aggregates of the ropes (`ROPE_STATS_COLUMNS`) of each diameter `diameter: dict`,
+        of ropes finished at or after `since` (`YYYY-MM-DD HH:MM:SS`) if it is given
+        """
+        where, params = ("WHERE finished_at >= ?", (since,)) if since else ("", ())
+        cursor = self.__reader().execute(
+            f"SELECT diameter, {ROPE_STATS} FROM rope_events {where} GROUP BY diameter ORDER BY diameter;", params)
+        result = {row[0]: dict(zip(ROPE_STATS_COLUMNS, row[1:]))
+                  for row in cursor.fetchall()}
+        cursor.close()
+        return result
+
+    def get_production_stats(self, since: str = None) -> dict[str, dict]:
+        """
+        Returns production of `DONE` orders done at or after `since` (`YYYY-MM-DD`) if it is given,
+        read from the `daily_stats` summary (maintained by the trigger), not from the orders:
+        `{"total": dict, "days": {day: dict}, "diameters": {diameter: dict}}`, dicts of `PRODUCTION_STATS_COLUMNS`.
+        Days are in descending order.
+        """
+        where, params = ("WHERE day >= ?", (since,)) if since else ("", ())
+        reader = self.__reader()
+        total = reader.execute(f"SELECT {PRODUCTION_STATS} FROM daily_stats {where};", params).fetchone()
+        days = reader.execute(
+            f"SELECT day, {PRODUCTION_STATS} FROM daily_stats {where} GROUP BY day ORDER BY day DESC;",
+            params).fetchall()
+        diameters = reader.execute(
+            f"SELECT diameter, {PRODUCTION_STATS} FROM daily_stats {where} GROUP BY diameter ORDER BY diameter;",
+            params).fetchall()
+        return {
+            "total": dict(zip(PRODUCTION_STATS_COLUMNS, total)),
+            "days": {row[0]: dict(zip(PRODUCTION_STATS_COLUMNS, row[1:])) for row in days},
+            "diameters": {row[0]: dict(zip(PRODUCTION_STATS_COLUMNS, row[1:])) for row in diameters},
+        }
 
 
 class Signals(QObject):
     started = pyqtSignal()
-    done = pyqtSignal(list)
+    done = pyqtSignal(object)
     error = pyqtSignal(str, str)
 
 
-class OrdersDBWorker(QRunnable):
+class OrdersDBWorker:
+    """
+    OrdersDBWorker
+    ---
+
+    Request of the `OrdersDB` action. Start it with `db_service.start(worker)`, the action is queued and executed
+    by the database thread. `done` is emitted with the result of the action (`None` for actions without result),
+    `error` if the action failed. Signals are emitted from the database thread.
+    """
+
     def __init__(self, action_name: OrdersDBActions, *args, **kwargs):
-        super().__init__()
         self.signals = Signals()
 
         self.action_name = action_name
         self.args = args
         self.kwargs = kwargs
 
-    def run(self):
-        try:
-            self.db = OrdersDB()
-            if self.action_name == OrdersDBActions.insert_row:
-                self.db.execute(
-                    self.action_name, *self.args, **self.kwargs)
-            else:
-                result = self.db.execute(
-                    self.action_name, *self.args, **self.kwargs)
-                self.signals.done.emit(result)
-
-        except Exception:
-            logger.error("Failed to load data from winding_machine.db:orders")
+    def finished(self, future: Future):
+        exception = future.exception()
+        if exception is None:
+            self.signals.done.emit(future.result())
+        else:
+            logger.error(
+                f"Failed to execute {self.action_name.name} on winding_machine.db:orders ({exception})")
             self.signals.error.emit(
                 "Błąd bazy danych", "Skontaktuj się z administratorem sieci.\n Nie udane dodanie/pobranie danych.")
 
 
 if __name__ == "__main__":
-    db = OrdersDB()
-    print(db.check_order_id_availability('280899/11/2023/1/9'))
-
-    def after(result):
-        print("xdxd")
-        print("xd", result[0])
-
-    # Thread definition
-    pool = QThreadPool.globalInstance()
-    worker = OrdersDBWorker(OrdersDBActions.get_all_rows, '280899/11/2023/1/9')
-    # Done signal handling
-    worker.signals.done.connect(after)
-    # Error signal handling
-    # worker.signals.error.connect(after)
-    # Set action on thread start
-    worker.signals.started.connect(worker.run)
-    # Start thread
-    pool.start(worker)
+    print(db_service.call(OrdersDBActions.get_all_rows)[0])
+    print(db_service.format_stats())
+    db_service.stop()
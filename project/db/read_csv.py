@@ -1,15 +1,71 @@
 import os
+import re
 import csv
+import codecs
 import glob
 import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from shutil import move
-import chardet
+from loguru import logger
+
+# Size of the beginning of the file used to detect its encoding
+ENCODING_SAMPLE_SIZE = 64 * 1024
+# Encoding of the files of the office system, tried when the file is not valid UTF-8
+DEFAULT_ENCODING = "cp1250"
+# Encodings detected for file name patterns (`file_pattern`), kept while the application runs
+encoding_cache: dict[str, str] = {}
+
+
+def file_pattern(path: str) -> str:
+    """
+    Returns name of the file with numbers replaced by `#`, files of one sender (e.g. `20520.csv`, `20533.csv`)
+    have the same pattern
+    """
+    return re.sub(r"\d+", "#", os.path.basename(path).lower())
+
+
+def is_valid(sample: bytes, encoding: str, truncated: bool) -> bool:
+    """
+    Check that `sample` decodes with `encoding`, a character cut at the end of a truncated sample is allowed
+    """
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(sample, final=not truncated)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def detect_encoding(sample: bytes, truncated: bool) -> tuple[str, str]:
+    """
+    Returns `(encoding, source)` of the file detected from its beginning `sample`:
+    1. BOM of UTF-8
+    2. ASCII sample fits each candidate, `UTF-8` is tried (decoding of the whole file fails if it is not UTF-8)
+    3. valid UTF-8 (text in other encodings with Polish characters is almost never valid UTF-8)
+    4. valid `DEFAULT_ENCODING`
+    5. `chardet` on the sample
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig", "bom"
+    if sample.isascii():
+        return "utf-8", "ascii"
+    if is_valid(sample, "utf-8", truncated):
+        return "utf-8", "sample"
+    if is_valid(sample, DEFAULT_ENCODING, truncated):
+        return DEFAULT_ENCODING, "sample"
+    # `chardet` is imported on first use, so it is not loaded at application startup
+    import chardet
+    return chardet.detect(sample)["encoding"] or DEFAULT_ENCODING, "chardet"
 
 
 class Row:
     """
     Converts data from csv file to format used in the rest of program
     """
+    # Attributes of `values()`, in the order of the columns of the insert of the order
+    VALUES = ("order_id", "customer_name", "quantity", "length", "diameter")
 
     def __init__(
             self,
@@ -33,43 +89,250 @@ class Row:
         self.length = int(round(length_float * 1000, 0))
         self.customer_name = customer_name.strip()
 
+    def values(self) -> tuple:
+        return (self.order_id, self.customer_name, self.quantity, self.length, self.diameter)
+
     def __str__(self):
         return f"ORDER_ID: {self.order_id:{22}} QUANTITY: {self.quantity:{5}} DIAMETER: {self.diameter:{5}} LENGTH:{self.length:{8}} CUSTOMER_NAME: {self.customer_name}"
 
 
+def read_file(file: str, cached: str = None) -> tuple[list[Row], dict]:
+    """
+    Read orders of one `.csv` file
+    --
+    Encoding of the file is detected from its first `ENCODING_SAMPLE_SIZE` bytes (`detect_encoding`)
+    and the file is decoded in one pass. If a later part of the file does not decode (the sample was ASCII,
+    so it was read as UTF-8), the file is read again with `cached` (the encoding cached for the name pattern
+    of the file), or with `DEFAULT_ENCODING` if nothing but UTF-8 is cached. The cache is only this tie-break,
+    so a file of the pattern sent in another encoding is never decoded with the wrong one.
+    Returns `Row` objects and the timing of the file (encoding, its source, number of rows and times).
+
+    Executed by the worker processes of `CSVReader.read_orders` as well, so nothing is written to the log here.
+    """
+    started = time.perf_counter()
+    detected_encoding = None
+    with open(file, 'rb') as f:
+        sample = f.read(ENCODING_SAMPLE_SIZE)
+    truncated = len(sample) == ENCODING_SAMPLE_SIZE
+    encoding, source = detect_encoding(sample, truncated)
+    detected = time.perf_counter()
+
+    try:
+        rows = decode_rows(file, encoding)
+    except UnicodeDecodeError:
+        fallback, fallback_source = DEFAULT_ENCODING, "fallback"
+        if cached is not None and codecs.lookup(cached).name not in ("utf-8", "utf-8-sig"):
+            fallback, fallback_source = cached, "cache"
+        if fallback == encoding:
+            # Previous detection on the whole file
+            import chardet
+            with open(file, 'rb') as f:
+                fallback = chardet.detect(f.read())['encoding']
+        detected_encoding, encoding, source = encoding, fallback, fallback_source
+        rows = decode_rows(file, encoding)
+    read = time.perf_counter()
+
+    return rows, {
+        "file": os.path.basename(file),
+        "encoding": encoding,
+        "source": source,
+        # Encoding of the sample, if the file was read again with another encoding
+        "sample_encoding": detected_encoding,
+        "rows": len(rows),
+        "detect_ms": (detected - started) * 1000,
+        "read_ms": (read - detected) * 1000,
+    }
+
+
+def decode_rows(file: str, encoding: str) -> list[Row]:
+    """
+    Create `Row` object for each row of the file, a row which is not an order raises `ValueError` with its line
+    """
+    rows = []
+    with open(file, 'r', encoding=encoding, newline='') as f:
+        reader = csv.reader(f, delimiter=';')
+        for row in reader:
+            try:
+                rows.append(Row(*row))
+            except (TypeError, ValueError) as e:
+                raise ValueError(
+                    f"File {os.path.basename(file)} line {reader.line_num} is not a valid order ({e})") from None
+    return rows
+
+
+def read_file_values(file: str, cached: str = None) -> tuple[list[tuple], dict]:
+    """
+    `read_file` with the rows as tuples of `Row.VALUES`, tuples are sent from the worker processes
+    several times faster than `Row` objects
+    """
+    rows, timing = read_file(file, cached)
+    return [row.values() for row in rows], timing
+
+
+def _worker_pid(_) -> int:
+    """
+    Task of the start of the workers of `ParserPool`
+    """
+    return os.getpid()
+
+
+class ParserPool:
+    """
+    ParserPool
+    ---
+
+    Worker processes which parse and validate several `.csv` files at once (`CSVReader.read_orders`).
+    The pool is started once (`start`, after the application is shown) and kept until the exit, so a drop of files
+    does not pay for starting processes. The workers are started by a `forkserver`: the server is a new
+    single-threaded process, so the workers never inherit locks held by the threads of the application
+    (Qt, the database thread, loguru). The server imports only this module and each worker is forked from it;
+    the workers also import `main.py`, which does not import the application then.
+
+    A pool broken by a killed worker is started again, the files of that call are parsed in this process.
+
+    Parameters
+    ---
+
+    :processes: number of the worker processes, `None` means `CSV_INGEST_PROCESSES` env (the number of CPUs
+    by default), `1` disables the pool
+    """
+
+    def __init__(self, processes: int = None):
+        self.__processes = processes
+        self.__lock = threading.Lock()
+        self.__pool: ProcessPoolExecutor = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.__pool is not None
+
+    def start(self, wait: bool = False):
+        """
+        Start the pool, the workers are started in the background (or before the return if `wait`)
+        """
+        with self.__lock:
+            if self.__pool is not None:
+                return
+            if self.__processes is None:
+                self.__processes = int(os.getenv("CSV_INGEST_PROCESSES", "0")) or os.cpu_count() or 1
+            if self.__processes < 2:
+                logger.info("CSV parser pool disabled")
+                return
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["db.read_csv"])
+            self.__pool = ProcessPoolExecutor(self.__processes, mp_context=context)
+        if wait:
+            self.__warm_up()
+            return
+        # The first task starts the server and the workers, it is not waited for
+        threading.Thread(target=self.__warm_up, daemon=True, name="CSV_parser_pool").start()
+
+    def __warm_up(self):
+        started = time.perf_counter()
+        try:
+            list(self.__pool.map(_worker_pid, range(self.__processes)))
+            logger.info(f"CSV parser pool of {self.__processes} processes started in "
+                        f"{(time.perf_counter() - started) * 1000:.0f} ms")
+        except Exception as e:
+            logger.error(f"CSV parser pool was NOT started: {e}")
+
+    def map(self, read, files: list[str], cached: list[str]) -> list:
+        """
+        Returns results of `read(file, cached)` of the files (in their order), executed by the workers
+        if the pool is started, otherwise in this process
+        """
+        pool = self.__pool
+        if pool is None or len(files) < 2:
+            return list(map(read, files, cached))
+        try:
+            return list(pool.map(read, files, cached))
+        except BrokenProcessPool as e:
+            logger.error(f"CSV parser pool is broken, it is started again: {e}")
+            with self.__lock:
+                if self.__pool is pool:
+                    self.__pool = None
+            pool.shutdown(wait=False)
+            self.start()
+            return list(map(read, files, cached))
+
+    def stop(self):
+        """
+        Stop the workers, files being parsed are not waited for
+        """
+        with self.__lock:
+            pool, self.__pool = self.__pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Pool used by `CSVReader`, started by the application
+parser_pool = ParserPool()
+
+
 class CSVReader:
     def __init__(self) -> None:
         self.path_to_temp_dir = "/home/admin/Dokumenty/project/windows_SHARED/TEMP/"
         self.path_to_archive_dir = "/home/admin/Dokumenty/project/windows_SHARED/ARCHIVE/"
         self.orders_data = []
 
-    def read_orders(self) -> list[Row]:
+    def read_orders(self, files: list[str] = None, parallel: bool = True) -> list[Row]:
         """
         Read orders
         --
-        1. Read all `.csv` files from `self.path_to_temp_dir `
+        1. Read all `.csv` files from `self.path_to_temp_dir ` (or only `files`)
         2. Create `Row` object for each readed row nad add them to list
         3. Return list of `Row` objects
+
+        Files are read by `read_file`. Several files are parsed and validated in parallel by `parser_pool`
+        if it is started and `parallel`, rows are returned in the order of the files. A file which is not valid
+        raises its exception, so no rows are returned. Detected encodings are cached for the name pattern
+        of the file (`encoding_cache`). Times of the files are stored in `self.timings`.
+        """
+        self.orders_data += self.__read(read_file, files, parallel)
+        # Return list of `Row` objects
+        return self.orders_data
+
+    def read_order_values(self, files: list[str] = None, parallel: bool = True) -> list[tuple]:
+        """
+        `read_orders` with the rows as tuples of `Row.VALUES` (the rows inserted by `OrdersDB`)
         """
+        return self.__read(read_file_values, files, parallel)
+
+    def __read(self, read, files: list[str], parallel: bool) -> list:
         # Read all `.csv` files from `self.path_to_temp_dir `
-        self.files = glob.glob(f"{self.path_to_temp_dir}*.csv")
+        self.files = files if files is not None else glob.glob(f"{self.path_to_temp_dir}*.csv")
+        self.timings = []
 
-        for file in self.files:
-            # Open each founded .csv file
-            with open(file, 'rb') as f:
-                # Use chardet to detect the encoding
-                result = chardet.detect(f.read())
-                encoding = result['encoding']
+        cached = [encoding_cache.get(file_pattern(file)) for file in self.files]
+        if parallel:
+            results = parser_pool.map(read, self.files, cached)
+        else:
+            results = map(read, self.files, cached)
 
-            # Open the file again with the detected encoding
-            with open(file, 'r', encoding=encoding) as f:
-                # Create `Row` object for each readed row and add them to list
-                for row in csv.reader(f, delimiter=';'):
-                    row_to_save = Row(*row)
-                    self.orders_data.append(row_to_save)
+        data = []
+        for file, (rows, timing) in zip(self.files, results):
+            encoding_cache[file_pattern(file)] = timing["encoding"]
+            self.timings.append(timing)
+            if timing["sample_encoding"] is not None:
+                logger.warning(f"File {timing['file']} is not {timing['sample_encoding']} after the first "
+                               f"{ENCODING_SAMPLE_SIZE} bytes, read as {timing['encoding']}")
+            logger.info(f"File {timing['file']}: {timing['encoding']} ({timing['source']}) detected in "
+                        f"{timing['detect_ms']:.1f} ms, {timing['rows']} rows read in {timing['read_ms']:.1f} ms")
+            data += rows
+        return data
 
-        # Return list of `Row` objects
-        return self.orders_data
+    def archive_path(self, file: str) -> str:
+        """
+        Path of the `file` in `self.path_to_archive_dir` with new name (time postfix)
+        """
+        # Get the current time in milliseconds
+        current_time = int(time.time() * 1000)
+        # Split the file's name and extension
+        file_name, file_extension = os.path.splitext(os.path.basename(file))
+        # Create a new name with the timestamp postfix
+        new_name = f"{file_name}_{current_time}{file_extension}"
+        # Construct the full path to the new location
+        return os.path.join(self.path_to_archive_dir, new_name)
 
     def archive_read_files(self):
         """
@@ -78,17 +341,8 @@ class CSVReader:
         Move files to `self.path_to_archive_dir` with new name (time postfix)
         """
         for file in self.files:
-            # Get the current time in milliseconds
-            current_time = int(time.time() * 1000)
-            # Split the file's name and extension
-            file_name, file_extension = os.path.splitext(
-                file[len(self.path_to_temp_dir):])
-            # Create a new name with the timestamp postfix
-            new_name = f"{file_name}_{current_time}{file_extension}"
-            # Construct the full path to the new location
-            new_path = os.path.join(self.path_to_archive_dir, new_name)
             # Move the file to the new location with the new name
-            move(file, new_path)
+            move(file, self.archive_path(file))
 
     def check_for_files_to_read(self):
         if glob.glob(f"{self.path_to_temp_dir}*.csv"):
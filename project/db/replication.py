@@ -0,0 +1,386 @@
+import os
+import sqlite3
+import threading
+import time
+from loguru import logger
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QLabel
+
+from db.schema import MIGRATIONS, schema_version
+from db.service import db_service, resolve_db_path
+from db.tuning import PROFILES, connect
+
+DEFAULT_REPLICA_PATH = os.path.join("windows_SHARED", "DB", "winding_machine.db")
+
+
+class _NotMigrated(sqlite3.DatabaseError):
+    """
+    Local database with an older schema, migrated when `db_service` opens it
+    """
+
+
+def resolve_replica_path(replica_path: str = None) -> str:
+    """
+    Returns absolute path of the replica on the shared directory: `replica_path`, `ORDERS_REPLICA_PATH` env
+    or the default path, `None` if the replication is disabled (`ORDERS_REPLICA_PATH` set to an empty value)
+    """
+    path = replica_path if replica_path is not None else os.getenv(
+        "ORDERS_REPLICA_PATH", DEFAULT_REPLICA_PATH)
+    if not path:
+        return None
+    return resolve_db_path(path)
+
+
+class Replicator:
+    """
+    Replicator
+    ---
+
+    Copies the local orders database (the primary, used by `db_service`) to the database on the shared
+    directory with the SQLite online backup API, in its own thread, so writes of the application never wait
+    for the network. `notify` is called by `db_service` after each action which changed the database;
+    the copy is made at most every `MIN_INTERVAL_S`, so a burst of changes is replicated once.
+
+    The backup reads a snapshot of the local database in one read transaction (`WAL` readers do not block
+    the writer) and replaces the replica in one transaction of the replica, so readers of the shared database
+    see either the previous or the new copy. A failed copy (e.g. the share is not mounted) is retried after
+    `BACKOFF_MIN_S`, doubled after each next failure up to `BACKOFF_MAX_S`.
+
+    Replication lag is the time since the oldest change which is not in the replica yet.
+
+    Only a complete local database (with the `orders` table and the schema of all `MIGRATIONS`) is copied
+    (a local database of an older schema is copied after `db_service` migrates it),
+    so a local database created empty never replaces the replica. The local database missing on the start
+    is copied from the replica first (the seed copy); until the seed copy is made, `db_service` is held,
+    so it does not create an empty local database, and the seed copy is retried with the backoff.
+
+    Parameters
+    ---
+
+    :local_path: path of the local database, resolved by `resolve_db_path`
+    :replica_path: path of the replica, resolved by `resolve_replica_path`
+    """
+    MIN_INTERVAL_S = 2
+    BACKOFF_MIN_S = 5
+    BACKOFF_MAX_S = 300
+    # Time of the last copy made when the application exits
+    STOP_TIMEOUT_S = 30
+
+    def __init__(self, local_path: str = None, replica_path: str = None):
+        self.__local_path = local_path
+        self.__replica_path = replica_path
+        self.__lock = threading.Lock()
+        self.__wake = threading.Event()
+        self.__thread: threading.Thread = None
+        self.__stopping = False
+        self.__source: sqlite3.Connection = None
+        self.__target: sqlite3.Connection = None
+        # Time [perf_counter] of the oldest change not copied yet, `None` if the replica is up to date
+        self.__dirty_since: float = None
+        self.__failures = 0
+        self.__next_attempt = 0.0
+        self.__last_error: str = None
+        # Wall time of the last successful copy
+        self.__replicated_at: float = None
+        self.__copies = 0
+        self.__last_copy_s = 0.0
+        # `True` while the local database is not copied from the replica yet
+        self.__seeding = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.__thread is not None
+
+    def start(self):
+        """
+        Prepare the local database and start the replication thread. The local database missing on the first
+        start (or empty) is created as a copy of the replica. If the copy can not be made
+        now, `db_service` is held and the copy is retried by the replication thread.
+        """
+        if self.__thread is not None:
+            return
+        local_path = resolve_db_path(self.__local_path)
+        replica_path = resolve_replica_path(self.__replica_path)
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        if replica_path is None:
+            logger.info("Database replication disabled")
+            return
+        if os.path.normcase(local_path) == os.path.normcase(replica_path):
+            logger.warning(f"Database replication disabled, {local_path} is the replica")
+            return
+
+        self.__local_path, self.__replica_path = local_path, replica_path
+        if os.path.exists(local_path) and self.__is_empty(local_path):
+            logger.warning(f"Local database {local_path} is empty, it is copied from {replica_path} again")
+            self.__remove_local()
+        if not os.path.exists(local_path) and not self.__seed():
+            # The database is opened when the seed copy is made by the replication thread
+            self.__seeding = True
+            db_service.hold(f"Local database {local_path} is not copied from {replica_path} yet")
+        else:
+            # Changes of the last run may be not copied yet
+            self.__dirty_since = time.perf_counter()
+        self.__thread = threading.Thread(
+            target=self.__run, daemon=True, name="DB_replication")
+        self.__thread.start()
+
+    def notify(self, *_):
+        """
+        Mark the local database as changed, called by `db_service` after an action which changed it
+        """
+        with self.__lock:
+            if self.__dirty_since is None:
+                self.__dirty_since = time.perf_counter()
+        self.__wake.set()
+
+    def __run(self):
+        last_copy = 0.0
+        final_copy = False
+        while self.__seeding:
+            if self.__stopping:
+                return
+            delay = self.__next_attempt - time.perf_counter()
+            if delay > 0:
+                self.__wake.wait(delay)
+                self.__wake.clear()
+                continue
+            if self.__seed():
+                self.__seeding = False
+                db_service.release()
+        while True:
+            now = time.perf_counter()
+            with self.__lock:
+                dirty = self.__dirty_since is not None
+                ready = max(self.__next_attempt, last_copy + self.MIN_INTERVAL_S)
+            # One more copy when the application exits, without waiting for the backoff
+            if self.__stopping and (not dirty or final_copy):
+                break
+            if not dirty:
+                self.__wake.wait()
+                self.__wake.clear()
+                continue
+            if now < ready and not self.__stopping:
+                self.__wake.wait(ready - now)
+                self.__wake.clear()
+                continue
+            final_copy = self.__stopping
+            last_copy = time.perf_counter()
+            self.__replicate()
+
+        for connection in (self.__source, self.__target):
+            if connection is not None:
+                connection.close()
+
+    def __replicate(self):
+        with self.__lock:
+            dirty_since, self.__dirty_since = self.__dirty_since, None
+        started = time.perf_counter()
+        try:
+            if self.__source is None:
+                # Opened read-write without creating it, a missing local database is an error
+                self.__source = sqlite3.connect(f"file:{self.__local_path}?mode=rw", uri=True)
+            self.__check(self.__source, migrated=True)
+            if self.__target is None:
+                self.__target = connect(self.__replica_path, PROFILES["network"])
+            self.__source.backup(self.__target)
+            # The copied header has the `WAL` mode of the local database, which is not safe on the share
+            self.__target.execute(
+                f"PRAGMA journal_mode = {PROFILES['network'].journal_mode};")
+        except _NotMigrated as e:
+            # Copied after `db_service` opens and migrates the database, not counted as a failure
+            with self.__lock:
+                if self.__dirty_since is None or dirty_since < self.__dirty_since:
+                    self.__dirty_since = dirty_since
+            logger.debug(f"Database replication postponed: {e}")
+            return
+        except (sqlite3.Error, OSError) as e:
+            # Connection to the share is opened again by the next attempt
+            if self.__target is not None:
+                self.__target.close()
+                self.__target = None
+            with self.__lock:
+                if self.__dirty_since is None or dirty_since < self.__dirty_since:
+                    self.__dirty_since = dirty_since
+                self.__failures += 1
+                delay = min(self.BACKOFF_MIN_S * 2 ** (self.__failures - 1), self.BACKOFF_MAX_S)
+                self.__next_attempt = time.perf_counter() + delay
+                self.__last_error = str(e)
+            logger.error(f"Database replication to {self.__replica_path} failed ({self.__failures}x), "
+                         f"next attempt in {delay} s: {e}")
+            return
+
+        duration = time.perf_counter() - started
+        with self.__lock:
+            if self.__failures:
+                logger.success(f"Database replication to {self.__replica_path} restored after "
+                               f"{self.__failures} failed attempts")
+            self.__failures = 0
+            self.__next_attempt = 0.0
+            self.__last_error = None
+            self.__replicated_at = time.time()
+            self.__copies += 1
+            self.__last_copy_s = duration
+
+    def __seed(self) -> bool:
+        """
+        Create the local database as a copy of the replica, returns `True` if it was created.
+        A failure is counted and retried after the backoff, like a failed replication.
+        """
+        try:
+            self.__copy(self.__replica_path, self.__local_path)
+        except (sqlite3.Error, OSError) as e:
+            self.__remove_local()
+            with self.__lock:
+                self.__failures += 1
+                delay = min(self.BACKOFF_MIN_S * 2 ** (self.__failures - 1), self.BACKOFF_MAX_S)
+                self.__next_attempt = time.perf_counter() + delay
+                self.__last_error = str(e)
+            logger.error(f"Local database not created from {self.__replica_path} ({self.__failures}x), "
+                         f"next attempt in {delay} s: {e}")
+            return False
+        with self.__lock:
+            self.__failures = 0
+            self.__next_attempt = 0.0
+            self.__last_error = None
+        logger.success(f"Local database {self.__local_path} created from {self.__replica_path}")
+        return True
+
+    def __remove_local(self):
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(self.__local_path + suffix):
+                os.remove(self.__local_path + suffix)
+
+    @staticmethod
+    def __is_empty(path: str) -> bool:
+        """
+        Returns `True` if the database has no tables (created by opening a missing database),
+        a database which can not be read is kept
+        """
+        try:
+            connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                return connection.execute("SELECT COUNT(*) FROM sqlite_master;").fetchone()[0] == 0
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def __check(connection: sqlite3.Connection, migrated: bool):
+        """
+        Raise `sqlite3.DatabaseError` if the database has no `orders` table,
+        or (`migrated`) its schema is not of all `MIGRATIONS`
+        """
+        if connection.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'orders';").fetchone()[0] == 0:
+            raise sqlite3.DatabaseError("database has no orders table")
+        version = schema_version(connection)
+        if migrated and version < len(MIGRATIONS):
+            raise _NotMigrated(f"database schema version {version}, expected {len(MIGRATIONS)}")
+        if migrated and version > len(MIGRATIONS):
+            raise sqlite3.DatabaseError(f"database schema version {version}, expected {len(MIGRATIONS)}")
+
+    @classmethod
+    def __copy(cls, source_path: str, target_path: str):
+        source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+        try:
+            # Empty replica (or not a database) is not copied
+            cls.__check(source, migrated=False)
+            target = sqlite3.connect(target_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+        finally:
+            source.close()
+
+    def stats(self) -> dict:
+        """
+        Returns replication lag [s] (`0.0` if the replica is up to date), number of failed attempts in a row,
+        seconds to the next attempt, last error, wall time of the last copy, number and time [ms] of the copies
+        """
+        now = time.perf_counter()
+        with self.__lock:
+            return {
+                "lag_s": now - self.__dirty_since if self.__dirty_since is not None else 0.0,
+                "failures": self.__failures,
+                "retry_in_s": max(self.__next_attempt - now, 0.0) if self.__failures else 0.0,
+                "error": self.__last_error,
+                "replicated_at": self.__replicated_at,
+                "copies": self.__copies,
+                "last_copy_ms": self.__last_copy_s * 1000,
+            }
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        return (f"lag {stats['lag_s']:.1f} s, {stats['copies']} copies, last copy {stats['last_copy_ms']:.0f} ms, "
+                f"{stats['failures']} failed attempts")
+
+    def stop(self, timeout: float = STOP_TIMEOUT_S):
+        """
+        Copy the last changes (if the replica is reachable) and end the thread
+        """
+        thread = self.__thread
+        if thread is None:
+            return
+        self.__stopping = True
+        self.__wake.set()
+        thread.join(timeout)
+        self.__thread = None
+
+
+class ReplicationLabel(QLabel):
+    """
+    ReplicationLabel
+    ---
+
+    Label of the status bar with the state of the replication of the database to the shared directory,
+    updated every `UPDATE_MS`. Marked red when the copy fails.
+
+    Parameters
+    ---
+
+    :replicator: `Replicator` whose state is shown
+    """
+    UPDATE_MS = 1000
+    # Lag shown as the replica being up to date (copy in progress)
+    LAG_SHOWN_S = 5
+
+    def __init__(self, replicator: Replicator, parent=None):
+        super().__init__(parent)
+        self.__replicator = replicator
+        self.__timer = QTimer(self)
+        self.__timer.timeout.connect(self.update_state)
+        self.__timer.start(self.UPDATE_MS)
+        self.update_state()
+
+    @staticmethod
+    def __format_seconds(seconds: float) -> str:
+        if seconds < 120:
+            return f"{seconds:.0f} s"
+        return f"{seconds / 60:.0f} min"
+
+    def update_state(self):
+        if not self.__replicator.enabled:
+            self.setText("Kopia bazy: wyłączona")
+            self.setStyleSheet("")
+            return
+        stats = self.__replicator.stats()
+        if stats["failures"]:
+            self.setText(f"Kopia bazy: brak połączenia, opóźnienie {self.__format_seconds(stats['lag_s'])} "
+                         f"(ponowienie za {self.__format_seconds(stats['retry_in_s'])})")
+            self.setToolTip(stats["error"])
+            self.setStyleSheet("color: red;")
+        elif stats["lag_s"] > self.LAG_SHOWN_S:
+            self.setText(f"Kopia bazy: opóźnienie {self.__format_seconds(stats['lag_s'])}")
+            self.setStyleSheet("")
+        else:
+            replicated_at = stats["replicated_at"]
+            self.setText("Kopia bazy: aktualna" + (time.strftime(" (%H:%M:%S)", time.localtime(replicated_at))
+                                                   if replicated_at else ""))
+            self.setToolTip("")
+            self.setStyleSheet("")
+
+
+# Replication of the database used by `db_service`
+replicator = Replicator()
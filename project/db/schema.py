@@ -0,0 +1,258 @@
+import sqlite3
+from loguru import logger
+
+
+# Migrations of the database schema, applied in order on top of `create_new_table.sql`.
+# Version of the applied schema is stored in `PRAGMA user_version`.
+# Each migration is a list of single SQL statements (`executescript` would commit the transaction).
+MIGRATIONS: list[list[str]] = [
+    # 1 - precomputed facet counts of orders, kept up to date by triggers
+    [
+        """
+        CREATE TABLE IF NOT EXISTS order_facets (
+            facet TEXT NOT NULL,
+            value NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (facet, value, status)
+        ) WITHOUT ROWID;
+        """,
+        "DELETE FROM order_facets;",
+        """
+        INSERT INTO order_facets (facet, value, status, count)
+        SELECT 'customer', COALESCE(customer_name, ''), status, COUNT(*) FROM orders GROUP BY 2, 3;
+        """,
+        """
+        INSERT INTO order_facets (facet, value, status, count)
+        SELECT 'diameter', diameter, status, COUNT(*) FROM orders GROUP BY 2, 3;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS order_facets_insert AFTER INSERT ON orders
+        BEGIN
+            INSERT INTO order_facets (facet, value, status, count)
+            VALUES ('customer', COALESCE(NEW.customer_name, ''), NEW.status, 1)
+            ON CONFLICT (facet, value, status) DO UPDATE SET count = count + 1;
+            INSERT INTO order_facets (facet, value, status, count)
+            VALUES ('diameter', NEW.diameter, NEW.status, 1)
+            ON CONFLICT (facet, value, status) DO UPDATE SET count = count + 1;
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS order_facets_delete AFTER DELETE ON orders
+        BEGIN
+            UPDATE order_facets SET count = count - 1
+            WHERE facet = 'customer' AND value = COALESCE(OLD.customer_name, '') AND status = OLD.status;
+            UPDATE order_facets SET count = count - 1
+            WHERE facet = 'diameter' AND value = OLD.diameter AND status = OLD.status;
+            DELETE FROM order_facets WHERE count <= 0;
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS order_facets_update AFTER UPDATE OF status, customer_name, diameter ON orders
+        WHEN OLD.status IS NOT NEW.status
+            OR OLD.customer_name IS NOT NEW.customer_name
+            OR OLD.diameter IS NOT NEW.diameter
+        BEGIN
+            UPDATE order_facets SET count = count - 1
+            WHERE facet = 'customer' AND value = COALESCE(OLD.customer_name, '') AND status = OLD.status;
+            UPDATE order_facets SET count = count - 1
+            WHERE facet = 'diameter' AND value = OLD.diameter AND status = OLD.status;
+            DELETE FROM order_facets WHERE count <= 0;
+            INSERT INTO order_facets (facet, value, status, count)
+            VALUES ('customer', COALESCE(NEW.customer_name, ''), NEW.status, 1)
+            ON CONFLICT (facet, value, status) DO UPDATE SET count = count + 1;
+            INSERT INTO order_facets (facet, value, status, count)
+            VALUES ('diameter', NEW.diameter, NEW.status, 1)
+            ON CONFLICT (facet, value, status) DO UPDATE SET count = count + 1;
+        END;
+        """,
+        "CREATE INDEX IF NOT EXISTS orders_customer_name ON orders (customer_name);",
+        "CREATE INDEX IF NOT EXISTS orders_diameter ON orders (diameter);",
+    ],
+    # 2 - orders of one status in the order of the tree (`OrdersDB.get_rows_page`) and the `done_date` window
+    # of the filter are read from one index, without sorting the whole table
+    [
+        "CREATE INDEX IF NOT EXISTS orders_status_done_date ON orders (status, done_date DESC, order_id);",
+    ],
+    # 3 - change feed (`OrdersDB.get_changes_since`): each insert, update and delete of an order takes the next
+    # number of `orders_version`, stored in `row_version` of the order or in `orders_tombstones` for deleted orders
+    [
+        """
+        CREATE TABLE IF NOT EXISTS orders_version (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            version INTEGER NOT NULL
+        );
+        """,
+        "INSERT OR IGNORE INTO orders_version (id, version) VALUES (0, 0);",
+        "ALTER TABLE orders ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0;",
+        "CREATE INDEX IF NOT EXISTS orders_row_version ON orders (row_version);",
+        """
+        CREATE TABLE IF NOT EXISTS orders_tombstones (
+            order_id TEXT PRIMARY KEY NOT NULL,
+            row_version INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        """,
+        "CREATE INDEX IF NOT EXISTS orders_tombstones_row_version ON orders_tombstones (row_version);",
+        """
+        CREATE TRIGGER IF NOT EXISTS orders_version_insert AFTER INSERT ON orders
+        BEGIN
+            UPDATE orders_version SET version = version + 1 WHERE id = 0;
+            UPDATE orders SET row_version = (SELECT version FROM orders_version WHERE id = 0)
+            WHERE rowid = NEW.rowid;
+            DELETE FROM orders_tombstones WHERE order_id = NEW.order_id;
+        END;
+        """,
+        # `row_version` set by the trigger itself does not fire it again
+        """
+        CREATE TRIGGER IF NOT EXISTS orders_version_update AFTER UPDATE ON orders
+        WHEN NEW.row_version IS OLD.row_version
+        BEGIN
+            UPDATE orders_version SET version = version + 1 WHERE id = 0;
+            UPDATE orders SET row_version = (SELECT version FROM orders_version WHERE id = 0)
+            WHERE rowid = NEW.rowid;
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS orders_version_delete AFTER DELETE ON orders
+        BEGIN
+            UPDATE orders_version SET version = version + 1 WHERE id = 0;
+            INSERT INTO orders_tombstones (order_id, row_version)
+            VALUES (OLD.order_id, (SELECT version FROM orders_version WHERE id = 0))
+            ON CONFLICT (order_id) DO UPDATE SET row_version = excluded.row_version;
+        END;
+        """,
+    ],
+    # 4 - archive of old `DONE` orders (`OrdersDB.archive_done_orders`), read only when the history is displayed
+    [
+        """
+        CREATE TABLE IF NOT EXISTS orders_archive (
+            order_id TEXT PRIMARY KEY NOT NULL,
+            status TEXT NOT NULL,
+            customer_name TEXT DEFAULT NULL,
+            quantity INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            diameter REAL NOT NULL,
+            production_time INTEGER DEFAULT NULL,
+            done_date DATETIME DEFAULT NULL,
+            created_at DATETIME DEFAULT NULL,
+            archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        "CREATE INDEX IF NOT EXISTS orders_archive_status_done_date ON orders_archive (status, done_date DESC, order_id);",
+    ],
+    # 5 - one row per finished rope (`OrdersDB.insert_rope_events`), times of the phases in seconds.
+    # `diameter` is copied from the order, so aggregates do not depend on the order being archived.
+    [
+        """
+        CREATE TABLE IF NOT EXISTS rope_events (
+            order_id TEXT NOT NULL,
+            sequence INTEGER NOT NULL,
+            diameter REAL,
+            trigger_length INTEGER,
+            final_length INTEGER,
+            confirmation_s REAL NOT NULL DEFAULT 0,
+            winding_s REAL NOT NULL DEFAULT 0,
+            cutting_s REAL NOT NULL DEFAULT 0,
+            reset_s REAL NOT NULL DEFAULT 0,
+            halted_s REAL NOT NULL DEFAULT 0,
+            finished_at DATETIME NOT NULL
+        );
+        """,
+        "CREATE INDEX IF NOT EXISTS rope_events_order ON rope_events (order_id, sequence);",
+        "CREATE INDEX IF NOT EXISTS rope_events_diameter ON rope_events (diameter);",
+    ],
+    # 6 - production per day and diameter of `DONE` orders (statistics tab), updated by the trigger when an order
+    # is done, so statistics are read without aggregating orders. Rerun of a done order (new `done_date`) is counted again.
+    [
+        """
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            day TEXT NOT NULL,
+            diameter REAL NOT NULL,
+            orders INTEGER NOT NULL DEFAULT 0,
+            ropes INTEGER NOT NULL DEFAULT 0,
+            length_mm INTEGER NOT NULL DEFAULT 0,
+            timed_ropes INTEGER NOT NULL DEFAULT 0,
+            production_time REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, diameter)
+        ) WITHOUT ROWID;
+        """,
+        "DELETE FROM daily_stats;",
+        """
+        INSERT INTO daily_stats (day, diameter, orders, ropes, length_mm, timed_ropes, production_time)
+        SELECT date(done_date), diameter, COUNT(*), SUM(quantity), SUM(quantity * length),
+            SUM(CASE WHEN production_time IS NULL THEN 0 ELSE quantity END), COALESCE(SUM(production_time), 0)
+        FROM (
+            SELECT done_date, diameter, quantity, length, production_time FROM orders
+            WHERE status = 'DONE' AND done_date IS NOT NULL
+            UNION ALL
+            SELECT done_date, diameter, quantity, length, production_time FROM orders_archive
+            WHERE status = 'DONE' AND done_date IS NOT NULL
+        )
+        GROUP BY 1, 2;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS daily_stats_done AFTER UPDATE OF status, done_date ON orders
+        WHEN NEW.status = 'DONE' AND NEW.done_date IS NOT NULL
+            AND (OLD.status IS NOT 'DONE' OR OLD.done_date IS NOT NEW.done_date)
+        BEGIN
+            INSERT INTO daily_stats (day, diameter, orders, ropes, length_mm, timed_ropes, production_time)
+            VALUES (date(NEW.done_date), NEW.diameter, 1, NEW.quantity, NEW.quantity * NEW.length,
+                    CASE WHEN NEW.production_time IS NULL THEN 0 ELSE NEW.quantity END,
+                    COALESCE(NEW.production_time, 0))
+            ON CONFLICT (day, diameter) DO UPDATE SET
+                orders = orders + 1,
+                ropes = ropes + excluded.ropes,
+                length_mm = length_mm + excluded.length_mm,
+                timed_ropes = timed_ropes + excluded.timed_ropes,
+                production_time = production_time + excluded.production_time;
+        END;
+        """,
+    ],
+    # 7 - manifest of the ingested `.csv` files (`OrdersDB.ingest_csv_files`), written in the transaction of their
+    # orders and deleted when the file is archived, so a file of committed orders is archived after a crash
+    # instead of being read again
+    [
+        """
+        CREATE TABLE IF NOT EXISTS csv_manifest (
+            file TEXT PRIMARY KEY,
+            archive_path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            ingested_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+    ],
+]
+
+
+def schema_version(connection: sqlite3.Connection) -> int:
+    return connection.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def migrate(connection: sqlite3.Connection):
+    """
+    Apply missing migrations to the database. Each migration is applied in its own transaction,
+    so the database opened by several connections at once is migrated only once.
+    """
+    if schema_version(connection) >= len(MIGRATIONS):
+        return
+
+    for version, statements in enumerate(MIGRATIONS, start=1):
+        cursor = connection.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE;")
+            # Check again, the other connection could apply it in the meantime
+            if schema_version(connection) >= version:
+                connection.rollback()
+                continue
+            for sql in statements:
+                cursor.execute(sql)
+            cursor.execute(f"PRAGMA user_version = {version};")
+            connection.commit()
+            logger.success(f"Database schema migrated to version {version}")
+        except sqlite3.Error:
+            connection.rollback()
+            logger.error(f"Database schema migration to version {version} failed")
+            raise
+        finally:
+            cursor.close()
@@ -0,0 +1,221 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from loguru import logger
+
+# Directory of the application (`project`), relative paths of the database are resolved against it
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Local primary database, copied to `windows_SHARED/DB` by `db/replication.py`
+DEFAULT_DB_PATH = os.path.join("local_DB", "winding_machine.db")
+
+
+def resolve_db_path(db_path: str = None) -> str:
+    """
+    Returns absolute path of the orders database: `db_path`, `ORDERS_DB_PATH` env or the default local path. Relative paths are resolved against the `project` directory, not the working directory.
+    """
+    path = db_path or os.getenv("ORDERS_DB_PATH") or DEFAULT_DB_PATH
+    path = os.path.expanduser(path)
+    if not os.path.isabs(path):
+        path = os.path.join(PROJECT_DIR, path)
+    return os.path.normpath(path)
+
+
+class DBRequest:
+    """
+    Call of the `OrdersDB` action queued in `DBService`, completed with the result or the exception in `future`
+    """
+    __slots__ = ("action_name", "args", "kwargs", "future", "submitted")
+
+    def __init__(self, action_name, args: tuple, kwargs: dict):
+        self.action_name = action_name
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.submitted = time.perf_counter()
+
+
+class DBService:
+    """
+    DBService
+    ---
+
+    The only thread which uses the orders database. It owns one long-lived `OrdersDB` connection
+    and executes queued actions one by one, so writes never run concurrently and no request is dropped.
+    Each `submit` returns a `Future` completed with the result of the action or with its exception.
+
+    The connection is opened (and the schema migrated) by the service thread on the first request.
+    Time each action waited in the queue and its execution time are recorded, actions slower than
+    `SLOW_ACTION_MS` are written to the log as warnings.
+    `listeners` are called in the service thread with the name of each action which changed the database
+    (e.g. `Replicator.notify`). While the service is held (`hold`), the database is not opened, so it is not
+    created before the local database is copied from the shared directory (`Replicator.start`).
+
+    Parameters
+    ---
+
+    :db_path: path of the database, resolved by `resolve_db_path` when the connection is opened
+    """
+    SLOW_ACTION_MS = 500
+    # Number of the last timings of each action kept for percentiles
+    TIMINGS_WINDOW = 200
+
+    def __init__(self, db_path: str = None):
+        self.__db_path = db_path
+        self.__queue: queue.Queue[DBRequest] = queue.Queue()
+        self.__lock = threading.Lock()
+        self.__thread: threading.Thread = None
+        # Execution times [s] `action name: deque`
+        self.__timings: dict[str, deque] = {}
+        self.__waits: deque[float] = deque(maxlen=self.TIMINGS_WINDOW)
+        self.__errors = 0
+        self.listeners = []
+        # Cleared by `hold`, the connection is opened only when it is set
+        self.__open_allowed = threading.Event()
+        self.__open_allowed.set()
+        self.__hold_reason: str = None
+
+    def submit(self, action_name, *args, **kwargs) -> Future:
+        """
+        Queue the `OrdersDBActions` action, returns `Future` of its result
+        """
+        request = DBRequest(action_name, args, kwargs)
+        with self.__lock:
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__thread = threading.Thread(
+                    target=self.__run, daemon=True, name="DB_thread")
+                self.__thread.start()
+            self.__queue.put(request)
+        return request.future
+
+    def start(self, worker):
+        """
+        Queue the action of `OrdersDBWorker`, its signals are emitted when the action is finished
+        """
+        future = self.submit(worker.action_name, *worker.args, **worker.kwargs)
+        future.add_done_callback(worker.finished)
+
+    def call(self, action_name, *args, timeout: float = None, **kwargs):
+        """
+        Execute the action and wait for its result, the exception of the action is raised
+        """
+        return self.submit(action_name, *args, **kwargs).result(timeout)
+
+    def hold(self, reason: str):
+        """
+        Do not open the database until `release`, requests wait in the queue
+        """
+        self.__hold_reason = reason
+        self.__open_allowed.clear()
+
+    def release(self):
+        """
+        Allow the database to be opened, waiting requests are executed
+        """
+        self.__hold_reason = None
+        self.__open_allowed.set()
+
+    def __run(self):
+        # Imported here, `db.db` uses this module
+        from db.db import OrdersDB
+
+        db = None
+        while True:
+            request = self.__queue.get()
+            if request is None:
+                break
+            if not request.future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            try:
+                if db is None:
+                    self.__open_allowed.wait()
+                    if self.__hold_reason is not None:
+                        # Service stopped while held, the database is never created
+                        raise RuntimeError(self.__hold_reason)
+                    db = OrdersDB(resolve_db_path(self.__db_path))
+                changes = db.connection.total_changes
+                result = db.execute(request.action_name,
+                                    *request.args, **request.kwargs)
+            except Exception as e:
+                self.__record(request, started, failed=True)
+                request.future.set_exception(e)
+            else:
+                self.__record(request, started)
+                request.future.set_result(result)
+                if db.connection.total_changes != changes:
+                    self.__notify(request.action_name)
+
+        if db is not None:
+            db.connection.close()
+
+    def __notify(self, action_name):
+        for listener in self.listeners:
+            try:
+                listener(action_name)
+            except Exception as e:
+                logger.error(f"DB service listener failed: {e}")
+
+    def __record(self, request: DBRequest, started: float, failed: bool = False):
+        finished = time.perf_counter()
+        duration = finished - started
+        name = request.action_name.name
+        with self.__lock:
+            self.__waits.append(started - request.submitted)
+            self.__timings.setdefault(name, deque(
+                maxlen=self.TIMINGS_WINDOW)).append(duration)
+            if failed:
+                self.__errors += 1
+        if duration * 1000 > self.SLOW_ACTION_MS:
+            logger.warning(
+                f"DB action `{name}` took {duration * 1000:.0f} ms ({self.__queue.qsize()} queued)")
+
+    def stats(self) -> dict:
+        """
+        Returns number of queued requests, errors, queue wait and execution times [ms] of each action
+        (count, median, 99th percentile and maximum of the last `TIMINGS_WINDOW` calls)
+        """
+        def summary(values) -> dict:
+            values = sorted(values)
+            return {
+                "count": len(values),
+                "p50_ms": values[len(values) // 2] * 1000 if values else 0.0,
+                "p99_ms": values[int(len(values) * 0.99)] * 1000 if values else 0.0,
+                "max_ms": values[-1] * 1000 if values else 0.0,
+            }
+
+        with self.__lock:
+            return {
+                "queued": self.__queue.qsize(),
+                "errors": self.__errors,
+                "wait": summary(self.__waits),
+                "actions": {name: summary(timings) for name, timings in self.__timings.items()},
+            }
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        parts = [f"{stats['queued']} queued, {stats['errors']} errors, wait p99 {stats['wait']['p99_ms']:.1f} ms"]
+        for name, action in stats["actions"].items():
+            parts.append(
+                f"{name}: {action['count']}x p50 {action['p50_ms']:.1f} ms p99 {action['p99_ms']:.1f} ms max {action['max_ms']:.1f} ms")
+        return " | ".join(parts)
+
+    def stop(self, timeout: float = None):
+        """
+        Execute already queued requests, then close the connection and end the thread
+        """
+        with self.__lock:
+            thread = self.__thread
+            if thread is None:
+                return
+            self.__queue.put(None)
+            self.__thread = None
+        # Requests waiting for `release` fail
+        self.__open_allowed.set()
+        thread.join(timeout)
+
+
+# Service shared by all modules
+db_service = DBService()
@@ -0,0 +1,253 @@
+import csv
+import os
+import threading
+import time
+from loguru import logger
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from db.db import OrdersDBActions
+from db.read_csv import CSVReader
+from db.service import db_service
+
+
+class TempScanner(QObject):
+    """
+    TempScanner
+    ---
+
+    Watches the `TEMP` exchange directory (CIFS mount, no inotify) in its own thread and ingests new `.csv` files
+    without the operator's action (`OrdersDB.ingest_csv_files`), `ingested` is emitted with the number of files.
+
+    Each poll stats the directory first; the directory is listed (`os.scandir`) only when its mtime changed,
+    while there are files waiting to settle, and every `FULL_SCAN_S` (mtime of a CIFS directory may be cached).
+    The interval starts at `MIN_INTERVAL_S` after a change and is doubled by each idle poll up to `MAX_INTERVAL_S`.
+    A file is ingested when its size and mtime were unchanged for `SETTLE_S` (it is not being copied anymore).
+    A file which failed to be read (not a valid `.csv` file of orders) is retried only after it is changed.
+    Files which were not ingested because of the database (locked, stopping, not available) are kept waiting
+    and retried after `MIN_INTERVAL_S`, doubled after each next failure up to `MAX_INTERVAL_S`.
+
+    Every stat and listing of the share is counted as a round trip, `stats` reports round trips per idle minute.
+
+    Parameters
+    ---
+
+    :temp_dir: directory of the `.csv` files, `None` means the directory of `CSVReader`
+    """
+    ingested = pyqtSignal(int)
+    MIN_INTERVAL_S = 1
+    MAX_INTERVAL_S = 16
+    SETTLE_S = 2
+    FULL_SCAN_S = 60
+    STOP_TIMEOUT_S = 10
+
+    def __init__(self, temp_dir: str = None, parent: QObject = None):
+        super().__init__(parent)
+        self.__temp_dir = temp_dir
+        self.__lock = threading.Lock()
+        self.__wake = threading.Event()
+        self.__thread: threading.Thread = None
+        self.__stopping = False
+        self.__dir_mtime: int = None
+        self.__last_listing = 0.0
+        # Files waiting to settle `path: ((size, mtime), stable since)`
+        self.__pending: dict[str, tuple] = {}
+        # Files which failed to be read `path: (size, mtime)`
+        self.__failed: dict[str, tuple] = {}
+        self.__available = True
+        self.__interval = self.MIN_INTERVAL_S
+        # Retry of the files not ingested because of the database
+        self.__retry_delay = 0
+        self.__retry_at = 0.0
+        # Statistics
+        self.__polls = 0
+        self.__listings = 0
+        self.__round_trips = 0
+        self.__idle_round_trips = 0
+        self.__idle_time = 0.0
+        self.__files = 0
+        self.__errors = 0
+        self.__retries = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.__thread is not None
+
+    def start(self):
+        """
+        Start the scanner thread, disabled by `TEMP_SCANNER=False` env
+        """
+        if os.getenv("TEMP_SCANNER", 'True') != 'True':
+            logger.info("TEMP scanner disabled")
+            return
+        if self.__temp_dir is None:
+            self.__temp_dir = CSVReader().path_to_temp_dir
+        self.__thread = threading.Thread(
+            target=self.__run, daemon=True, name="TEMP_scanner")
+        self.__thread.start()
+
+    def __run(self):
+        last_poll = time.perf_counter()
+        while not self.__stopping:
+            started = time.perf_counter()
+            round_trips = self.__round_trips
+            active = self.__poll()
+            with self.__lock:
+                self.__polls += 1
+                if active:
+                    self.__interval = self.MIN_INTERVAL_S
+                else:
+                    # Idle poll, the time since the previous poll is idle time
+                    self.__idle_round_trips += self.__round_trips - round_trips
+                    self.__idle_time += started - last_poll
+                    self.__interval = min(self.__interval * 2, self.MAX_INTERVAL_S)
+                interval = self.__interval
+            last_poll = started
+            self.__wake.wait(interval)
+
+    def __poll(self) -> bool:
+        """
+        Returns `True` if anything was changed or is waiting to settle
+        """
+        now = time.perf_counter()
+        try:
+            self.__round_trips += 1
+            dir_mtime = os.stat(self.__temp_dir).st_mtime_ns
+            if dir_mtime == self.__dir_mtime and not self.__pending \
+                    and now - self.__last_listing < self.FULL_SCAN_S:
+                return False
+            files = self.__list_files()
+        except OSError as e:
+            if self.__available:
+                logger.error(f"TEMP directory {self.__temp_dir} is not available: {e}")
+                self.__available = False
+            return False
+        if not self.__available:
+            logger.success(f"TEMP directory {self.__temp_dir} is available again")
+            self.__available = True
+        changed = dir_mtime != self.__dir_mtime
+        self.__dir_mtime = dir_mtime
+        self.__last_listing = now
+
+        # Files which are not in the directory anymore are forgotten
+        self.__pending = {path: state for path, state in self.__pending.items() if path in files}
+        self.__failed = {path: signature for path, signature in self.__failed.items() if path in files}
+        ready = []
+        for path, signature in files.items():
+            if self.__failed.get(path) == signature:
+                continue
+            previous = self.__pending.get(path)
+            if previous is None or previous[0] != signature:
+                self.__pending[path] = (signature, now)
+                changed = True
+            elif now - previous[1] >= self.SETTLE_S:
+                ready.append(path)
+
+        if ready and now >= self.__retry_at:
+            for path in ready:
+                del self.__pending[path]
+            self.__ingest(ready, files)
+            changed = True
+        # Files ready to be retried after the failure of the database are not waiting to settle
+        settling = any(now - since < self.SETTLE_S for _, since in self.__pending.values())
+        return changed or settling
+
+    def __list_files(self) -> dict[str, tuple]:
+        """
+        Returns `.csv` files of the directory `path: (size, mtime)`, the same files as `glob("*.csv")`
+        """
+        files = {}
+        self.__round_trips += 1
+        self.__listings += 1
+        with os.scandir(self.__temp_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.name.endswith(".csv"):
+                    continue
+                self.__round_trips += 1
+                stat = entry.stat()
+                files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def __ingest(self, ready: list[str], files: dict[str, tuple]) -> bool:
+        """
+        Returns `False` if the files were not ingested because of the database, they are retried later
+        """
+        try:
+            counts = db_service.call(OrdersDBActions.ingest_csv_files, ready)
+        except (ValueError, csv.Error) as e:
+            # File is not valid (`CSVReader`), nothing was written
+            if len(ready) > 1:
+                # Files are ingested one by one, so only the broken file is left in TEMP
+                for i, path in enumerate(ready):
+                    if not self.__ingest([path], files):
+                        self.__defer(ready[i + 1:], files)
+                        return False
+                return True
+            # Not read again until the file is changed
+            self.__failed.update({path: files[path] for path in ready})
+            with self.__lock:
+                self.__errors += 1
+            logger.error(f"Orders of {os.path.basename(ready[0])} from TEMP were NOT ingested: {e}")
+            return True
+        except Exception as e:
+            self.__defer(ready, files)
+            logger.error(f"Orders of {len(ready)} files from TEMP were NOT ingested, "
+                         f"retry in {self.__retry_delay} s: {e}")
+            return False
+        self.__retry_delay = 0
+        self.__retry_at = 0.0
+        with self.__lock:
+            self.__files += len(ready)
+        self.ingested.emit(len(ready))
+        logger.success(f"Orders of {len(ready)} files from TEMP ingested ({counts})")
+        return True
+
+    def __defer(self, paths: list[str], files: dict[str, tuple]):
+        """
+        Keep the files waiting (already settled) until the retry after the failure of the database
+        """
+        if not paths:
+            return
+        now = time.perf_counter()
+        if self.__retry_at <= now:
+            self.__retry_delay = min(self.__retry_delay * 2, self.MAX_INTERVAL_S) or self.MIN_INTERVAL_S
+            self.__retry_at = now + self.__retry_delay
+        for path in paths:
+            self.__pending[path] = (files[path], now - self.SETTLE_S)
+        with self.__lock:
+            self.__retries += 1
+
+    def stats(self) -> dict:
+        """
+        Returns number of polls, listings of the directory, round trips to the share (stats and listings),
+        round trips per idle minute, current interval [s], number of ingested files, broken files
+        and ingestions retried because of the database
+        """
+        with self.__lock:
+            return {
+                "polls": self.__polls,
+                "listings": self.__listings,
+                "round_trips": self.__round_trips,
+                "idle_round_trips_per_min": self.__idle_round_trips / self.__idle_time * 60 if self.__idle_time else 0.0,
+                "interval_s": self.__interval,
+                "files": self.__files,
+                "errors": self.__errors,
+                "retries": self.__retries,
+            }
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        return (f"{stats['polls']} polls, {stats['listings']} listings, {stats['round_trips']} round trips "
+                f"({stats['idle_round_trips_per_min']:.1f}/idle min), {stats['files']} files ingested, "
+                f"{stats['errors']} errors, {stats['retries']} retries")
+
+    def stop(self, timeout: float = STOP_TIMEOUT_S):
+        """
+        Stop the scanner thread, an ingestion in progress is finished
+        """
+        self.__stopping = True
+        self.__wake.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+
+
+temp_scanner = TempScanner()
@@ -0,0 +1,113 @@
+import os
+import re
+import sqlite3
+from loguru import logger
+
+# Filesystems on which the database file is accessed over the network (`windows_SHARED` is mounted with CIFS)
+NETWORK_FILESYSTEMS = ("cifs", "smb3", "smbfs", "nfs", "nfs4", "fuse.sshfs")
+
+
+class ConnectionProfile:
+    """
+    ConnectionProfile
+    ---
+
+    Settings of the SQLite connection (`PRAGMA`s and the size of the prepared statements cache).
+
+    - `journal_mode` - `WAL` needs shared memory of the `-shm` file, which is not safe on network filesystems,
+    - `synchronous` - `NORMAL` is safe with `WAL` (only the last transactions may be lost after a power loss),
+      rollback journals need `FULL`,
+    - `mmap_size` - memory mapped reads [bytes], `0` disables them (not safe on network filesystems),
+    - `cache_size` - page cache, negative values are in KiB,
+    - `cached_statements` - number of prepared statements kept by the connection.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            journal_mode: str,
+            synchronous: str,
+            mmap_size: int,
+            cache_size: int = -8000,
+            cached_statements: int = 128
+    ):
+        self.name = name
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.cached_statements = cached_statements
+
+    def __str__(self):
+        return (f"{self.name} (journal_mode={self.journal_mode}, synchronous={self.synchronous}, "
+                f"mmap_size={self.mmap_size}, cache_size={self.cache_size})")
+
+
+PROFILES = {
+    "local": ConnectionProfile("local", journal_mode="WAL", synchronous="NORMAL", mmap_size=64 * 1024 * 1024),
+    # `TRUNCATE` avoids deleting and creating the journal file on the server for each transaction
+    "network": ConnectionProfile("network", journal_mode="TRUNCATE", synchronous="FULL", mmap_size=0),
+    # SQLite defaults, for comparison in benchmarks
+    "default": ConnectionProfile("default", journal_mode="DELETE", synchronous="FULL", mmap_size=0,
+                                 cache_size=-2000),
+}
+
+
+def _unescape_mount_point(path: str) -> str:
+    # `/proc/mounts` escapes spaces, tabs, new lines and backslashes as octal numbers
+    return re.sub(r"\\([0-7]{3})", lambda match: chr(int(match.group(1), 8)), path)
+
+
+def filesystem_type(path: str, mounts_file: str = "/proc/mounts") -> str:
+    """
+    Returns type of the filesystem (e.g. `ext4`, `cifs`) on which `path` is, `None` if it is unknown
+    """
+    directory = os.path.dirname(os.path.realpath(path))
+    best_mount, best_type = "", None
+    try:
+        with open(mounts_file) as mounts:
+            for line in mounts:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = _unescape_mount_point(fields[1])
+                prefix = mount_point.rstrip("/") + "/"
+                if (directory == mount_point or (directory + "/").startswith(prefix)) \
+                        and len(mount_point) >= len(best_mount):
+                    best_mount, best_type = mount_point, fields[2]
+    except OSError:
+        return None
+    return best_type
+
+
+def select_profile(path: str) -> ConnectionProfile:
+    """
+    Returns profile from the `ORDERS_DB_PROFILE` env (`local`, `network`, `default`),
+    or chosen by the filesystem of the database file if the env is not set or is `auto`
+    """
+    name = os.getenv("ORDERS_DB_PROFILE", "auto")
+    if name in PROFILES:
+        return PROFILES[name]
+    if filesystem_type(path) in NETWORK_FILESYSTEMS:
+        return PROFILES["network"]
+    return PROFILES["local"]
+
+
+def connect(path: str, profile: ConnectionProfile = None) -> sqlite3.Connection:
+    """
+    Open the database with `profile` (chosen by `select_profile` if not given)
+    """
+    profile = profile or select_profile(path)
+    connection = sqlite3.connect(
+        path, cached_statements=profile.cached_statements)
+    journal_mode = connection.execute(
+        f"PRAGMA journal_mode = {profile.journal_mode};").fetchone()[0]
+    if journal_mode.upper() != profile.journal_mode:
+        logger.warning(
+            f"Database journal mode {profile.journal_mode} not set, {journal_mode} is used")
+    connection.execute(f"PRAGMA synchronous = {profile.synchronous};")
+    connection.execute(f"PRAGMA mmap_size = {profile.mmap_size};")
+    connection.execute(f"PRAGMA cache_size = {profile.cache_size};")
+    connection.execute("PRAGMA temp_store = MEMORY;")
+    logger.info(f"Database {path} opened with profile {profile}")
+    return connection
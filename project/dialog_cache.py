@@ -0,0 +1,185 @@
+import time
+from collections import deque
+from loguru import logger
+from PyQt5.QtCore import QObject, QEvent, QTimer
+from PyQt5.QtWidgets import QMainWindow, QDialog
+
+from encoder import Encoder
+from buzzer import Buzzer
+from machine_control import MachineControl
+from LOGS.error_handling import ErrorDialog
+from winding_in_progres import WindingInProgressDialog
+from orders.order import Order
+from orders.confirmation_DONE_run import ConfirmationDONERun
+from orders.confirmation_mark_as_DONE import ConfirmationMarkAsDone
+from orders.confirmation_print_label import ConfirmationPrintLabel
+
+
+class DialogCache(QObject):
+    """
+    DialogCache
+    ---
+
+    `DialogCache` keeps one pre-built instance of each frequently used dialog.
+    Loading `.ui` templates, fonts and stylesheets is done once by `warm_up()`, after the main window is shown,
+    and each request only re-initialises the cached dialog with new data.
+
+    If the cached dialog is still in use (e.g. an error raised from inside an error dialog handler),
+    a new dialog is built as before, so a dialog is never executed recursively.
+
+    The time from the request to the first paint of the dialog is written to the log.
+
+    Parameters
+    ---
+
+    :parent_class: main window of the application
+    :ui_templates_dir: path to `.ui` templates
+    :machine_control: instance of `MachineControl`
+    :encoder: instance of `Encoder`
+    :buzzer: instance of `Buzzer`
+    """
+
+    def __init__(
+            self,
+            parent_class: QMainWindow,
+            ui_templates_dir: str,
+            machine_control: MachineControl,
+            encoder: Encoder,
+            buzzer: Buzzer
+    ):
+        super().__init__()
+        self.__parent_class = parent_class
+        self.__ui_templates_dir = ui_templates_dir
+        self.__machine_control = machine_control
+        self.__encoder = encoder
+        self.__buzzer = buzzer
+
+        # Cached dialogs `'name': dialog`
+        self.__dialogs: dict[str, QDialog] = {}
+        # Names of dialogs which are currently checked out
+        self.__busy: set[str] = set()
+        # Dialogs waiting for the first paint `dialog: (name, request time)`
+        self.__requested: dict[QDialog, tuple[str, float]] = {}
+
+        # Dialog factories `'name': function building the dialog`
+        self.__factories = {
+            "winding": lambda: WindingInProgressDialog(
+                parent_class=self.__parent_class,
+                ui_templates_dir=self.__ui_templates_dir,
+                machine_control=self.__machine_control,
+                encoder=self.__encoder,
+                buzzer=self.__buzzer
+            ),
+            "error": lambda: ErrorDialog(
+                self.__parent_class, None, None, self.__buzzer),
+            "confirmation_DONE_run": lambda: ConfirmationDONERun(
+                self.__parent_class, self.__ui_templates_dir),
+            "confirmation_mark_as_DONE": lambda: ConfirmationMarkAsDone(
+                self.__parent_class, self.__ui_templates_dir),
+            "confirmation_print_label": lambda: ConfirmationPrintLabel(
+                self.__parent_class, self.__ui_templates_dir),
+        }
+
+    def warm_up(self):
+        """
+        Build all cached dialogs, one per event loop iteration, so the GUI stays responsive.
+        """
+        pending = deque(name for name in self.__factories
+                        if name not in self.__dialogs)
+
+        def build_next():
+            if not pending:
+                logger.info("Dialog cache warmed up")
+                return
+            self.__build(pending.popleft())
+            QTimer.singleShot(0, build_next)
+
+        QTimer.singleShot(0, build_next)
+
+    def __build(self, name: str) -> QDialog:
+        start = time.perf_counter()
+        dialog = self.__factories[name]()
+        dialog.installEventFilter(self)
+        self.__dialogs[name] = dialog
+        logger.debug(
+            f"Dialog `{name}` built in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return dialog
+
+    def __checkout(self, name: str) -> QDialog:
+        """
+        Return the cached dialog with dropped connections from its previous use.
+        If the cached dialog is busy, then a new (uncached) dialog is returned.
+        """
+        requested_at = time.perf_counter()
+        if name in self.__busy:
+            dialog = self.__factories[name]()
+            dialog.installEventFilter(self)
+            self.__requested[dialog] = (f"{name} (uncached)", requested_at)
+            return dialog
+
+        dialog = self.__dialogs.get(name)
+        if dialog is None:
+            dialog = self.__build(name)
+        for signal in (dialog.accepted, dialog.rejected, dialog.finished):
+            try:
+                signal.disconnect()
+            except TypeError:
+                # Signal has no connections
+                pass
+
+        self.__busy.add(name)
+        # Release the dialog after `exec` has returned
+        dialog.finished.connect(
+            lambda _: QTimer.singleShot(0, lambda: self.__busy.discard(name)))
+        self.__requested[dialog] = (name, requested_at)
+        return dialog
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Paint and obj in self.__requested:
+            name, requested_at = self.__requested.pop(obj)
+            logger.info(
+                f"Dialog `{name}` on screen after {(time.perf_counter() - requested_at) * 1000:.1f} ms")
+        return super().eventFilter(obj, event)
+
+    def is_winding_in_progress(self) -> bool:
+        """
+        Return `True` if the winding dialog is currently in use
+        """
+        return "winding" in self.__busy
+
+    def winding_dialog(
+            self,
+            length_target: int,
+            quantity_target: int,
+            diameter: float,
+            order_id: str,
+            customer_name: str = "",
+            ropes_done: int = 0,
+            runtime_s: float = 0.0
+    ) -> WindingInProgressDialog:
+        dialog: WindingInProgressDialog = self.__checkout("winding")
+        dialog.load_order(length_target, quantity_target,
+                          diameter, order_id, customer_name, ropes_done, runtime_s)
+        return dialog
+
+    def error_dialog(self, error_title: str, error_desc: str, printer_error: bool = False) -> ErrorDialog:
+        dialog: ErrorDialog = self.__checkout("error")
+        dialog.set_error(error_title, error_desc, printer_error)
+        return dialog
+
+    def confirmation_DONE_run(self, order: Order) -> ConfirmationDONERun:
+        dialog: ConfirmationDONERun = self.__checkout("confirmation_DONE_run")
+        dialog.set_order(order)
+        return dialog
+
+    def confirmation_mark_as_DONE(self, order: Order) -> ConfirmationMarkAsDone:
+        dialog: ConfirmationMarkAsDone = self.__checkout(
+            "confirmation_mark_as_DONE")
+        dialog.set_order(order)
+        return dialog
+
+    def confirmation_print_label(self, order: Order) -> ConfirmationPrintLabel:
+        dialog: ConfirmationPrintLabel = self.__checkout(
+            "confirmation_print_label")
+        dialog.set_order(order)
+        return dialog
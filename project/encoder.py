@@ -25,6 +25,8 @@ class Encoder:
     __is_initial_run = True
     # Distance in mm per one puls [mm/puls]. Circumference of measuring wheel is 200 mm and encoder gives 3600 pulses per rotation.
     _step_in_mm = 200/3600
+    # Number of handled encoder edges, for the performance monitor
+    __edges = 0
 
     def __init__(self, pi: pigpio.pi,):
         """
@@ -57,6 +59,7 @@ class Encoder:
 
         `WARNING:` tick wraps around from 4294967295 to 0 roughly every 72 minutes
         """
+        self.__edges += 1
         if gpio == self.A:
             # The encoder rotates clockwise when the rising edge of signal B is ahead of the falling edge of signal A.
             if self.__direction:
@@ -70,6 +73,12 @@ class Encoder:
             else:
                 self.__direction = 0
 
+    def edges(self) -> int:
+        """
+        Returns number of encoder edges handled since the start of the application
+        """
+        return self.__edges
+
     def __str__(self) -> str:
         """
         Returns value of `__measured_length` in `str` format
@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+from collections import deque
+from loguru import logger
+from PyQt5.QtCore import QRunnable, QThread, QThreadPool
+
+
+class _TimedRunnable(QRunnable):
+    """
+    Runs `runnable` on the executor's thread and records how long it waited in the queue
+    """
+
+    def __init__(self, executor: "Executor", runnable: QRunnable):
+        super().__init__()
+        self.__executor = executor
+        self.__runnable = runnable
+        self.__submitted = time.perf_counter()
+
+    def run(self):
+        self.__executor._started(time.perf_counter() - self.__submitted)
+        try:
+            self.__runnable.run()
+        finally:
+            self.__executor._finished()
+
+
+class Executor:
+    """
+    Executor
+    ---
+
+    Named thread pool (lane) with its own number of threads and priority of the threads.
+    Time each task waits for a free thread is recorded, so starvation of the lane shows up in `stats()`
+    and as a warning in the log when the wait is longer than `wait_warning_ms`.
+
+    Parameters
+    ---
+
+    :name: name of the lane used in the log
+    :max_threads: number of threads of the lane
+    :priority: `QThread.Priority` of the threads
+    :nice: Linux niceness of the threads, lower value means higher priority (negative values need `CAP_SYS_NICE`)
+    :wait_warning_ms: queue wait time [ms] above which a warning is written to the log
+    :keep_threads: threads are never expired, so a task does not wait for a new thread
+    """
+    # Number of the last waits kept for percentiles
+    WAITS_WINDOW = 500
+
+    def __init__(
+            self,
+            name: str,
+            max_threads: int,
+            priority: QThread.Priority,
+            nice: int,
+            wait_warning_ms: float,
+            keep_threads: bool = False
+    ):
+        self.name = name
+        self.__priority = priority
+        self.__nice = nice
+        self.__wait_warning = wait_warning_ms / 1000
+        self.__pool = QThreadPool()
+        self.__pool.setMaxThreadCount(max_threads)
+        if keep_threads:
+            self.__pool.setExpiryTimeout(-1)
+
+        self.__lock = threading.Lock()
+        # Threads of the pool which already have the priority set
+        self.__prepared = threading.local()
+        self.__nice_failed = False
+        self.__waits: deque[float] = deque(maxlen=self.WAITS_WINDOW)
+        self.__submitted = 0
+        self.__queued = 0
+        self.__active = 0
+        self.__completed = 0
+        self.__max_wait = 0.0
+
+    def start(self, runnable: QRunnable):
+        """
+        Queue `runnable` to be run on the lane
+        """
+        with self.__lock:
+            self.__submitted += 1
+            self.__queued += 1
+        self.__pool.start(_TimedRunnable(self, runnable))
+
+    def _started(self, wait: float):
+        self.__prepare_thread()
+        with self.__lock:
+            self.__queued -= 1
+            self.__active += 1
+            self.__waits.append(wait)
+            self.__max_wait = max(self.__max_wait, wait)
+            queued = self.__queued
+        if wait > self.__wait_warning:
+            logger.warning(
+                f"Executor `{self.name}`: task waited {wait * 1000:.1f} ms for a thread ({queued} still queued)")
+
+    def _finished(self):
+        with self.__lock:
+            self.__active -= 1
+            self.__completed += 1
+
+    def __prepare_thread(self):
+        # Priority is set once for each thread of the pool
+        if getattr(self.__prepared, "done", False):
+            return
+        self.__prepared.done = True
+        QThread.currentThread().setPriority(self.__priority)
+        if self.__nice == 0:
+            return
+        try:
+            os.setpriority(os.PRIO_PROCESS,
+                           threading.get_native_id(), self.__nice)
+        except (OSError, AttributeError) as e:
+            if not self.__nice_failed:
+                self.__nice_failed = True
+                logger.warning(
+                    f"Executor `{self.name}`: niceness {self.__nice} not set ({e})")
+
+    def stats(self) -> dict:
+        """
+        Returns counters of the lane and queue wait times [ms] (median, 99th percentile and maximum)
+        """
+        with self.__lock:
+            waits = sorted(self.__waits)
+            stats = {
+                "submitted": self.__submitted,
+                "queued": self.__queued,
+                "active": self.__active,
+                "completed": self.__completed,
+                "max_wait_ms": self.__max_wait * 1000,
+            }
+        stats["p50_wait_ms"] = waits[len(waits) // 2] * 1000 if waits else 0.0
+        stats["p99_wait_ms"] = waits[int(len(waits) * 0.99)] * 1000 if waits else 0.0
+        return stats
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        return self.__pool.waitForDone(msecs)
+
+
+class Executors:
+    """
+    Executors
+    ---
+
+    Lanes of the application threads, instead of the shared `QThreadPool.globalInstance()`:
+    - `machine` - short, realtime machine commands (`MachineWorker`), highest priority,
+    - `monitor` - long-running loops (`MonitorProcess`, `NextRope`), each holds a thread for a long time,
+    - `io` - slow background work (label printing), bounded number of threads with low priority.
+
+    The orders database has its own thread (`db.service.db_service`).
+    """
+
+    def __init__(self):
+        self.machine = Executor("machine", max_threads=3, priority=QThread.TimeCriticalPriority,
+                                nice=-5, wait_warning_ms=20, keep_threads=True)
+        self.monitor = Executor("monitor", max_threads=3, priority=QThread.HighPriority,
+                                nice=0, wait_warning_ms=100)
+        self.io = Executor("io", max_threads=2, priority=QThread.LowPriority,
+                           nice=5, wait_warning_ms=2000)
+
+    def lanes(self) -> list[Executor]:
+        return [self.machine, self.monitor, self.io]
+
+    def format_stats(self) -> str:
+        """
+        Return stats of all lanes as one line
+        """
+        parts = []
+        for lane in self.lanes():
+            stats = lane.stats()
+            parts.append(
+                f"{lane.name}: {stats['active']} active, {stats['queued']} queued, {stats['completed']} done, "
+                f"wait p50 {stats['p50_wait_ms']:.1f} ms p99 {stats['p99_wait_ms']:.1f} ms max {stats['max_wait_ms']:.1f} ms")
+        return " | ".join(parts)
+
+
+# Executors shared by all modules
+executors = Executors()
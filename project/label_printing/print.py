@@ -1,7 +1,6 @@
-import zpl
-import cups
-from zebra import Zebra
 from datetime import datetime
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+# `zpl`, `cups` and `zebra` are imported on first use, so they are not loaded at application startup
 
 # Install cups, cups-bsd, and lpr to use
 # sudo apt-get install cups
@@ -23,6 +22,8 @@ class ZebraPrinter:
         """
         Returns zpl label to print
         """
+        import zpl
+
         # Define Label height[mm], width[mm], dpmm[dots per mm]12 = 300dpi
         label = zpl.Label(self.label_height, self.label_width, dpmm=12)
         v_begin = 2  # Vertical offset for first words x orgin
@@ -73,6 +74,9 @@ class ZebraPrinter:
         return label.dumpZPL()
 
     def print_label(self):
+        import cups
+        from zebra import Zebra
+
         printer = Zebra()
         # Get available zebra printers queues (should find one)
         printer_queue = printer.getqueues()
@@ -91,6 +95,30 @@ class ZebraPrinter:
         printer.output(self.get_label().encode("utf-8"))
 
 
+class Signals(QObject):
+    done = pyqtSignal()
+    error = pyqtSignal(str)
+
+
+class PrintWorker(QRunnable):
+    """
+    Prints the label of `printer` on a thread of the `io` lane (`executors.io`),
+    so the GUI does not wait for CUPS and the printer
+    """
+
+    def __init__(self, printer: ZebraPrinter):
+        super().__init__()
+        self.printer = printer
+        self.signals = Signals()
+
+    def run(self):
+        try:
+            self.printer.print_label()
+            self.signals.done.emit()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+
 if __name__ == '__main__':
     p = ZebraPrinter(
         order_id="123456/12/1234/1/1",
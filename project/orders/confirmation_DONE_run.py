@@ -7,7 +7,7 @@ from orders.order import Order
 
 
 class ConfirmationDONERun(QDialog):
-    def __init__(self, parent: QWidget, ui_templates_dir: str, order: Order) -> None:
+    def __init__(self, parent: QWidget, ui_templates_dir: str, order: Order = None) -> None:
         super().__init__(parent)
 
         uic.loadUi(os.path.join(ui_templates_dir,
@@ -25,9 +25,8 @@ class ConfirmationDONERun(QDialog):
         self.label_title: QLabel
         self.label_title.setText(
             "Czy napewno chcesz ponownie wykonać zlecenie?")
-        # Set alert description
+        # Alert description is filled by `set_order`
         self.label_desc: QLabel
-        self.label_desc.setText(order.__str__())
         # Add buttons to buttonBox
         self.buttonBox: QDialogButtonBox
         yes_btn = self.buttonBox.addButton(QDialogButtonBox.Yes)
@@ -35,3 +34,13 @@ class ConfirmationDONERun(QDialog):
         # Set custom text for the buttons
         yes_btn.setText("Tak")
         no_btn.setText("Nie")
+
+        # Dialog may be pre-built by `DialogCache` without an order
+        if order is not None:
+            self.set_order(order)
+
+    def set_order(self, order: Order):
+        """
+        Set alert description for the given order. Allows the dialog to be reused.
+        """
+        self.label_desc.setText(order.__str__())
@@ -0,0 +1,43 @@
+import os
+from PyQt5.QtWidgets import QDialog, QWidget, QLabel, QDialogButtonBox
+from PyQt5 import uic
+from PyQt5.QtCore import Qt
+
+from winding_in_progress_operations.checkpoint import WindingCheckpoint
+
+
+class ConfirmationResume(QDialog):
+    def __init__(self, parent: QWidget, ui_templates_dir: str, checkpoint: WindingCheckpoint) -> None:
+        super().__init__(parent)
+
+        uic.loadUi(os.path.join(ui_templates_dir,
+                   "settings_alert_dialog.ui"), self)
+        # Make sure that Taskbar is hidden
+        self.setWindowModality(Qt.ApplicationModal)
+        self.setWindowFlags(self.windowFlags() |
+                            Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+        # Make sure that curosor is hidden
+        self.setCursor(Qt.BlankCursor)
+
+        # Set window title
+        self.setWindowTitle("Wznowienie przerwanego zlecenia")
+        # Set alert title
+        self.label_title: QLabel
+        self.label_title.setText(
+            "Nawijanie zlecenia nie zostało zakończone.\nCzy chcesz je wznowić?")
+        # Set alert description
+        self.label_desc: QLabel
+        hours, rest = divmod(int(checkpoint.runtime_s), 3600)
+        self.label_desc.setText(
+            f"Zlecenie: {checkpoint.order_id}\n"
+            f"Wykonane linki: {checkpoint.ropes} / {checkpoint.quantity_target}\n"
+            f"Czas wykonywania: {hours:02d}:{rest // 60:02d}:{rest % 60:02d}\n"
+            f"Ostatni zapis: {checkpoint.at}\n\n"
+            "Nie - zlecenie zostanie oznaczone jako przerwane.")
+        # Add buttons to buttonBox
+        self.buttonBox: QDialogButtonBox
+        yes_btn = self.buttonBox.addButton(QDialogButtonBox.Yes)
+        no_btn = self.buttonBox.addButton(QDialogButtonBox.No)
+        # Set custom text for the buttons
+        yes_btn.setText("Tak")
+        no_btn.setText("Nie")
@@ -0,0 +1,221 @@
+import os
+from datetime import datetime, timedelta
+from PyQt5 import uic
+from PyQt5.QtWidgets import QWidget, QComboBox, QSpinBox, QPushButton
+from PyQt5.QtCore import QTimer, pyqtSignal
+
+from orders.order import OrderStatus
+from orders.orders_filter import OrdersFilter, OrdersFacets
+from orders.orders_model import STATUS_LABELS
+
+
+class OrdersFilterBar(QWidget):
+    """
+    OrdersFilterBar
+    ---
+
+    Bar of `OrdersTab` with filters by customer (prefix), diameter, length range, status and date window.
+    In the group of done orders `pushButton_archive` switches to the history (archived orders).
+    Counts of orders are displayed next to customers and diameters (see `set_facets`).
+    `filterChanged` is emitted once the user stops changing criteria for `DEBOUNCE_MS`.
+    """
+    filterChanged = pyqtSignal()
+    DEBOUNCE_MS = 250
+    # Date windows `(label, number of days)`, `0` means today, `None` means no limit
+    DATE_WINDOWS = [
+        ("Cały okres", None),
+        ("Dziś", 0),
+        ("Ostatnie 7 dni", 7),
+        ("Ostatnie 30 dni", 30),
+    ]
+
+    def __init__(self, ui_templates_dir: str):
+        super().__init__()
+        uic.loadUi(os.path.join(
+            ui_templates_dir, "orders_filter_bar.ui"), self)
+
+        self.__facets = OrdersFacets()
+        # Statuses of the displayed group of orders
+        self.__group: tuple[OrderStatus] = tuple(OrderStatus)
+
+        # Emit changes after the user stops changing the criteria
+        self.__debounce = QTimer(self)
+        self.__debounce.setSingleShot(True)
+        self.__debounce.setInterval(self.DEBOUNCE_MS)
+        self.__debounce.timeout.connect(self.filterChanged.emit)
+
+        # Define `comboBox_customer`, the edit text is the prefix of the customer name
+        self.comboBox_customer: QComboBox
+        self.comboBox_customer.lineEdit().setPlaceholderText("Klient: wszyscy")
+        self.comboBox_customer.setCurrentIndex(-1)
+        self.comboBox_customer.editTextChanged.connect(self.__on_changed)
+        self.comboBox_customer.activated.connect(self.__on_customer_activated)
+
+        # Define `comboBox_diameter`
+        self.comboBox_diameter: QComboBox
+        self.comboBox_diameter.addItem("Średnica: wszystkie", None)
+        self.comboBox_diameter.currentIndexChanged.connect(self.__on_changed)
+
+        # Define length spin boxes, minimum value means no limit
+        self.spinBox_lengthMin: QSpinBox
+        self.spinBox_lengthMin.valueChanged.connect(self.__on_changed)
+        self.spinBox_lengthMax: QSpinBox
+        self.spinBox_lengthMax.valueChanged.connect(self.__on_changed)
+
+        # Define `comboBox_status`, filled by `set_group`
+        self.comboBox_status: QComboBox
+        self.comboBox_status.currentIndexChanged.connect(
+            lambda _: self.__show_facets())
+        self.comboBox_status.currentIndexChanged.connect(self.__on_changed)
+
+        # Define `comboBox_date`
+        self.comboBox_date: QComboBox
+        for label, days in self.DATE_WINDOWS:
+            self.comboBox_date.addItem(label, days)
+        self.comboBox_date.currentIndexChanged.connect(self.__on_changed)
+
+        # Define `pushButton_archive`, available only for done orders
+        self.pushButton_archive: QPushButton
+        self.pushButton_archive.toggled.connect(self.__on_changed)
+        self.pushButton_archive.setStyleSheet("color: black;")
+
+        # Define `pushButton_clear`
+        self.pushButton_clear: QPushButton
+        self.pushButton_clear.clicked.connect(self.clear)
+        self.pushButton_clear.setStyleSheet("color: black;")
+
+        self.set_group(self.__group)
+
+    def set_group(self, statuses: tuple[OrderStatus]):
+        """
+        Set statuses of the displayed group of orders. Status selection is reset, `filterChanged` is not emitted.
+        """
+        self.__group = tuple(statuses)
+        self.comboBox_status.blockSignals(True)
+        self.comboBox_status.clear()
+        self.comboBox_status.addItem("Status: wszystkie", self.__group)
+        if len(self.__group) > 1:
+            for status in self.__group:
+                self.comboBox_status.addItem(STATUS_LABELS[status], (status,))
+        self.comboBox_status.setEnabled(len(self.__group) > 1)
+        self.comboBox_status.blockSignals(False)
+        self.pushButton_archive.blockSignals(True)
+        self.pushButton_archive.setChecked(False)
+        self.pushButton_archive.setVisible(
+            self.__group == (OrderStatus.DONE,))
+        self.pushButton_archive.blockSignals(False)
+        self.__show_facets()
+
+    def set_facets(self, facets: OrdersFacets):
+        """
+        Update counts of orders displayed next to customers, diameters and statuses
+        """
+        self.__facets = facets
+        self.__show_facets()
+
+    def __show_facets(self):
+        statuses = self.comboBox_status.currentData() or self.__group
+
+        # Status counts
+        for index in range(self.comboBox_status.count()):
+            item_statuses = self.comboBox_status.itemData(index)
+            count = sum(self.__facets.status_count(status)
+                        for status in item_statuses)
+            label = "Status: wszystkie" if index == 0 \
+                else STATUS_LABELS[item_statuses[0]]
+            self.comboBox_status.setItemText(index, f"{label} ({count})")
+
+        # Customers, the selected customer is kept as the edit text
+        customer_items = [(f"{value} ({count})", value)
+                          for value, count in self.__facets.values("customer", statuses) if value]
+        text = self.comboBox_customer.currentText()
+        self.comboBox_customer.blockSignals(True)
+        self.__fill(self.comboBox_customer, customer_items, first=0)
+        self.comboBox_customer.setCurrentIndex(-1)
+        self.comboBox_customer.setEditText(text)
+        self.comboBox_customer.blockSignals(False)
+
+        # Diameters, the selected diameter stays on the list even without orders
+        selected = self.comboBox_diameter.currentData()
+        diameters = dict(self.__facets.values("diameter", statuses))
+        if selected is not None:
+            diameters.setdefault(selected, 0)
+        diameter_items = [(f"{value} mm ({count})", value)
+                          for value, count in sorted(diameters.items())]
+        self.comboBox_diameter.blockSignals(True)
+        self.__fill(self.comboBox_diameter, diameter_items, first=1)
+        self.comboBox_diameter.setCurrentIndex(
+            max(self.comboBox_diameter.findData(selected), 0))
+        self.comboBox_diameter.blockSignals(False)
+
+    @staticmethod
+    def __fill(combo: QComboBox, items: list[tuple], first: int):
+        """
+        Set items `(text, data)` of the combo box behind first `first` fixed items.
+        Texts are updated in place if the values have not changed.
+        """
+        current = [combo.itemData(index)
+                   for index in range(first, combo.count())]
+        if current == [data for _, data in items]:
+            for index, (text, _) in enumerate(items, start=first):
+                combo.setItemText(index, text)
+            return
+        while combo.count() > first:
+            combo.removeItem(first)
+        for text, data in items:
+            combo.addItem(text, data)
+
+    def __on_changed(self, *_):
+        # Restart the debounce, `QTimer.start(int)` can not be connected directly
+        self.__debounce.start()
+
+    def __on_customer_activated(self, index: int):
+        # Show only the name (without count) of the chosen customer
+        name = self.comboBox_customer.itemData(index)
+        self.comboBox_customer.blockSignals(True)
+        self.comboBox_customer.setCurrentIndex(-1)
+        self.comboBox_customer.setEditText(name)
+        self.comboBox_customer.blockSignals(False)
+        self.__debounce.start()
+
+    def current_filter(self) -> OrdersFilter:
+        """
+        Returns `OrdersFilter` with the current criteria
+        """
+        date_from = None
+        days = self.comboBox_date.currentData()
+        if days is not None:
+            begin = datetime.now().replace(hour=0, minute=0) - timedelta(days=days)
+            date_from = begin.strftime("%Y-%m-%d %H:%M")
+
+        return OrdersFilter(
+            statuses=self.comboBox_status.currentData() or self.__group,
+            customer_prefix=self.comboBox_customer.currentText().strip(),
+            diameter=self.comboBox_diameter.currentData(),
+            length_min=self.spinBox_lengthMin.value() or None,
+            length_max=self.spinBox_lengthMax.value() or None,
+            date_from=date_from,
+            archived=self.pushButton_archive.isChecked()
+        )
+
+    def clear(self):
+        """
+        Reset all criteria and emit `filterChanged` at once
+        """
+        for widget in (self.comboBox_customer, self.comboBox_diameter, self.spinBox_lengthMin,
+                       self.spinBox_lengthMax, self.comboBox_status, self.comboBox_date, self.pushButton_archive):
+            widget.blockSignals(True)
+        self.comboBox_customer.setCurrentIndex(-1)
+        self.comboBox_customer.setEditText("")
+        self.comboBox_diameter.setCurrentIndex(0)
+        self.spinBox_lengthMin.setValue(0)
+        self.spinBox_lengthMax.setValue(0)
+        self.comboBox_status.setCurrentIndex(0)
+        self.comboBox_date.setCurrentIndex(0)
+        self.pushButton_archive.setChecked(False)
+        for widget in (self.comboBox_customer, self.comboBox_diameter, self.spinBox_lengthMin,
+                       self.spinBox_lengthMax, self.comboBox_status, self.comboBox_date, self.pushButton_archive):
+            widget.blockSignals(False)
+        self.__debounce.stop()
+        self.__show_facets()
+        self.filterChanged.emit()
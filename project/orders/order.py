@@ -1,5 +1,9 @@
+import re
 from enum import Enum
 
+# Valid `order_id` pattern, compiled once
+ORDER_ID_PATTERN = re.compile(r"^\d{6}/\d{2}/\d{4}/[a-zA-Z0-9/]{3,5}$")
+
 
 class OrderStatus(str, Enum):
     DONE = "DONE"
@@ -38,6 +42,9 @@ class Order:
     done_date: str = None
     done_date_label = "Data wykonania:"
 
+    # Result of validation of `order_id`, `quantity` and `diameter`, computed once on creation
+    is_valid: bool = False
+
     def __init__(
             self,
             order_id,
@@ -68,6 +75,16 @@ class Order:
         # Done date
         if done_date:
             self.done_date = str(done_date)
+        # Validation of values which do not depend on settings
+        self.is_valid = self.quantity > 0 and self.diameter > 0 \
+            and ORDER_ID_PATTERN.match(self.order_id) is not None
+
+    def is_runnable(self, start_length: int) -> bool:
+        """
+        Returns `True` if the order can be run on the machine.
+        `start_length` is passed, because `START_LENGHT` may be changed in settings at runtime.
+        """
+        return self.is_valid and self.length > start_length
 
     def __str__(self):
         return \
@@ -80,3 +97,30 @@ class Order:
 
 {self.production_time_label} {self.production_time}
 {self.done_date_label} {self.done_date}"""
+
+
+class _Descending:
+    """
+    Wraps value to be sorted in descending order, `None` goes last (as `DESC` in SQLite)
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other: "_Descending") -> bool:
+        return self.value == other.value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        if self.value is None:
+            return False
+        if other.value is None:
+            return True
+        return self.value > other.value
+
+
+def sort_key(order: Order) -> tuple:
+    """
+    Returns the key of the order in the tree, the same order as `ORDER BY status, done_date DESC, order_id`
+    """
+    return (order.status.value, _Descending(order.done_date), order.order_id)
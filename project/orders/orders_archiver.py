@@ -0,0 +1,68 @@
+import os
+from datetime import datetime, timedelta
+from loguru import logger
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from db.db import OrdersDBActions, OrdersDBWorker, ARCHIVE_BATCH_SIZE
+from db.service import db_service
+
+
+class OrdersArchiver(QObject):
+    """
+    OrdersArchiver
+    ---
+
+    Moves `DONE` orders older than `ARCHIVE_DONE_AFTER_DAYS` days (env, `0` disables the archive) from the `orders`
+    table to `orders_archive`, so the table read by the orders tab holds only recent orders.
+    Orders are moved in batches of `ARCHIVE_BATCH_SIZE` only while the machine is idle (no winding process):
+    a batch is requested every `INTERVAL_S`, next batches follow after `NEXT_BATCH_MS` until all old orders are moved.
+    `archived` is emitted with the number of moved orders.
+
+    Parameters
+    ---
+
+    :dialog_cache: `DialogCache` of the main window, used to check if the winding process is in progress
+    """
+    archived = pyqtSignal(int)
+    INTERVAL_S = 300
+    NEXT_BATCH_MS = 1000
+
+    def __init__(self, dialog_cache, parent: QObject = None):
+        super().__init__(parent)
+        self.__dialog_cache = dialog_cache
+        self.__timer = QTimer(self)
+        self.__timer.setSingleShot(True)
+        self.__timer.timeout.connect(self.archive_batch)
+        self.__timer.start(self.INTERVAL_S * 1000)
+
+    def archive_batch(self):
+        """
+        Request one batch of old orders to be moved to the archive, skipped while the winding process is in progress
+        """
+        days = int(os.getenv("ARCHIVE_DONE_AFTER_DAYS", "90"))
+        if days <= 0 or self.__dialog_cache.is_winding_in_progress():
+            self.__timer.start(self.INTERVAL_S * 1000)
+            return
+        older_than = (datetime.now() - timedelta(days=days)
+                      ).strftime("%Y-%m-%d %H:%M")
+
+        def after(count: int):
+            if count:
+                self.archived.emit(count)
+            # Continue with the next batch if there can be more old orders
+            self.__timer.start(self.NEXT_BATCH_MS if count == ARCHIVE_BATCH_SIZE
+                               else self.INTERVAL_S * 1000)
+
+        def error(err_title: str = None, err_desc: str = None):
+            logger.error("Orders were NOT archived.")
+            self.__timer.start(self.INTERVAL_S * 1000)
+
+        # Queue the action of the database thread
+        worker = OrdersDBWorker(
+            OrdersDBActions.archive_done_orders, older_than, ARCHIVE_BATCH_SIZE)
+        # Done signal handling
+        worker.signals.done.connect(after)
+        # Error signal handling
+        worker.signals.error.connect(error)
+        # Queue request
+        db_service.start(worker)
@@ -0,0 +1,141 @@
+from orders.order import Order, OrderStatus
+
+
+class OrdersFilter:
+    """
+    OrdersFilter
+    ---
+
+    Criteria of the orders displayed in `OrdersTab`. The same criteria are checked in Python (`matches`),
+    for orders changed after the query, and in SQL (`where`), for the query of the database.
+
+    - `statuses` - displayed statuses,
+    - `customer_prefix` - beginning of `customer_name` (case sensitive), empty means any customer,
+    - `diameter` - exact diameter or `None`,
+    - `length_min`, `length_max` - inclusive length range, `None` means no limit,
+    - `date_from`, `date_to` - window of `done_date` (`YYYY-MM-DD HH:MM`, `date_to` exclusive), `None` means no limit,
+    - `archived` - orders of the history (`orders_archive`) are displayed instead of the current orders.
+    Orders without `done_date` do not match any date window.
+    """
+
+    def __init__(
+            self,
+            statuses: tuple[OrderStatus] = tuple(OrderStatus),
+            customer_prefix: str = "",
+            diameter: float = None,
+            length_min: int = None,
+            length_max: int = None,
+            date_from: str = None,
+            date_to: str = None,
+            archived: bool = False
+    ):
+        self.statuses = tuple(statuses)
+        self.customer_prefix = customer_prefix
+        self.diameter = diameter
+        self.length_min = length_min
+        self.length_max = length_max
+        self.date_from = date_from
+        self.date_to = date_to
+        self.archived = archived
+
+    def has_criteria(self) -> bool:
+        """
+        Returns `True` if the filter narrows orders more than by status
+        """
+        return bool(self.customer_prefix) or any(value is not None for value in (
+            self.diameter, self.length_min, self.length_max, self.date_from, self.date_to))
+
+    def matches(self, order: Order) -> bool:
+        """
+        Returns `True` if the current (not archived) `order` matches the criteria
+        """
+        if self.archived or order.status not in self.statuses:
+            return False
+        if self.customer_prefix and not order.customer_name.startswith(self.customer_prefix):
+            return False
+        if self.diameter is not None and order.diameter != self.diameter:
+            return False
+        if self.length_min is not None and order.length < self.length_min:
+            return False
+        if self.length_max is not None and order.length > self.length_max:
+            return False
+        if self.date_from is not None or self.date_to is not None:
+            if order.done_date is None:
+                return False
+            if self.date_from is not None and order.done_date < self.date_from:
+                return False
+            if self.date_to is not None and order.done_date >= self.date_to:
+                return False
+        return True
+
+    def where(self) -> tuple[str, list]:
+        """
+        Returns `WHERE` clause of the `orders` query and its parameters
+        """
+        conditions = [
+            f"status IN ({', '.join('?' * len(self.statuses))})"]
+        params = [status.value for status in self.statuses]
+        if self.customer_prefix:
+            # Range instead of `LIKE`, so the index of `customer_name` is used
+            conditions.append("customer_name >= ? AND customer_name < ?")
+            params += [self.customer_prefix, self.customer_prefix + "\U0010ffff"]
+        if self.diameter is not None:
+            conditions.append("diameter = ?")
+            params.append(self.diameter)
+        if self.length_min is not None:
+            conditions.append("length >= ?")
+            params.append(self.length_min)
+        if self.length_max is not None:
+            conditions.append("length <= ?")
+            params.append(self.length_max)
+        if self.date_from is not None:
+            conditions.append("done_date >= ?")
+            params.append(self.date_from)
+        if self.date_to is not None:
+            conditions.append("done_date < ?")
+            params.append(self.date_to)
+        return " AND ".join(conditions), params
+
+    def __eq__(self, other: "OrdersFilter") -> bool:
+        return isinstance(other, OrdersFilter) and vars(self) == vars(other)
+
+    def __str__(self):
+        criteria = [f"statuses={'/'.join(status.value for status in self.statuses)}"]
+        criteria += [f"{name}={value}" for name, value in vars(self).items()
+                     if name != "statuses" and value not in (None, "", False)]
+        return ", ".join(criteria)
+
+
+class OrdersFacets:
+    """
+    OrdersFacets
+    ---
+
+    Counts of orders by facet (`customer`, `diameter`) and status, read from the `order_facets` table.
+    """
+    FACETS = ("customer", "diameter")
+
+    def __init__(self, rows: list[tuple] = ()):
+        # Counts `'facet': {value: {OrderStatus: count}}`
+        self.__counts: dict[str, dict] = {facet: {} for facet in self.FACETS}
+        for facet, value, status, count in rows:
+            self.__counts[facet].setdefault(value, {})[
+                OrderStatus(status)] = count
+
+    def values(self, facet: str, statuses: tuple[OrderStatus]) -> list[tuple]:
+        """
+        Returns sorted `(value, count)` of the facet for orders with given statuses, values without orders are skipped
+        """
+        result = []
+        for value, counts in self.__counts[facet].items():
+            count = sum(counts.get(status, 0) for status in statuses)
+            if count:
+                result.append((value, count))
+        return sorted(result)
+
+    def count(self, facet: str, value, statuses: tuple[OrderStatus]) -> int:
+        counts = self.__counts[facet].get(value, {})
+        return sum(counts.get(status, 0) for status in statuses)
+
+    def status_count(self, status: OrderStatus) -> int:
+        return sum(counts.get(status, 0) for counts in self.__counts["customer"].values())
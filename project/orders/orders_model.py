@@ -0,0 +1,407 @@
+from functools import partial
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex
+from PyQt5.QtGui import QColor, QFont
+
+from orders.order import Order, OrderStatus, sort_key
+
+
+# Label and color of the order displayed in the tree depends on status
+STATUS_LABELS = {
+    OrderStatus.INTERRUPTED: "Przerwane",
+    OrderStatus.DONE: "Wykonane",
+    OrderStatus.TODO: "Do wykonania",
+}
+STATUS_COLORS = {
+    OrderStatus.INTERRUPTED: '#aa0000',
+    OrderStatus.DONE: '#00aa00',
+    OrderStatus.TODO: '#ffaa00',
+}
+
+
+class _OrderDetails:
+    """
+    Child (detail) rows of one order, created when the order node is expanded for the first time.
+    `id` is the internal id of the indexes of the rows (`0` is the id of the top level rows).
+    """
+    __slots__ = ("id", "order_id", "rows")
+
+    def __init__(self, id: int, order: Order):
+        self.id = id
+        self.order_id = order.order_id
+        self.rows = order_details(order)
+
+
+def order_details(order: Order) -> list[tuple[str, str]]:
+    """
+    Returns detail rows `(label, value)` displayed under the order node
+    """
+    rows = [
+        (order.customer_name_label, order.customer_name),
+        (order.quantity_label, f"{order.quantity}"),
+        (order.length_label, f"{order.length}"),
+        (order.diameter_label, f"{order.diameter}"),
+    ]
+    if order.production_time:
+        rows.append((order.production_time_label, order.production_time))
+    if order.done_date:
+        rows.append((order.done_date_label, order.done_date))
+    return rows
+
+
+class OrdersTreeModel(QAbstractItemModel):
+    """
+    OrdersTreeModel
+    ---
+
+    Two column tree model over a flat list of `Order` objects:
+    - top level rows: `order_id` and status of the order,
+    - child rows: details of the order (label and value).
+
+    Child rows are created only when the order node is expanded (`canFetchMore`/`fetchMore`).
+    Top level rows are either set all at once (`set_orders`) or fetched from the database in pages of `PAGE_SIZE`
+    rows (`load_pages`), so only the beginning of a long list is loaded. The next page is requested by the owner
+    of the view with `fetch_page` when the list is scrolled near its end, not by `fetchMore`:
+    `QTreeView` calls `fetchMore` of the root on every layout, which would load the whole list page by page.
+    Fonts and colors are shared by all rows.
+
+    Top level row becomes selectable only when it is expanded (see `set_expanded`).
+
+    Indexes of detail rows carry the id of their `_OrderDetails` (`internalId`), not a pointer to it,
+    so an index kept by a view or a proxy after its order was removed resolves to nothing instead of freed memory.
+
+    Orders must be sorted by `sort_key`. `apply_changes` keeps that order, so changes
+    are inserted, removed and updated in place, without losing expansion and scroll state of the view.
+    """
+    PAGE_SIZE = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Loaded orders, the beginning of the list sorted by `sort_key`
+        self.__orders: list[Order] = []
+        # `True` if there are no more orders to fetch
+        self.__complete = True
+        # Function which requests the page of orders (see `load_pages`)
+        self.__page_loader = None
+        self.__fetching = False
+        # Number of the current list, pages requested for the previous list are dropped
+        self.__generation = 0
+        # Fetched detail rows `'order_id': _OrderDetails`
+        self.__details: dict[str, _OrderDetails] = {}
+        # The same detail rows by their id `id: _OrderDetails`
+        self.__details_by_id: dict[int, _OrderDetails] = {}
+        self.__last_details_id = 0
+        # Ids of expanded orders
+        self.__expanded: set[str] = set()
+        # Row number of order by `order_id`, rebuilt on demand after structural changes
+        self.__rows: dict[str, int] = None
+
+        # Shared fonts and colors
+        self.__order_font = QFont("Open Sans", 24)
+        self.__order_font.setBold(True)
+        self.__font = QFont("Open Sans", 20)
+        self.__bold_font = QFont("Open Sans", 20)
+        self.__bold_font.setBold(True)
+        self.__detail_color = QColor(127, 127, 127)
+        self.__status_colors = {status: QColor(color)
+                                for status, color in STATUS_COLORS.items()}
+
+    # Data management
+
+    def set_orders(self, orders: list[Order]):
+        """
+        Replace all orders displayed by the model
+        """
+        self.__reset(orders, None)
+
+    def load_pages(self, page_loader):
+        """
+        Replace displayed orders by orders fetched in pages. The first page is requested at once.
+
+        Parameters:
+        --
+        - `page_loader` - function `(last, limit, append_page)` which requests up to `limit` orders following
+          the `last` loaded order (`None` for the first page) and passes them to `append_page(orders, complete)`.
+          `complete` is `True` if there are no more orders.
+        """
+        self.__reset([], page_loader)
+        self.fetch_page()
+
+    def __reset(self, orders: list[Order], page_loader):
+        self.beginResetModel()
+        self.__generation += 1
+        self.__orders = list(orders)
+        self.__page_loader = page_loader
+        self.__complete = page_loader is None
+        self.__fetching = False
+        self.__details = {}
+        self.__details_by_id = {}
+        self.__expanded = set()
+        self.__rows = None
+        self.endResetModel()
+
+    def __append_page(self, generation: int, orders: list[Order], complete: bool):
+        """
+        Append the page requested by `fetch_page`, pages of the previous list are dropped
+        """
+        if generation != self.__generation:
+            return
+        self.__fetching = False
+        self.__complete = complete
+        # Orders inserted by `apply_changes` while the page was fetched are already displayed
+        known = set(self.__rows_by_id())
+        orders = [order for order in orders if order.order_id not in known]
+        if not orders:
+            return
+        row = len(self.__orders)
+        self.beginInsertRows(QModelIndex(), row, row + len(orders) - 1)
+        self.__orders.extend(orders)
+        self.__rows = None
+        self.endInsertRows()
+
+    def apply_changes(self, upserted: list[Order], deleted: list[str], visible=None):
+        """
+        Apply changes to the displayed orders. Only affected rows are inserted, removed or updated.
+        Orders behind the last loaded page are skipped, they are fetched with the next pages.
+
+        Parameters:
+        --
+        - `upserted` - inserted or updated orders,
+        - `deleted` - `order_id` of removed orders,
+        - `visible` - optional function which returns `True` if the order should be displayed by the model.
+        """
+        for order_id in deleted:
+            row = self.__find(order_id)
+            if row is not None:
+                self.__remove(row)
+
+        for order in upserted:
+            row = self.__find(order.order_id)
+            is_visible = (visible is None or visible(order)) and self.__is_loaded(order)
+            if row is not None:
+                if is_visible and sort_key(self.__orders[row]) == sort_key(order):
+                    self.__update(row, order)
+                    continue
+                self.__remove(row)
+            if is_visible:
+                self.__insert(order)
+
+    def __is_loaded(self, order: Order) -> bool:
+        """
+        Returns `True` if the position of `order` is within the loaded pages
+        """
+        if self.__complete:
+            return True
+        return bool(self.__orders) and sort_key(order) < sort_key(self.__orders[-1])
+
+    def __rows_by_id(self) -> dict[str, int]:
+        if self.__rows is None:
+            self.__rows = {order.order_id: row for row,
+                           order in enumerate(self.__orders)}
+        return self.__rows
+
+    def __find(self, order_id: str) -> int:
+        """
+        Returns row of the order with `order_id` or `None`
+        """
+        return self.__rows_by_id().get(order_id)
+
+    def __position(self, order: Order) -> int:
+        """
+        Returns row at which `order` should be inserted to keep the orders sorted
+        """
+        key = sort_key(order)
+        low, high = 0, len(self.__orders)
+        while low < high:
+            middle = (low + high) // 2
+            if key < sort_key(self.__orders[middle]):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def __insert(self, order: Order):
+        row = self.__position(order)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.__orders.insert(row, order)
+        self.__rows = None
+        self.endInsertRows()
+
+    def __remove(self, row: int):
+        order_id = self.__orders[row].order_id
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.__orders[row]
+        details = self.__details.pop(order_id, None)
+        self.__rows = None
+        self.endRemoveRows()
+        if details is not None:
+            del self.__details_by_id[details.id]
+        self.__expanded.discard(order_id)
+
+    def __update(self, row: int, order: Order):
+        self.__orders[row] = order
+        top_index = self.index(row, 0)
+        details = self.__details.get(order.order_id)
+        if details is not None:
+            # Refresh already created detail rows
+            rows = order_details(order)
+            old_count, new_count = len(details.rows), len(rows)
+            if new_count > old_count:
+                self.beginInsertRows(top_index, old_count, new_count - 1)
+                details.rows = rows
+                self.endInsertRows()
+            elif new_count < old_count:
+                self.beginRemoveRows(top_index, new_count, old_count - 1)
+                details.rows = rows
+                self.endRemoveRows()
+            else:
+                details.rows = rows
+            if new_count:
+                self.dataChanged.emit(self.index(0, 0, top_index),
+                                      self.index(new_count - 1, 1, top_index))
+        self.dataChanged.emit(top_index, self.index(row, 1))
+
+    def can_fetch_page(self) -> bool:
+        """
+        Returns `True` if there are more orders to fetch and no page is being fetched
+        """
+        return not self.__complete and not self.__fetching
+
+    def fetch_page(self):
+        """
+        Request the next page of orders, it is appended when the page loader passes it back
+        """
+        if not self.can_fetch_page():
+            return
+        self.__fetching = True
+        last = self.__orders[-1] if self.__orders else None
+        self.__page_loader(last, self.PAGE_SIZE,
+                           partial(self.__append_page, self.__generation))
+
+    def orders(self) -> list[Order]:
+        return self.__orders
+
+    def order_at(self, index: QModelIndex) -> Order:
+        """
+        Returns `Order` of the top level row of `index` or `None` for invalid index
+        """
+        if not index.isValid():
+            return None
+        if index.internalId() != 0:
+            index = self.parent(index)
+            if not index.isValid():
+                return None
+        return self.__orders[index.row()]
+
+    def set_expanded(self, index: QModelIndex, expanded: bool):
+        """
+        Mark order node as expanded (selectable) or collapsed (not selectable)
+        """
+        order = self.order_at(index)
+        if order is None:
+            return
+        if expanded:
+            self.__expanded.add(order.order_id)
+        else:
+            self.__expanded.discard(order.order_id)
+        top_index = self.index(self.__find(order.order_id), 0)
+        self.dataChanged.emit(top_index, top_index)
+
+    # QAbstractItemModel interface
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column)
+        details = self.__details[self.__orders[parent.row()].order_id]
+        return self.createIndex(row, column, details.id)
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        if index.internalId() == 0:
+            return QModelIndex()
+        details = self.__details_by_id.get(index.internalId())
+        if details is None:
+            # Order of the detail row was removed
+            return QModelIndex()
+        return self.createIndex(self.__find(details.order_id), 0)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self.__orders)
+        if parent.internalId() != 0 or parent.column() != 0:
+            return 0
+        details = self.__details.get(self.__orders[parent.row()].order_id)
+        return len(details.rows) if details else 0
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 2
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if not parent.isValid():
+            return len(self.__orders) > 0 or not self.__complete
+        return parent.internalId() == 0 and parent.column() == 0
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        if not parent.isValid():
+            # Pages of top level rows are requested with `fetch_page`
+            return False
+        if parent.internalId() != 0 or parent.column() != 0:
+            return False
+        return self.__orders[parent.row()].order_id not in self.__details
+
+    def fetchMore(self, parent: QModelIndex):
+        if not parent.isValid():
+            return
+
+        # Create detail rows of the expanded order
+        order = self.__orders[parent.row()]
+        if order.order_id in self.__details:
+            return
+        self.__last_details_id += 1
+        details = _OrderDetails(self.__last_details_id, order)
+        self.beginInsertRows(parent, 0, len(details.rows) - 1)
+        self.__details[order.order_id] = details
+        self.__details_by_id[details.id] = details
+        self.endInsertRows()
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return ('label', 'value')[section]
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        if not index.isValid() or index.internalId() != 0 or index.column() != 0:
+            # Detail rows and status column are disabled
+            return Qt.NoItemFlags
+        if self.__orders[index.row()].order_id in self.__expanded:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return Qt.ItemIsEnabled
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if index.internalId() != 0:
+            # Detail row
+            details = self.__details_by_id.get(index.internalId())
+            if details is None or index.row() >= len(details.rows):
+                return None
+            if role == Qt.DisplayRole:
+                return details.rows[index.row()][index.column()]
+            if role == Qt.FontRole:
+                return self.__bold_font if index.column() == 1 else self.__font
+            if role == Qt.ForegroundRole:
+                return self.__detail_color
+            return None
+
+        # Order row
+        order = self.__orders[index.row()]
+        if role == Qt.DisplayRole:
+            return order.order_id if index.column() == 0 else STATUS_LABELS[order.status]
+        if role == Qt.FontRole:
+            return self.__order_font if index.column() == 0 else self.__font
+        if role == Qt.ForegroundRole:
+            return self.__status_colors[order.status]
+        return None
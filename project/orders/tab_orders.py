@@ -1,48 +1,28 @@
 from datetime import datetime, timedelta
 import os
+import time
 from enum import Enum, auto
 from PyQt5 import uic
 from PyQt5.QtWidgets import QMainWindow, QWidget, QTreeView, QPushButton
-from PyQt5.QtGui import QStandardItemModel, QStandardItem, QColor, QFont
-from PyQt5.QtCore import QModelIndex, QThreadPool
+from PyQt5.QtCore import QModelIndex, QTimer
 from loguru import logger
-from regex import match
 
 from machine_control import MachineControl
 from encoder import Encoder
 from buzzer import Buzzer
-from LOGS.error_handling import ErrorDialog
-from label_printing.print import ZebraPrinter
-from winding_in_progres import WindingInProgressDialog
+from label_printing.print import ZebraPrinter, PrintWorker
+from executors import executors
 from db.db import OrdersDBActions, OrdersDBWorker
-from db.read_csv import Row
-from orders.confirmation_DONE_run import ConfirmationDONERun
-from orders.confirmation_mark_as_DONE import ConfirmationMarkAsDone
-from orders.confirmation_print_label import ConfirmationPrintLabel
+from db.service import db_service
+from db.changes import OrdersChangeSet
 from orders.order import Order, OrderStatus
-
-
-class TreeItem(QStandardItem):
-    def __init__(
-            self,
-            txt: str,
-            color: QColor = QColor(127, 127, 127),
-            font_size: int = 20,
-            set_bold: bool = False,
-            set_enabled: bool = False
-    ):
-        super().__init__()
-
-        fnt = QFont("Open Sans", font_size)
-        fnt.setBold(set_bold)
-
-        self.setEditable(False)
-        if color:
-            self.setForeground(color)
-        self.setFont(fnt)
-        self.setText(txt)
-        self.setSelectable(False)
-        self.setEnabled(set_enabled)
+from orders.orders_model import OrdersTreeModel
+from orders.orders_filter import OrdersFilter, OrdersFacets
+from orders.filter_bar import OrdersFilterBar
+from orders.orders_archiver import OrdersArchiver
+from db.temp_scanner import temp_scanner
+from orders.confirmation_resume import ConfirmationResume
+from winding_in_progress_operations.checkpoint import journal, WindingCheckpoint
 
 
 class OrdersTab(QWidget):
@@ -50,8 +30,16 @@ class OrdersTab(QWidget):
     __confirm_before_run: bool = False
     # Flag which switch actions for `pushButton_func` if True then print label else set label as DONE
     __print_mode: bool
-    # List which contains oreders as `Order` objects list
-    orders: list[Order] = []
+    # Version of the `orders` table known by the tab, used to fetch only changes
+    __orders_version: int = None
+    # Flag which is set while the poll of changes is pending
+    __polling: bool = False
+    # Flag which is set when changes were made while the poll was pending, the poll is repeated
+    __poll_again: bool = False
+    # Criteria of the displayed orders
+    __filter: OrdersFilter
+    # Number of the last query of filtered orders, results of older queries are dropped
+    __filter_query: int = 0
 
     def __init__(
         self,
@@ -76,6 +64,13 @@ class OrdersTab(QWidget):
 
         # Flag for reading orders
         self.only_done: bool = False
+
+        # Define `filter_bar` and place it above `treeView`
+        self.filter_bar = OrdersFilterBar(ui_templates_dir)
+        self.filter_bar.set_group(self.displayed_statuses())
+        self.filter_bar.filterChanged.connect(self.show_orders)
+        self.gridLayout.addWidget(self.filter_bar, 1, 0, 1, 5)
+        self.__filter = self.filter_bar.current_filter()
         self.refreshOrders()
 
         # Define `pushButton_run` and handle clicked event
@@ -101,7 +96,7 @@ class OrdersTab(QWidget):
 
         # Define `treeView` and fill it with data
         self.treeView: QTreeView
-        self.treeModel = QStandardItemModel()
+        self.treeModel = OrdersTreeModel()
 
         # Style VerticalScrollBar
         with open("project/orders/ScrollBarVerticalStyle.txt", "r")as f:
@@ -110,93 +105,227 @@ class OrdersTab(QWidget):
         # Assign model to `treeView`
         self.treeView.setModel(self.treeModel)
 
-        # Define columns
-        self.treeModel.setHorizontalHeaderLabels(['label', 'value'])
-        # Define `rootNode`
-        self.rootNode = self.treeModel.invisibleRootItem()
-
         # Handle item expansion event
         self.treeView.expanded.connect(self.onItemExpansion)
         # Handle item collapse event
         self.treeView.collapsed.connect(self.onItemCollapse)
         # Handle item selection event
         self.treeView.selectionModel().currentRowChanged.connect(self.onSelection)
+        # Handle scroll events, the next page of orders is fetched near the end of the list
+        self.treeView.verticalScrollBar().valueChanged.connect(self.onScroll)
+        self.treeView.verticalScrollBar().rangeChanged.connect(self.onScroll)
         # self.show_orders()
 
+        # Poll the database for changes made by other parts of the application (manual insert tab, archiver),
+        # every `ORDERS_POLL_INTERVAL` seconds
+        self.__poll_timer = QTimer(self)
+        self.__poll_timer.timeout.connect(self.pollChanges)
+        self.__poll_timer.start(
+            int(float(os.getenv("ORDERS_POLL_INTERVAL", "10")) * 1000))
+
+        # Move old done orders to the archive while the machine is idle, archived orders disappear from the list
+        self.archiver = OrdersArchiver(parent_class.dialog_cache, self)
+        self.archiver.archived.connect(lambda _: self.pollChanges())
+
+        # New `.csv` files are ingested by the background scanner of the TEMP directory
+        temp_scanner.ingested.connect(self.onOrdersIngested)
+
         # except Exception as e:
         #     print("Module OrdersTab initialization failed.", e, sep='\n')
 
+    def displayed_statuses(self) -> tuple[OrderStatus]:
+        """
+        Returns statuses of the displayed group: `done` or `todo` and `interrupted` depends on `only_done` flag
+        """
+        if self.only_done:
+            return (OrderStatus.DONE,)
+        return (OrderStatus.INTERRUPTED, OrderStatus.TODO)
+
     def show_orders(self):
-        for order in self.orders:
-            if self.only_done and order.status != OrderStatus.DONE:
-                continue
-            elif not self.only_done and order.status == OrderStatus.DONE:
-                continue
-            else:
-                color = None
-                status_label = ""
-                if order.status == OrderStatus.INTERRUPTED:
-                    color = QColor('#aa0000')
-                    status_label = "Przerwane"
-                elif order.status == OrderStatus.DONE:
-                    color = QColor('#00aa00')
-                    status_label = "Wykonane"
-                elif order.status == OrderStatus.TODO:
-                    color = QColor('#ffaa00')
-                    status_label = "Do wykonania"
-
-                # Assign order_id and status
-                order_item = TreeItem(
-                    order.order_id,
-                    set_bold=True,
-                    font_size=24,
-                    color=color,
-                    set_enabled=True
-                )
-                status = TreeItem(
-                    status_label,
-                    color=color
-                )
-                # Assign customer_name
-                customer_name_label = TreeItem(order.customer_name_label)
-                customer_name = TreeItem(order.customer_name, set_bold=True)
-                order_item.appendRow([customer_name_label, customer_name])
-                # Assign quantity
-                quantity_label = TreeItem(order.quantity_label)
-                quantity = TreeItem(f"{order.quantity}", set_bold=True)
-                order_item.appendRow([quantity_label, quantity])
-                # Assign length
-                length_label = TreeItem(order.length_label)
-                length = TreeItem(f"{order.length}", set_bold=True)
-                order_item.appendRow([length_label, length])
-                # Assign diameter
-                diameter_label = TreeItem(order.diameter_label)
-                diameter = TreeItem(f"{order.diameter}", set_bold=True)
-                order_item.appendRow([diameter_label, diameter])
-
-                if order.production_time:
-                    # Assign production_time if exist
-                    production_time_label = TreeItem(
-                        order.production_time_label)
-                    production_time = TreeItem(
-                        order.production_time, set_bold=True)
-                    order_item.appendRow(
-                        [production_time_label, production_time])
-
-                if order.done_date:
-                    # Assign done_date if exist
-                    done_date_label = TreeItem(order.done_date_label)
-                    done_date = TreeItem(order.done_date, set_bold=True)
-                    order_item.appendRow([done_date_label, done_date])
-
-                self.rootNode.appendRow([order_item, status])
+        """
+        Display orders which match criteria of `filter_bar`.
+        Orders filtered only by status are loaded in pages when the list is scrolled (`fetch_orders_page`),
+        other criteria are queried from the database at once.
+        """
+        self.__filter = self.filter_bar.current_filter()
+        if self.__filter.has_criteria():
+            self.query_filtered_orders()
+            return
+        # Drop results of the pending query
+        self.__filter_query += 1
+        self.treeModel.load_pages(self.fetch_orders_page)
+
+    def fetch_orders_page(self, last: Order, limit: int, append_page):
+        """
+        Page loader of `treeModel`: query up to `limit` orders with the displayed statuses which follow
+        the `last` loaded order (`None` for the first page) and pass them to `append_page`.
+        Statuses are queried one by one in the order of the tree, until the page is full.
+        """
+        statuses = sorted(self.__filter.statuses,
+                          key=lambda status: status.value)
+        archived = self.__filter.archived
+        status_index = statuses.index(last.status) if last is not None else 0
+        after_key = (last.done_date, last.order_id) if last is not None else None
+        orders: list[Order] = []
+        start = time.perf_counter()
+
+        def request():
+            # Queue the action of the database thread
+            worker = OrdersDBWorker(OrdersDBActions.get_rows_page, statuses[status_index].value,
+                                    after_key, limit - len(orders), archived)
+            # Done signal handling
+            worker.signals.done.connect(after)
+            # Error signal handling
+            worker.signals.error.connect(error)
+            # Queue request
+            db_service.start(worker)
+
+        def after(rows: list[tuple]):
+            nonlocal status_index, after_key
+            orders.extend(Order(*row) for row in rows)
+            if len(orders) < limit and status_index + 1 < len(statuses):
+                # Continue with the first orders of the next status
+                status_index += 1
+                after_key = None
+                request()
+                return
+            append_page(orders, len(orders) < limit)
+            logger.debug(
+                f"Orders page: {len(orders)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        def error(err_title: str = None, err_desc: str = None):
+            # Stop fetching, the list is loaded again on refresh
+            append_page(orders, True)
+            self.alert(err_title, err_desc)
+
+        request()
+
+    def query_filtered_orders(self):
+        """
+        Display orders which match `__filter`, queried from the database
+        """
+        self.__filter_query += 1
+        query = self.__filter_query
+        orders_filter = self.__filter
+        start = time.perf_counter()
+
+        def after(rows: list[dict]):
+            # Results of an outdated query
+            if query != self.__filter_query:
+                return
+            self.treeModel.set_orders([Order(**row) for row in rows])
+            logger.info(
+                f"Filtered orders ({orders_filter}): {len(rows)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        # Queue the action of the database thread
+        worker = OrdersDBWorker(OrdersDBActions.filter_orders, orders_filter)
+        # Done signal handling
+        worker.signals.done.connect(after)
+        # Error signal handling
+        worker.signals.error.connect(self.alert)
+        # Queue request
+        db_service.start(worker)
+
+    def refresh_facets(self):
+        """
+        Read counts of orders (kept up to date by the database) and display them in `filter_bar`
+        """
+        def after(facets: OrdersFacets):
+            self.filter_bar.set_facets(facets)
+
+        def error(err_title: str = None, err_desc: str = None):
+            # Previous counts stay displayed until the next refresh
+            logger.error(f"Counts of orders were NOT read. {err_desc}")
+
+        # Queue the action of the database thread
+        worker = OrdersDBWorker(OrdersDBActions.get_facets)
+        # Done signal handling
+        worker.signals.done.connect(after)
+        # Error signal handling
+        worker.signals.error.connect(error)
+        # Queue request
+        db_service.start(worker)
+
+    def is_visible(self, order: Order) -> bool:
+        """
+        Returns `True` if the order matches criteria of the displayed orders
+        """
+        return self.__filter.matches(order)
+
+    def apply_changes(self, changes: OrdersChangeSet):
+        """
+        Apply `OrdersChangeSet` from the DB layer to the orders and the tree.
+        Only affected rows are updated, so the expansion and scroll state is kept.
+        """
+        self.__orders_version = changes.version
+        if changes.full:
+            self.show_orders()
+            return
+
+        upserted = [Order(**row) for row in changes.upserted]
+        self.treeModel.apply_changes(
+            upserted, changes.deleted, self.is_visible)
+
+    def pollChanges(self):
+        """
+        Apply changes of the orders made after the known version. Only changed rows are read,
+        so the poll costs the same for any size of the table. Skipped before the first load and
+        while the previous poll is pending.
+        """
+        if self.__orders_version is None:
+            return
+        if self.__polling:
+            self.__poll_again = True
+            return
+        self.__polling = True
+        self.__poll_again = False
+
+        def after(changes: OrdersChangeSet):
+            self.__polling = False
+            if changes:
+                self.apply_changes(changes)
+                logger.info(f"Orders were changed ({changes})")
+                self.refresh_facets()
+            if self.__poll_again:
+                self.pollChanges()
+
+        def error(err_title: str = None, err_desc: str = None):
+            # Failed poll is only logged, the next one is made by the timer or by the poll requested in the meantime
+            self.__polling = False
+            logger.error(f"Changes of orders were NOT read. {err_desc}")
+            if self.__poll_again:
+                self.pollChanges()
+
+        # Queue the action of the database thread
+        worker = OrdersDBWorker(
+            OrdersDBActions.get_changes_since, self.__orders_version)
+        # Done signal handling
+        worker.signals.done.connect(after)
+        # Error signal handling
+        worker.signals.error.connect(error)
+        # Queue request
+        db_service.start(worker)
+
+    def onOrdersIngested(self, files: int):
+        """
+        Show orders of the `.csv` files ingested by `TempScanner`
+        """
+        self.pollChanges()
+
+    def onScroll(self, *_):
+        """
+        Fetch the next page of orders if less than one screen of loaded orders is below the visible part of the list
+        """
+        scroll_bar = self.treeView.verticalScrollBar()
+        if self.treeModel.can_fetch_page() and \
+                scroll_bar.value() >= scroll_bar.maximum() - scroll_bar.pageStep():
+            self.treeModel.fetch_page()
 
     def onItemExpansion(self, index: QModelIndex):
         """
         Checks if expanded row is selected
         """
-        item = self.treeModel.itemFromIndex(index)
-        item.setSelectable(True)
+        self.treeModel.set_expanded(index, True)
         selectedIndexes = self.treeView.selectedIndexes()
         if selectedIndexes and self.treeView.selectedIndexes()[0] == index:
             self.enable_actions()
@@ -205,8 +334,7 @@ class OrdersTab(QWidget):
         """
         Checks if collapsed row is selected, if is then disable `run_pushButton`
         """
-        item = self.treeModel.itemFromIndex(index)
-        item.setSelectable(False)
+        self.treeModel.set_expanded(index, False)
         selectedIndexes = self.treeView.selectedIndexes()
         if not selectedIndexes or self.treeView.selectedIndexes()[0] == index:
             self.enable_actions(False)
@@ -267,19 +395,16 @@ class OrdersTab(QWidget):
         Toggle between `done` or `todo` and `interrupted` orders
         """
         self.only_done = not self.only_done
-        self.treeModel.removeRows(0, self.treeModel.rowCount())
         if self.only_done:
             self.pushButton_toggleOrders.setText("Pokaż do wykonania")
         else:
             self.pushButton_toggleOrders.setText("Pokaż wykonane")
+        self.filter_bar.set_group(self.displayed_statuses())
         self.show_orders()
 
     def confirm_rerun(self):
-        confirmation = ConfirmationDONERun(
-            self,
-            self.ui_templates_dir,
-            self.selectedOrder
-        )
+        confirmation = self.__parent_class.dialog_cache.confirmation_DONE_run(
+            self.selectedOrder)
         confirmation.accepted.connect(self.runProcess)
         confirmation.exec_()
 
@@ -287,56 +412,70 @@ class OrdersTab(QWidget):
         def accepted():
             self.submit_output_to_ordersDB(True, self.selectedOrder)
 
-        confirmation = ConfirmationMarkAsDone(
-            self,
-            self.ui_templates_dir,
-            self.selectedOrder
-        )
+        confirmation = self.__parent_class.dialog_cache.confirmation_mark_as_DONE(
+            self.selectedOrder)
         confirmation.accepted.connect(accepted)
         confirmation.exec_()
 
     def confirm_print(self):
+        order = self.selectedOrder
+
+        def done():
+            logger.info("Additional label was added to printing queue")
+
+        def error(err_desc: str):
+            logger.error(f"Additional label printing failed. {err_desc}")
+            alert = self.__parent_class.dialog_cache.error_dialog(
+                "Błąd drukowania etykiety",
+                "Sprawdź czy drukarka jest poprawnie podłączona i czy jest włączona.",
+                True
+            )
+            alert.rejected.connect(print_label)
+            alert.exec()
+
         def print_label():
-            try:
-                printer = ZebraPrinter(
-                    self.selectedOrder.order_id,
-                    self.selectedOrder.customer_name,
-                    self.selectedOrder.length,
-                    self.selectedOrder.diameter
-                )
-                printer.print_label()
-                logger.info("Additional label was added to printing queue")
-            except Exception as e:
-                logger.error("Additional label printing failed")
-                alert = ErrorDialog(
-                    self.__parent_class,
-                    "Błąd drukowania etykiety",
-                    "Sprawdź czy drukarka jest poprawnie podłączona i czy jest włączona.",
-                    self.__buzzer,
-                    True
-                )
-                alert.rejected.connect(print_label)
-                alert.exec()
-
-        confirmation = ConfirmationPrintLabel(
-            self,
-            self.ui_templates_dir,
-            self.selectedOrder
-        )
+            # The printer is not waited for on the GUI thread
+            worker = PrintWorker(ZebraPrinter(order.order_id, order.customer_name, order.length, order.diameter))
+            # Done signal handling
+            worker.signals.done.connect(done)
+            # Error signal handling
+            worker.signals.error.connect(error)
+            # Queue request
+            executors.io.start(worker)
+
+        confirmation = self.__parent_class.dialog_cache.confirmation_print_label(
+            self.selectedOrder)
         confirmation.accepted.connect(print_label)
         confirmation.exec_()
 
+    def reloadOrders(self):
+        """
+        Drop displayed orders and read them again from the database (without reading `.csv` files)
+        """
+        def after(changes: OrdersChangeSet):
+            self.apply_changes(changes)
+            self.refresh_facets()
+            logger.info(f"Orders were reloaded ({changes})")
+
+        # Queue the action of the database thread
+        worker = OrdersDBWorker(OrdersDBActions.reload_orders)
+        # Done signal handling
+        worker.signals.done.connect(after)
+        # Error signal handling
+        worker.signals.error.connect(self.alert)
+        # Queue request
+        db_service.start(worker)
+
     def refreshOrders(self):
         # Disable `pushButton_refresh`
         self.pushButton_refresh.setDisabled(True)
 
-        def after(results: list):
-            # Clean treeView
-            self.treeModel.removeRows(0, self.treeModel.rowCount())
-            # Show records
-            self.orders = [Order(**result) for result in results]
-            self.show_orders()
-            logger.info("Orders was refershed")
+        def after(changes: OrdersChangeSet):
+            # Show changed records
+            self.apply_changes(changes)
+            logger.info(f"Orders was refershed ({changes})")
+            if changes:
+                self.refresh_facets()
             # Enable `pushButton_refresh`
             self.pushButton_refresh.setEnabled(True)
 
@@ -345,45 +484,31 @@ class OrdersTab(QWidget):
             self.pushButton_refresh.setEnabled(True)
             self.alert(err_title, err_desc)
 
-        # Thread definition
-        pool = QThreadPool.globalInstance()
-        worker = OrdersDBWorker(OrdersDBActions.read_csv_and_update_db)
+        # Queue the action of the database thread
+        worker = OrdersDBWorker(
+            OrdersDBActions.read_csv_and_update_db, self.__orders_version)
         # Done signal handling
         worker.signals.done.connect(after)
         # Error signal handling
         worker.signals.error.connect(error)
-        # Set action on thread start
-        worker.signals.started.connect(worker.run)
-        # Start thread
-        pool.start(worker)
+        # Queue request
+        db_service.start(worker)
 
     # Alert handlingfunction
 
     def alert(self, err_title, err_desc):
-        alert = ErrorDialog(self.__parent_class, err_title,
-                            err_desc, self.__buzzer)
+        alert = self.__parent_class.dialog_cache.error_dialog(
+            err_title, err_desc)
         alert.exec()
 
     def check_input(self):
         try:
             if self.treeView.currentIndex():
-                # Get id of selected order
-                order_id = self.treeView.currentIndex().data()
-                # Find order with order_id in orders list
-                selectedOrder: Order = next(
-                    (sub for sub in self.orders if sub.order_id == order_id), None)
-                # Make validation and necessary types conversions
-                # Read and valid `length`
-                if selectedOrder.length <= int(os.getenv('START_LENGHT')):
-                    return False
-                # Read and valid `quantity`
-                if selectedOrder.quantity <= 0:
-                    return False
-                # Read and valid `diameter`
-                if selectedOrder.diameter <= 0:
-                    return False
-                # Read and valid `order_id`
-                if not match(pattern=r"^\d{6}/\d{2}/\d{4}/[a-zA-Z0-9/]{3,5}$", string=selectedOrder.order_id):
+                # Get selected order
+                selectedOrder: Order = self.treeModel.order_at(
+                    self.treeView.currentIndex())
+                # Validation is precomputed on order creation, only `length` depends on settings
+                if not selectedOrder.is_runnable(int(os.getenv('START_LENGHT'))):
                     return False
 
                 # Add validated data to `self.selectedOrder`
@@ -396,58 +521,113 @@ class OrdersTab(QWidget):
             logger.error(e)
             return False
 
-    # Run process
-    def runProcess(self):
-        # Final check input check
-        if not self.check_input():
-            self.alert("Błędne dane wejściowe",
-                       "Wprowadzone dane nie są poprawne.")
-            logger.error("Wrong input data")
-            return
+    def is_machine_ready(self) -> bool:
+        """
+        Check the machine before the winding process, alert the user if it can not be started
+        """
         if self.machine_control.is_motor_on():
             self.alert("Maszyna jest w ruchu.",
                        "Wyłącz silnik nawijarki przed rozpoczęciem.")
             logger.error("The machine was running before")
-            return
+            return False
         if not self.machine_control.is_in_zero_positon():
             self.alert("Bęben wyciągarki jest w złej pozycji",
                        "Przywróć bęben do pozycji zerowej.\n PAMIĘTAJ O ODCZEPIENIU LINKI OD BĘBNA PRZED PRZYWRACANIEM.")
             logger.error("Winder drum is in bad position")
+            return False
+        return True
+
+    # Run process
+    def runProcess(self):
+        # Final check input check
+        if not self.check_input():
+            self.alert("Błędne dane wejściowe",
+                       "Wprowadzone dane nie są poprawne.")
+            logger.error("Wrong input data")
+            return
+        if not self.is_machine_ready():
             return
         if self.selectedOrder:
             logger.success(
                 "Successfully run `winding_in_progress` by 'tab_manual_winding'")
-            self.winding_dialog = WindingInProgressDialog(
-                parent_class=self.__parent_class,
-                ui_templates_dir=self.ui_templates_dir,
-                machine_control=self.machine_control,
-                buzzer=self.__buzzer,
-                encoder=self.encoder,
+            self.open_winding_dialog(
                 length_target=self.selectedOrder.length,
                 quantity_target=self.selectedOrder.quantity,
                 diameter=self.selectedOrder.diameter,
                 order_id=self.selectedOrder.order_id,
                 customer_name=self.selectedOrder.customer_name
             )
-
-            self.winding_dialog.rejected.connect(self.on_rejected)
-            self.winding_dialog.accepted.connect(self.on_accepted)
-            self.winding_dialog.exec_()
         else:
             self.alert("Nie wybrano zlecenia",
                        "Wybierz zlecenie przed rozpoczęciem")
 
+    def open_winding_dialog(self, **order):
+        self.winding_dialog = self.__parent_class.dialog_cache.winding_dialog(**order)
+
+        self.winding_dialog.rejected.connect(self.on_rejected)
+        self.winding_dialog.accepted.connect(self.on_accepted)
+        self.winding_dialog.exec_()
+
+    def offerResume(self):
+        """
+        Offer to resume the order whose winding was interrupted by a crash or a power loss,
+        read from the winding journal (`CheckpointJournal.pending`)
+        """
+        checkpoint = journal.pending()
+        if checkpoint is None:
+            return
+        logger.warning(f"Winding of the order was not finished: {checkpoint}")
+        if checkpoint.ropes >= checkpoint.quantity_target:
+            # All ropes were made before the crash
+            journal.end(True, checkpoint.ropes)
+            self.submit_output_to_ordersDB(True, checkpoint=checkpoint)
+            return
+
+        confirmation = ConfirmationResume(
+            self.__parent_class, self.ui_templates_dir, checkpoint)
+        confirmation.accepted.connect(lambda: self.resumeProcess(checkpoint))
+        confirmation.rejected.connect(lambda: self.discardCheckpoint(checkpoint))
+        confirmation.exec_()
+
+    def resumeProcess(self, checkpoint: WindingCheckpoint):
+        if not self.is_machine_ready():
+            # Offered again once the machine is prepared
+            QTimer.singleShot(0, self.offerResume)
+            return
+        logger.success(f"Winding of the order {checkpoint.order_id} resumed at rope {checkpoint.ropes + 1}")
+        self.open_winding_dialog(
+            length_target=checkpoint.length_target,
+            quantity_target=checkpoint.quantity_target,
+            diameter=checkpoint.diameter,
+            order_id=checkpoint.order_id,
+            customer_name=checkpoint.customer_name or "",
+            ropes_done=checkpoint.ropes,
+            runtime_s=checkpoint.runtime_s
+        )
+
+    def discardCheckpoint(self, checkpoint: WindingCheckpoint):
+        """
+        The interrupted order is not resumed, it is marked as interrupted
+        """
+        journal.end(False, checkpoint.ropes)
+        self.submit_output_to_ordersDB(False, checkpoint=checkpoint)
+
     def on_accepted(self):
         self.submit_output_to_ordersDB(success=True)
 
     def on_rejected(self):
         self.submit_output_to_ordersDB(success=False)
 
-    def submit_output_to_ordersDB(self, success: bool, order: Order = None):
+    def submit_output_to_ordersDB(self, success: bool, order: Order = None, checkpoint: WindingCheckpoint = None):
         # Disable `pushButton_run` and `pushButton_refresh`
         self.pushButton_run.setDisabled(True)
         self.pushButton_refresh.setEnabled(True)
-        if order is None:
+        if checkpoint is not None:
+            # Order interrupted by a crash, data from the winding journal
+            order_id = checkpoint.order_id
+            production_time = checkpoint.runtime_s
+            done_date = datetime.now().strftime("%Y-%m-%d %H:%M")
+        elif order is None:
             # Capture data from `winding_dialog`
             order_id = self.winding_dialog.order_id
             production_time = self.winding_dialog.final_execution_time
@@ -462,12 +642,11 @@ class OrdersTab(QWidget):
             done_date = datetime.now().strftime("%Y-%m-%d %H:%M")
 
         # Define signals actions
-        def after(results=list[Row]):
-            # Clean treeView
-            self.treeModel.removeRows(0, self.treeModel.rowCount())
-            # Refresh records
-            self.refreshOrders()
-            logger.info("Orders were updated")
+        def after(changes: OrdersChangeSet):
+            # Show only changed records (the updated order)
+            self.apply_changes(changes)
+            self.refresh_facets()
+            logger.info(f"Orders were updated ({changes})")
             # Enable `pushButton_refresh`
             self.pushButton_refresh.setEnabled(True)
 
@@ -478,19 +657,16 @@ class OrdersTab(QWidget):
                 "Orders were NOT updated.")
             self.alert(err_title, err_desc)
 
-        # Thread definition
-        pool = QThreadPool.globalInstance()
+        # Queue the action of the database thread
         if success:
             worker = OrdersDBWorker(
-                OrdersDBActions.set_done_status, order_id, production_time, done_date)
+                OrdersDBActions.set_done_status, order_id, production_time, done_date, self.__orders_version)
         else:
             worker = OrdersDBWorker(
-                OrdersDBActions.set_interrupted_status, order_id, production_time, done_date)
+                OrdersDBActions.set_interrupted_status, order_id, production_time, done_date, self.__orders_version)
         # Done signal handling
         worker.signals.done.connect(after)
         # Error signal handling
         worker.signals.error.connect(error)
-        # Set action on thread start
-        worker.signals.started.connect(worker.run)
-        # Start thread
-        pool.start(worker)
+        # Queue request
+        db_service.start(worker)
@@ -0,0 +1,197 @@
+import time
+from collections import deque
+from loguru import logger
+from PyQt5.QtCore import Qt, QObject, QEvent, QTimer, QRectF, QPointF
+from PyQt5.QtGui import QPainter, QColor, QFont, QPolygonF
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from encoder import Encoder
+from executors import executors
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """
+    Returns percentile of sorted `values`, `0.0` if there are no values
+    """
+    if not values:
+        return 0.0
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class PerformanceMonitor(QObject):
+    """
+    PerformanceMonitor
+    ---
+
+    Measures responsiveness of the GUI thread while the application is running:
+    - event loop lag - heartbeat `QTimer` fires every `HEARTBEAT_MS`, the delay of each beat is the time
+      in which the GUI thread was busy and could not handle events (e.g. touch of a button),
+    - queued signals per second - signals emitted in other threads and delivered to the GUI thread
+      (`QEvent.MetaCall` events seen by the application event filter). The filter is called for every event
+      of the application, so it is installed only for one second of each `SIGNALS_SAMPLE_EVERY_S`,
+      or all the time while `continuous` is set (overlay is visible),
+    - encoder edges per second.
+
+    Stats are summarized every second (`history` for the overlay) and written to the log every `LOG_INTERVAL_S`
+    together with the stats of the executors, so they can be compared with state changes of the winding process.
+
+    Parameters
+    ---
+
+    :encoder: `Encoder` whose edges are counted
+    """
+    HEARTBEAT_MS = 50
+    # Number of the last heartbeat lags kept for percentiles (one minute)
+    LAGS_WINDOW = 60 * 1000 // HEARTBEAT_MS
+    # Number of the last seconds kept for the graph
+    HISTORY_WINDOW = 120
+    LOG_INTERVAL_S = 60
+    SIGNALS_SAMPLE_EVERY_S = 10
+
+    def __init__(self, encoder: Encoder):
+        super().__init__()
+        self.__encoder = encoder
+        self.__lags: deque[float] = deque(maxlen=self.LAGS_WINDOW)
+        # Per second stats `(max lag [ms], queued signals, encoder edges)`
+        self.history: deque[tuple] = deque(maxlen=self.HISTORY_WINDOW)
+        self.__queued_signals = 0
+        self.__counting_signals = False
+        # Rate of the last sample [1/s]
+        self.__signals_rate = 0.0
+        self.__seconds = 0
+        self.__second_lag = 0.0
+        self.continuous = False
+        self.__last_edges = encoder.edges()
+        self.__last_second = time.perf_counter()
+        self.__last_log = self.__last_second
+        # Called after each second summary (overlay repaint)
+        self.listeners = []
+
+        self.__heartbeat = QTimer(self)
+        self.__heartbeat.setTimerType(Qt.PreciseTimer)
+        self.__heartbeat.timeout.connect(self.__beat)
+        self.__last_beat = time.perf_counter()
+        self.__heartbeat.start(self.HEARTBEAT_MS)
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.MetaCall:
+            self.__queued_signals += 1
+        return False
+
+    def __beat(self):
+        now = time.perf_counter()
+        lag = max((now - self.__last_beat) * 1000 - self.HEARTBEAT_MS, 0.0)
+        self.__last_beat = now
+        self.__lags.append(lag)
+        self.__second_lag = max(self.__second_lag, lag)
+
+        if now - self.__last_second >= 1.0:
+            self.__summarize_second(now)
+        if now - self.__last_log >= self.LOG_INTERVAL_S:
+            self.__last_log = now
+            logger.info(f"Performance: {self.format_stats()}")
+            logger.info(f"Executors: {executors.format_stats()}")
+
+    def __summarize_second(self, now: float):
+        elapsed = now - self.__last_second
+        self.__last_second = now
+        edges = self.__encoder.edges()
+        if self.__counting_signals:
+            self.__signals_rate = self.__queued_signals / elapsed
+            self.__queued_signals = 0
+        self.__count_signals(self.continuous or
+                             self.__seconds % self.SIGNALS_SAMPLE_EVERY_S == 0)
+        self.__seconds += 1
+        self.history.append((self.__second_lag, self.__signals_rate,
+                             (edges - self.__last_edges) / elapsed))
+        self.__last_edges = edges
+        self.__second_lag = 0.0
+        for listener in self.listeners:
+            listener()
+
+    def __count_signals(self, enabled: bool):
+        if enabled == self.__counting_signals:
+            return
+        self.__counting_signals = enabled
+        if enabled:
+            QApplication.instance().installEventFilter(self)
+        else:
+            QApplication.instance().removeEventFilter(self)
+
+    def stats(self) -> dict:
+        """
+        Returns lag percentiles of the last minute [ms] and the last measured rates [1/s]
+        """
+        lags = sorted(self.__lags)
+        _, signals, edges = self.history[-1] if self.history else (0, 0, 0)
+        return {
+            "p50_lag_ms": percentile(lags, 0.5),
+            "p99_lag_ms": percentile(lags, 0.99),
+            "max_lag_ms": lags[-1] if lags else 0.0,
+            "queued_signals_per_s": signals,
+            "encoder_edges_per_s": edges,
+        }
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        return (f"event loop lag p50 {stats['p50_lag_ms']:.1f} ms p99 {stats['p99_lag_ms']:.1f} ms "
+                f"max {stats['max_lag_ms']:.1f} ms, queued signals {stats['queued_signals_per_s']:.0f}/s, "
+                f"encoder edges {stats['encoder_edges_per_s']:.0f}/s")
+
+
+class PerformanceOverlay(QWidget):
+    """
+    PerformanceOverlay
+    ---
+
+    Diagnostic window drawn over all windows (also over `WindingInProgressDialog`), which shows stats of
+    `PerformanceMonitor` and a rolling graph of the maximal event loop lag of each second.
+    The overlay does not take focus and touches go through it. Repainted once per second.
+    """
+    GRAPH_HEIGHT = 80
+
+    def __init__(self, monitor: PerformanceMonitor):
+        super().__init__(None, Qt.Tool | Qt.FramelessWindowHint |
+                         Qt.WindowStaysOnTopHint | Qt.WindowTransparentForInput)
+        self.__monitor = monitor
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setFont(QFont("Tahoma", 10))
+        self.resize(360, 60 + self.GRAPH_HEIGHT)
+        self.move(0, 0)
+        monitor.listeners.append(self.__on_stats)
+
+    def setVisible(self, visible: bool):
+        # Signals are counted every second only while the overlay is visible
+        self.__monitor.continuous = visible
+        super().setVisible(visible)
+
+    def __on_stats(self):
+        if self.isVisible():
+            self.update()
+
+    def paintEvent(self, event):
+        stats = self.__monitor.stats()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 200))
+        painter.setPen(QColor("white"))
+        painter.drawText(QRectF(6, 4, self.width() - 12, 52), Qt.AlignLeft,
+                         f"Lag p50 {stats['p50_lag_ms']:.1f} ms   p99 {stats['p99_lag_ms']:.1f} ms   "
+                         f"max {stats['max_lag_ms']:.1f} ms\n"
+                         f"Sygnały {stats['queued_signals_per_s']:.0f}/s   "
+                         f"Enkoder {stats['encoder_edges_per_s']:.0f}/s")
+
+        # Graph of the maximal lag of each second, scaled to the highest value (at least 100 ms)
+        history = self.__monitor.history
+        if not history:
+            return
+        top = self.height() - self.GRAPH_HEIGHT
+        scale = max(100.0, max(lag for lag, _, _ in history))
+        step = self.width() / PerformanceMonitor.HISTORY_WINDOW
+        points = [QPointF(i * step, self.height() - lag / scale * self.GRAPH_HEIGHT)
+                  for i, (lag, _, _) in enumerate(history)]
+        painter.setPen(QColor("#555555"))
+        painter.drawLine(0, top, self.width(), top)
+        painter.drawText(QRectF(0, top, self.width() - 6, 16),
+                         Qt.AlignRight, f"{scale:.0f} ms")
+        painter.setPen(QColor("#ffaa00"))
+        painter.drawPolyline(QPolygonF(points))
@@ -0,0 +1,96 @@
+import time
+import threading
+from contextlib import contextmanager
+from loguru import logger
+
+
+class StartupProfiler:
+    """
+    StartupProfiler
+    ---
+
+    `StartupProfiler` records a timeline of the application startup phases (imports, pigpio connection, DB open, tabs, first paint).
+    Phases may be recorded from any thread. The timeline is written to the log once the first paint is done and
+    all started phases are finished. With `dump` set to `True` the breakdown is also printed to stdout.
+
+    Phases started after the report was made are not recorded.
+    """
+
+    def __init__(self):
+        self.__start = time.perf_counter()
+        self.__lock = threading.Lock()
+        # Recorded phases `(name, start offset [s], duration [s])`
+        self.__phases: list[tuple[str, float, float]] = []
+        self.__open_phases = 0
+        self.__finish_requested = False
+        self.__reported = False
+        self.dump = False
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Context manager which records the duration of the enclosed block as a startup phase
+        """
+        with self.__lock:
+            active = not self.__reported
+            if active:
+                self.__open_phases += 1
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            if active:
+                end = time.perf_counter()
+                with self.__lock:
+                    self.__phases.append(
+                        (name, begin - self.__start, end - begin))
+                    self.__open_phases -= 1
+                self.__report_if_ready()
+
+    def mark(self, name: str):
+        """
+        Record an instant event (phase with zero duration)
+        """
+        with self.__lock:
+            if not self.__reported:
+                self.__phases.append(
+                    (name, time.perf_counter() - self.__start, 0.0))
+
+    def finish(self):
+        """
+        Request the report. It is made as soon as all started phases are finished.
+        """
+        with self.__lock:
+            self.__finish_requested = True
+        self.__report_if_ready()
+
+    def __report_if_ready(self):
+        with self.__lock:
+            if self.__reported or not self.__finish_requested or self.__open_phases:
+                return
+            self.__reported = True
+            phases = sorted(self.__phases, key=lambda phase: phase[1])
+        report = self.format_report(phases)
+        logger.info(f"Startup timeline:\n{report}")
+        if self.dump:
+            print(report, flush=True)
+
+    def format_report(self, phases: list[tuple[str, float, float]] = None) -> str:
+        """
+        Return the timeline as a text table
+        """
+        if phases is None:
+            with self.__lock:
+                phases = sorted(self.__phases, key=lambda phase: phase[1])
+        lines = [f"{'phase':<32}{'start [ms]':>12}{'duration [ms]':>16}"]
+        for name, begin, duration in phases:
+            lines.append(
+                f"{name:<32}{begin * 1000:>12.1f}{duration * 1000:>16.1f}")
+        total = max((begin + duration for _, begin, duration in phases),
+                    default=0.0)
+        lines.append(f"{'total':<32}{'':>12}{total * 1000:>16.1f}")
+        return "\n".join(lines)
+
+
+# Profiler shared by all modules, created with the first import (as early as possible)
+profiler = StartupProfiler()
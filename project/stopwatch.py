@@ -34,6 +34,13 @@ class Stopwatch:
         self.__time_before_paused = self.__measuerd_time
         self.__logs.info("Stopwatch stopped")
 
+    def set_time(self, measured_time: float):
+        """
+        Set the measured time, the `stopwatch` continues from it (resumed order)
+        """
+        self.__measuerd_time = measured_time
+        self.__time_before_paused = measured_time
+
     def reset(self):
         """
         Reset the `stopwatch`
@@ -8,11 +8,10 @@ from loguru import logger
 from encoder import Encoder
 from buzzer import Buzzer
 from machine_control import MachineControl, MachineWorker
-from LOGS.error_handling import ErrorDialog
 from db.read_csv import Row
 from orders.order import Order
-from winding_in_progres import WindingInProgressDialog
 from db.db import OrdersDBWorker, OrdersDBActions
+from db.service import db_service
 
 
 class ManualInsertingTab(QtWidgets.QWidget):
@@ -128,8 +127,8 @@ class ManualInsertingTab(QtWidgets.QWidget):
 
     # Alert handlingfunction
     def alert(self, err_title, err_desc):
-        alert = ErrorDialog(self.parent_class, err_title,
-                            err_desc, self.buzzer)
+        alert = self.parent_class.dialog_cache.error_dialog(
+            err_title, err_desc)
         alert.exec()
 
     # Touchboard handler functions
@@ -201,12 +200,7 @@ class ManualInsertingTab(QtWidgets.QWidget):
         self.add_order_to_db(order)
         logger.success(
             "Successfully run `winding_in_progress` by 'tab_manual_winding'")
-        self.winding_dialog = WindingInProgressDialog(
-            parent_class=self.parent_class,
-            ui_templates_dir=self.ui_templates_dir,
-            machine_control=self.machine_control,
-            buzzer=self.buzzer,
-            encoder=self.encoder,
+        self.winding_dialog = self.parent_class.dialog_cache.winding_dialog(
             length_target=order.length,
             quantity_target=order.quantity,
             diameter=order.diameter,
@@ -255,8 +249,7 @@ class ManualInsertingTab(QtWidgets.QWidget):
                 "Orders were NOT updated.")
             self.alert(err_title, err_desc)
 
-        # Thread definition
-        pool = QtCore.QThreadPool.globalInstance()
+        # Queue the action of the database thread
         if success:
             worker = OrdersDBWorker(
                 OrdersDBActions.set_done_status, order_id, production_time, done_date)
@@ -267,19 +260,14 @@ class ManualInsertingTab(QtWidgets.QWidget):
         worker.signals.done.connect(after)
         # Error signal handling
         worker.signals.error.connect(error)
-        # Set action on thread start
-        worker.signals.started.connect(worker.run)
-        # Start thread
-        pool.start(worker)
+        # Queue request
+        db_service.start(worker)
 
     def add_order_to_db(self, order: Row):
 
-        # Thread definition
-        pool = QtCore.QThreadPool.globalInstance()
+        # Queue the action of the database thread
         worker = OrdersDBWorker(OrdersDBActions.insert_row, [order])
         # Error signal handling
         worker.signals.error.connect(self.alert)
-        # Set action on thread start
-        worker.signals.started.connect(worker.run)
-        # Start thread
-        pool.start(worker)
+        # Queue request
+        db_service.start(worker)
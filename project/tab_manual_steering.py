@@ -4,11 +4,11 @@ import threading
 from functools import partial
 from loguru import logger
 from PyQt5.QtWidgets import QMainWindow,  QPushButton, QWidget
-from PyQt5 import uic, QtCore
+from PyQt5 import uic
 
 from encoder import Encoder
 from machine_control import MachineControl, Actions, MachineWorker
-from LOGS.error_handling import ErrorDialog
+from executors import executors
 
 
 class ManualSteeringTab(QWidget):
@@ -67,8 +67,8 @@ class ManualSteeringTab(QWidget):
             print("Module ManualSteeringTab initialization failed.", e, sep='\n')
 
     def alert(self, err_title, err_desc):
-        alert = ErrorDialog(self.parent_class, err_title,
-                            err_desc, self.buzzer)
+        alert = self.parent_class.dialog_cache.error_dialog(
+            err_title, err_desc)
         alert.exec_()
 
     def winder_STOP(self):
@@ -76,7 +76,7 @@ class ManualSteeringTab(QWidget):
         self.stop_pushButton.setDisabled(True)
         # Thread definition
         action = Actions.winder_STOP
-        pool = QtCore.QThreadPool.globalInstance()
+        pool = executors.machine
         worker = MachineWorker(self.machine_control, action)
         # Done signal handling
         worker.signals.done.connect(self.unlockUIAfterExecution)
@@ -96,7 +96,7 @@ class ManualSteeringTab(QWidget):
         self.guillotine_pushButton.setDisabled(True)
         # Thread definition
         action = Actions.winder_clockwise
-        pool = QtCore.QThreadPool.globalInstance()
+        pool = executors.machine
         worker = MachineWorker(self.machine_control, action)
         # Done signal handling
         # Error signal handling
@@ -126,7 +126,7 @@ class ManualSteeringTab(QWidget):
 
         # Thread definition
         action = Actions.winder_reset_position
-        pool = QtCore.QThreadPool.globalInstance()
+        pool = executors.machine
         worker = MachineWorker(self.machine_control, action)
         # Done signal handling
         worker.signals.done.connect(self.unlockUIAfterExecution)
@@ -0,0 +1,125 @@
+import os
+from datetime import date, timedelta
+from PyQt5 import QtWidgets
+from PyQt5 import uic
+from loguru import logger
+
+from db.db import OrdersDBWorker, OrdersDBActions
+from db.service import db_service
+
+
+class StatisticsTab(QtWidgets.QWidget):
+    """
+    StatisticsTab
+    ---
+
+    Production of `DONE` orders (orders, ropes, metres, average time of one rope) in the chosen period,
+    per day and per diameter. Read from the `daily_stats` summary kept up to date by the database when an order
+    is done, so the tab reads a few rows per day and never aggregates the orders. Refreshed each time the tab
+    is shown.
+
+    Parameters
+    ---
+
+    :parent_class: main window with the `tabWidget`
+    :ui_templates_dir: directory of the `.ui` templates
+    """
+    # Number of days before today of the period buttons, `None` means all the history
+    PERIODS = {
+        "today_pushButton": 0,
+        "week_pushButton": 6,
+        "month_pushButton": 29,
+        "year_pushButton": 364,
+        "all_pushButton": None,
+    }
+
+    def __init__(self, parent_class: QtWidgets.QMainWindow, ui_templates_dir: str):
+        super().__init__()
+
+        try:
+            uic.loadUi(os.path.join(
+                ui_templates_dir, "statistics_tab.ui"), self)
+
+            self.parent_class = parent_class
+            self.__days_back = self.PERIODS["today_pushButton"]
+
+            # Period buttons
+            for button_name, days_back in self.PERIODS.items():
+                button: QtWidgets.QPushButton = getattr(self, button_name)
+                button.clicked.connect(
+                    lambda _, days_back=days_back: self.onPeriodChanged(days_back))
+
+            self.refresh_pushButton: QtWidgets.QPushButton
+            self.refresh_pushButton.clicked.connect(lambda: self.refresh())
+
+            self.days_tableWidget: QtWidgets.QTableWidget
+            self.diameters_tableWidget: QtWidgets.QTableWidget
+            for table in (self.days_tableWidget, self.diameters_tableWidget):
+                table.horizontalHeader().setSectionResizeMode(
+                    QtWidgets.QHeaderView.ResizeToContents)
+
+            # Add tab to main window
+            parent_class.tabWidget.addTab(self, "Statystyki")
+
+        except Exception as e:
+            print("Module StatisticsTab initialization failed.", e, sep='\n')
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def onPeriodChanged(self, days_back: int):
+        self.__days_back = days_back
+        self.refresh()
+
+    def refresh(self):
+        """
+        Queue the read of the statistics of the chosen period, requests are executed in order
+        by the database thread, so the last one is displayed
+        """
+        since = None
+        if self.__days_back is not None:
+            since = (date.today() - timedelta(days=self.__days_back)).isoformat()
+
+        def done(stats: dict):
+            self.__show(stats)
+
+        def error(err_title: str = None, err_desc: str = None):
+            logger.error(f"Production statistics were NOT read. {err_desc}")
+
+        # Queue the action of the database thread
+        worker = OrdersDBWorker(OrdersDBActions.get_production_stats, since)
+        # Done signal handling
+        worker.signals.done.connect(done)
+        # Error signal handling
+        worker.signals.error.connect(error)
+        # Queue request
+        db_service.start(worker)
+
+    def __show(self, stats: dict):
+        total = stats["total"]
+        self.orders_label.setText(f"Zlecenia: {total['orders'] or 0}")
+        self.ropes_label.setText(f"Liny: {total['ropes'] or 0}")
+        self.length_label.setText(f"Metry: {total['length_m'] or 0:.1f}")
+        self.cycle_label.setText(f"Śr. czas liny: {self.__format_cycle(total['avg_cycle_s'])}")
+        self.__fill_table(self.days_tableWidget, stats["days"])
+        self.__fill_table(self.diameters_tableWidget, stats["diameters"])
+
+    def __fill_table(self, table: QtWidgets.QTableWidget, rows: dict):
+        table.setRowCount(len(rows))
+        for row, (key, values) in enumerate(rows.items()):
+            cells = (
+                str(key),
+                str(values["orders"]),
+                str(values["ropes"]),
+                f"{values['length_m']:.1f}",
+                self.__format_cycle(values["avg_cycle_s"]),
+            )
+            for column, text in enumerate(cells):
+                table.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+
+    @staticmethod
+    def __format_cycle(seconds: float) -> str:
+        if seconds is None:
+            return "-"
+        return f"{seconds:.1f} s"
@@ -0,0 +1,251 @@
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from loguru import logger
+
+from db.service import resolve_db_path
+
+# Journal of the winding process, kept on the local storage next to the local database
+DEFAULT_JOURNAL_PATH = os.path.join("local_DB", "winding_journal.jsonl")
+
+
+class WindingCheckpoint:
+    """
+    Last state of the order recorded in the journal: the order, number of finished ropes,
+    phase (name of the state) and runtime of the order in seconds
+    """
+    __slots__ = ("order_id", "length_target", "quantity_target", "diameter", "customer_name",
+                 "ropes", "phase", "runtime_s", "at")
+
+    def __init__(self, record: dict):
+        for name in self.__slots__:
+            setattr(self, name, record.get(name))
+        self.ropes = self.ropes or 0
+        self.runtime_s = self.runtime_s or 0.0
+
+    def update(self, record: dict):
+        self.ropes = record.get("ropes", self.ropes)
+        self.phase = record.get("phase", self.phase)
+        self.runtime_s = record.get("runtime_s", self.runtime_s)
+        self.at = record.get("at", self.at)
+
+    def __repr__(self):
+        return (f"WindingCheckpoint({self.order_id}, {self.ropes}/{self.quantity_target} ropes, "
+                f"phase {self.phase}, runtime {self.runtime_s:.0f} s, at {self.at})")
+
+
+class CheckpointJournal:
+    """
+    CheckpointJournal
+    ---
+
+    Append-only journal of the winding process, one JSON line per record, so the order interrupted by a crash
+    or a power loss can be resumed at the right rope (`pending`). `begin` starts the journal of a new order
+    (the file is truncated, only the current order is kept), `transition` records the state and the number
+    of finished ropes, `end` closes the order.
+
+    Records are only queued by the caller (the GUI thread), they are written and synced to the disk (`fsync`)
+    by the `Winding_journal` thread. Records are made only on state transitions, records queued while the
+    previous `fsync` was running are written together and synced once.
+
+    Parameters
+    ---
+
+    :path: path of the journal, `None` means `WINDING_JOURNAL_PATH` env or the default path
+    """
+
+    def __init__(self, path: str = None):
+        self.__path = path
+        self.__queue = queue.SimpleQueue()
+        self.__thread: threading.Thread = None
+        self.__lock = threading.Lock()
+        # Last recorded `(phase, ropes)`, a render without a change is not recorded
+        self.__last: tuple = None
+        # Statistics
+        self.__records = 0
+        self.__syncs = 0
+        self.__sync_time = 0.0
+        self.__max_sync = 0.0
+        self.__max_enqueue = 0.0
+        self.__errors = 0
+
+    @property
+    def path(self) -> str:
+        if self.__path is None:
+            self.__path = resolve_db_path(
+                os.getenv("WINDING_JOURNAL_PATH") or DEFAULT_JOURNAL_PATH)
+        return self.__path
+
+    def pending(self) -> WindingCheckpoint:
+        """
+        Returns the checkpoint of the order which was not ended (the application was closed during the winding),
+        `None` if there is no such order. A torn last line (crash during the write) is skipped.
+        """
+        checkpoint = None
+        try:
+            with open(self.path, "r", encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    event = record.get("event")
+                    if event == "begin":
+                        checkpoint = WindingCheckpoint(record)
+                    elif event == "state" and checkpoint is not None:
+                        checkpoint.update(record)
+                    elif event == "end":
+                        checkpoint = None
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error(f"Winding journal {self.path} was NOT read: {e}")
+            return None
+        return checkpoint
+
+    def begin(self, order_id: str, length_target: int, quantity_target: int, diameter: float,
+              customer_name: str = "", ropes: int = 0, runtime_s: float = 0.0):
+        """
+        Start the journal of the order, `ropes` and `runtime_s` of the resumed order
+        """
+        self.__last = (None, ropes)
+        self.__put("begin", {
+            "order_id": order_id, "length_target": length_target, "quantity_target": quantity_target,
+            "diameter": diameter, "customer_name": customer_name, "ropes": ropes, "runtime_s": runtime_s,
+        })
+
+    def transition(self, phase: str, ropes: int, runtime_s: float):
+        """
+        Record the state entered by the winding process, skipped if neither the state nor the ropes changed
+        """
+        if (phase, ropes) == self.__last:
+            return
+        self.__last = (phase, ropes)
+        self.__put("state", {"phase": phase, "ropes": ropes, "runtime_s": round(runtime_s, 1)})
+
+    def end(self, completed: bool, ropes: int = None):
+        """
+        Close the order, it is no longer `pending`
+        """
+        self.__last = None
+        self.__put("end", {"completed": bool(completed), "ropes": ropes})
+
+    def __put(self, event: str, record: dict):
+        started = time.perf_counter()
+        record["event"] = event
+        record["at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.__ensure_thread()
+        self.__queue.put(record)
+        with self.__lock:
+            self.__max_enqueue = max(self.__max_enqueue, time.perf_counter() - started)
+
+    def __ensure_thread(self):
+        if self.__thread is None or not self.__thread.is_alive():
+            self.__thread = threading.Thread(
+                target=self.__run, daemon=True, name="Winding_journal")
+            self.__thread.start()
+
+    def __run(self):
+        journal = None
+        while True:
+            records = [self.__queue.get()]
+            # Records queued in the meantime are written with one `fsync`
+            try:
+                while True:
+                    records.append(self.__queue.get_nowait())
+            except queue.Empty:
+                pass
+            stop = None in records
+            records = [record for record in records if record is not None]
+            try:
+                journal = self.__write(journal, records)
+            except OSError as e:
+                with self.__lock:
+                    self.__errors += 1
+                logger.error(f"Winding journal {self.path} was NOT written: {e}")
+                if journal is not None:
+                    journal.close()
+                    journal = None
+            if stop:
+                if journal is not None:
+                    journal.close()
+                return
+
+    def __write(self, journal, records: list[dict]):
+        if not records:
+            return journal
+        # Journal of a new order replaces the previous one
+        begin = max((i for i, record in enumerate(records) if record["event"] == "begin"), default=None)
+        if begin is not None:
+            if journal is not None:
+                journal.close()
+            journal = self.__open(truncate=True)
+            records = records[begin:]
+        elif journal is None:
+            journal = self.__open(truncate=False)
+
+        journal.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        journal.flush()
+        started = time.perf_counter()
+        os.fsync(journal.fileno())
+        elapsed = time.perf_counter() - started
+        with self.__lock:
+            self.__records += len(records)
+            self.__syncs += 1
+            self.__sync_time += elapsed
+            self.__max_sync = max(self.__max_sync, elapsed)
+        return journal
+
+    def __open(self, truncate: bool):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        created = not os.path.exists(self.path)
+        journal = open(self.path, "w" if truncate else "a", encoding="utf-8")
+        if not truncate and journal.tell() > 0:
+            # Line torn by the crash is terminated, so the next record is read
+            with open(self.path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    journal.write("\n")
+        if created:
+            # Entry of the new file is synced as well, not only its content
+            try:
+                descriptor = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(descriptor)
+                finally:
+                    os.close(descriptor)
+            except OSError:
+                pass
+        return journal
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "records": self.__records,
+                "syncs": self.__syncs,
+                "avg_sync_ms": self.__sync_time / self.__syncs * 1000 if self.__syncs else 0.0,
+                "max_sync_ms": self.__max_sync * 1000,
+                "max_enqueue_us": self.__max_enqueue * 1_000_000,
+                "errors": self.__errors,
+            }
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        return (f"{stats['records']} records, {stats['syncs']} fsyncs (avg {stats['avg_sync_ms']:.1f} ms, "
+                f"max {stats['max_sync_ms']:.1f} ms), max enqueue {stats['max_enqueue_us']:.0f} us, "
+                f"{stats['errors']} errors")
+
+    def stop(self, timeout: float = 5):
+        """
+        Write the queued records and stop the thread
+        """
+        if self.__thread is not None and self.__thread.is_alive():
+            self.__queue.put(None)
+            self.__thread.join(timeout)
+
+
+journal = CheckpointJournal()
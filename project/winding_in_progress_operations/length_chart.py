@@ -0,0 +1,178 @@
+import time
+import numpy as np
+from PyQt5.QtCore import Qt, QTimer, QPointF, QRectF
+from PyQt5.QtGui import QPainter, QColor, QFont, QPen, QPolygonF
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+
+
+class SampleRingBuffer:
+    """
+    SampleRingBuffer
+    ---
+
+    Fixed-size buffer of `(time, length)` samples stored in NumPy arrays. When the buffer is full
+    the oldest samples are overwritten, so memory and the cost of reading the buffer do not grow with the rope.
+
+    Parameters
+    ---
+
+    :capacity: number of kept samples
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.__times = np.zeros(capacity, dtype=np.float64)
+        self.__lengths = np.zeros(capacity, dtype=np.float64)
+        # Index of the next written sample
+        self.__next = 0
+        self.__size = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def clear(self):
+        self.__next = 0
+        self.__size = 0
+
+    def append(self, sample_time: float, length: float):
+        self.__times[self.__next] = sample_time
+        self.__lengths[self.__next] = length
+        self.__next = (self.__next + 1) % self.capacity
+        self.__size = min(self.__size + 1, self.capacity)
+
+    def samples(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns times and lengths ordered from the oldest sample
+        """
+        if self.__size < self.capacity:
+            return self.__times[:self.__size], self.__lengths[:self.__size]
+        order = np.r_[self.__next:self.capacity, 0:self.__next]
+        return self.__times[order], self.__lengths[order]
+
+
+def decimate(times: np.ndarray, lengths: np.ndarray, t_begin: float, t_end: float, width: int):
+    """
+    Min/max decimation of samples ordered by time to `width` columns (screen pixels).
+    Returns columns and the minimal and maximal length of each column which contains samples,
+    so a chart of any number of samples is drawn with at most `2 * width` points without losing peaks.
+    """
+    scale = width / max(t_end - t_begin, 1e-9)
+    columns = ((times - t_begin) * scale).astype(np.intp)
+    np.clip(columns, 0, width - 1, out=columns)
+    starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+    return columns[starts], np.minimum.reduceat(lengths, starts), np.maximum.reduceat(lengths, starts)
+
+
+class LengthChart(QWidget):
+    """
+    LengthChart
+    ---
+
+    Chart of the wound length over time of the current rope, with the current speed.
+    Samples are added with `add_sample` at any rate, the chart is repainted at most every `REPAINT_MS`
+    and the samples are decimated to the width of the widget, so a repaint takes the same time for any rope.
+    """
+    CAPACITY = 32_768
+    # Maximal repaint rate of 20 Hz
+    REPAINT_MS = 50
+    # Minimal time window of the chart [s]
+    MIN_WINDOW_S = 10.0
+    # Time window for the speed calculation [s]
+    SPEED_WINDOW_S = 0.5
+    MARGIN = 8
+    HEIGHT = 160
+
+    def __init__(self, parent: QWidget = None):
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.setFixedHeight(self.HEIGHT)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setFont(QFont("Tahoma", 14))
+        self.__buffer = SampleRingBuffer(self.CAPACITY)
+        self.__target: int = None
+        self.__begin = time.perf_counter()
+        self.__dirty = False
+        self.__repaint_timer = QTimer(self)
+        self.__repaint_timer.timeout.connect(self.__repaint)
+
+    def reset(self, target: int = None):
+        """
+        Clear the chart before the next rope
+        """
+        if target is not None:
+            self.__target = target
+        self.__buffer.clear()
+        self.__begin = time.perf_counter()
+        self.__dirty = True
+        self.__schedule_repaint()
+
+    def add_sample(self, length: float):
+        self.__buffer.append(time.perf_counter() - self.__begin, length)
+        self.__dirty = True
+        self.__schedule_repaint()
+
+    def __schedule_repaint(self):
+        if not self.__repaint_timer.isActive():
+            self.__repaint_timer.start(self.REPAINT_MS)
+
+    def __repaint(self):
+        if self.__dirty:
+            self.__dirty = False
+            self.update()
+        else:
+            # Nothing new since the last repaint
+            self.__repaint_timer.stop()
+
+    def speed(self) -> float:
+        """
+        Returns winding speed [mm/s] over the last `SPEED_WINDOW_S`
+        """
+        if len(self.__buffer) < 2:
+            return 0.0
+        times, lengths = self.__buffer.samples()
+        start = int(np.searchsorted(times, times[-1] - self.SPEED_WINDOW_S))
+        start = min(start, len(times) - 2)
+        duration = times[-1] - times[start]
+        return float((lengths[-1] - lengths[start]) / duration) if duration > 0 else 0.0
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(30, 30, 30))
+        plot = QRectF(self.rect()).adjusted(self.MARGIN, self.MARGIN + 24,
+                                            -self.MARGIN, -self.MARGIN)
+        width = int(plot.width())
+        if width < 2 or plot.height() < 2:
+            return
+
+        times, lengths = self.__buffer.samples()
+        t_begin = float(times[0]) if len(times) else 0.0
+        t_end = max(float(times[-1]) if len(times) else 0.0,
+                    t_begin + self.MIN_WINDOW_S)
+        top = max(float(lengths.max()) if len(lengths) else 0.0,
+                  self.__target or 0) * 1.05 or 1.0
+
+        def y(value: float) -> float:
+            return plot.bottom() - value / top * plot.height()
+
+        painter.setPen(QColor("white"))
+        painter.drawText(QRectF(self.MARGIN, 0, plot.width(), 24), Qt.AlignLeft | Qt.AlignVCenter,
+                         f"{t_end - t_begin:.0f} s")
+        painter.drawText(QRectF(self.MARGIN, 0, plot.width(), 24), Qt.AlignRight | Qt.AlignVCenter,
+                         f"{self.speed():.0f} mm/s")
+        if self.__target:
+            painter.setPen(QPen(QColor("#00aa00"), 1, Qt.DashLine))
+            painter.drawLine(QPointF(plot.left(), y(self.__target)),
+                             QPointF(plot.right(), y(self.__target)))
+        if not len(times):
+            return
+
+        columns, minimums, maximums = decimate(
+            times, lengths, t_begin, t_end, width)
+        points = QPolygonF()
+        for column, minimum, maximum in zip(columns.tolist(), minimums.tolist(), maximums.tolist()):
+            x = plot.left() + column
+            points.append(QPointF(x, y(minimum)))
+            if maximum != minimum:
+                points.append(QPointF(x, y(maximum)))
+        painter.setPen(QPen(QColor("#ffaa00"), 2))
+        painter.drawPolyline(points)
@@ -0,0 +1,134 @@
+import time
+from datetime import datetime
+
+from winding_in_progress_operations.states import STATES
+
+
+class RopeEvent:
+    """
+    Record of one finished rope, a row of the `rope_events` table.
+    Lengths are in millimetres, times of the phases in seconds.
+    """
+    __slots__ = ("order_id", "sequence", "diameter", "trigger_length", "final_length",
+                 "confirmation_s", "winding_s", "cutting_s", "reset_s", "halted_s", "finished_at")
+
+    def __init__(
+            self,
+            order_id: str,
+            sequence: int,
+            diameter: float,
+            trigger_length: int,
+            final_length: int,
+            phases: dict[str, float],
+            finished_at: str
+    ):
+        self.order_id = order_id
+        self.sequence = sequence
+        self.diameter = diameter
+        # Length at which the winder was stopped
+        self.trigger_length = trigger_length
+        # Length measured after the rope was cut (the drum coasts after the stop)
+        self.final_length = final_length
+        self.confirmation_s = round(phases.get("confirmation", 0.0), 3)
+        self.winding_s = round(phases.get("winding", 0.0), 3)
+        self.cutting_s = round(phases.get("cutting", 0.0), 3)
+        self.reset_s = round(phases.get("reset", 0.0), 3)
+        self.halted_s = round(phases.get("halted", 0.0), 3)
+        self.finished_at = finished_at
+
+    def as_row(self) -> tuple:
+        return tuple(getattr(self, column) for column in self.__slots__)
+
+    def __repr__(self):
+        return (f"RopeEvent({self.order_id} #{self.sequence}, trigger {self.trigger_length} mm, "
+                f"final {self.final_length} mm)")
+
+
+class RopeEventRecorder:
+    """
+    RopeEventRecorder
+    ---
+
+    Collects `RopeEvent`s of the order in memory while the winding process is running. Time is accumulated for the
+    phase of each state entered by the engine (`enter`), the length after the coast is read when the measurement
+    is paused after the cut (`measurement_paused`) and the rope is closed by `rope_finished`.
+    Events are passed to `flush` in batches of `BATCH_SIZE` and the rest when the order ends (`finish`),
+    `flush` only queues the write, so the winding process never waits for the database.
+
+    Parameters
+    ---
+
+    :order_id: order of the ropes
+    :diameter: diameter of the rope
+    :flush: function `flush(events: list[RopeEvent])` which writes the events
+    """
+    BATCH_SIZE = 10
+    # Phases of the states, states of the failures, pause and cancel are `halted`
+    PHASES = {
+        STATES.next_run_confirmation: "confirmation",
+        STATES.winding: "winding",
+        STATES.cut_rope: "cutting",
+        STATES.reset_position: "reset",
+    }
+
+    def __init__(self, order_id: str, diameter: float, flush):
+        self.__order_id = order_id
+        self.__diameter = diameter
+        self.__flush = flush
+        self.__events: list[RopeEvent] = []
+        self.__phases: dict[str, float] = {}
+        self.__phase: str = None
+        self.__phase_since = time.perf_counter()
+        self.__final_length: int = None
+
+    def enter(self, state: STATES):
+        """
+        Start the phase of `state`, time of the previous phase is added to the current rope
+        """
+        if state == STATES.summary:
+            phase = None
+        else:
+            phase = self.PHASES.get(state, "halted")
+        if phase != self.__phase:
+            self.__close_phase()
+            self.__phase = phase
+
+    def measurement_paused(self, length: int):
+        """
+        Store the length measured when the measurement is paused after the cut of the rope
+        """
+        if self.__final_length is None:
+            self.__final_length = length
+
+    def rope_finished(self, sequence: int, trigger_length: int):
+        """
+        Close the record of the rope number `sequence` (counted from 1)
+        """
+        self.__close_phase()
+        self.__events.append(RopeEvent(
+            self.__order_id, sequence, self.__diameter, trigger_length, self.__final_length,
+            self.__phases, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        self.__phases = {}
+        self.__final_length = None
+        if len(self.__events) >= self.BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.__events:
+            events, self.__events = self.__events, []
+            self.__flush(events)
+
+    def finish(self):
+        """
+        Pass the remaining events to `flush`, called when the order ends
+        """
+        self.__close_phase()
+        self.__phase = None
+        self.flush()
+
+    def __close_phase(self):
+        now = time.perf_counter()
+        if self.__phase is not None:
+            self.__phases[self.__phase] = self.__phases.get(
+                self.__phase, 0.0) + now - self.__phase_since
+        self.__phase_since = now
@@ -0,0 +1,282 @@
+import heapq
+import random
+
+from winding_in_progress_operations.states import STATES
+from winding_in_progress_operations.state_machine import WindingEngine, WindingContext, Trigger, Effect
+
+
+class SimulationTimings:
+    """
+    Durations of the simulated machine and operator [s]
+    """
+
+    def __init__(
+            self,
+            winding_speed: float = 1500.0,
+            motor_start: float = 0.3,
+            guillotine_up: float = 1.0,
+            guillotine_down: float = 1.0,
+            reset_position: float = 3.0,
+            confirm_new_line: float = 2.0,
+            operator_reaction: float = 1.5,
+            start_length: int = 1000
+    ):
+        # Winding speed [mm/s]
+        self.winding_speed = winding_speed
+        self.motor_start = motor_start
+        self.guillotine_up = guillotine_up
+        self.guillotine_down = guillotine_down
+        self.reset_position = reset_position
+        self.confirm_new_line = confirm_new_line
+        self.operator_reaction = operator_reaction
+        # `START_LENGHT` [mm]
+        self.start_length = start_length
+
+
+class SimulationFaults:
+    """
+    Probabilities of machine faults and operator interventions, per machine action or per state
+    """
+
+    def __init__(
+            self,
+            winder_fail: float = 0.0,
+            cut_fail: float = 0.0,
+            reset_fail: float = 0.0,
+            monitor_error: float = 0.0,
+            pause: float = 0.0,
+            cancel: float = 0.0,
+            early_release: float = 0.0,
+            rope_pull: float = 0.0
+    ):
+        self.winder_fail = winder_fail
+        self.cut_fail = cut_fail
+        self.reset_fail = reset_fail
+        self.monitor_error = monitor_error
+        # Operator pauses and continues in `winding`, `cut_rope`, `reset_position`
+        self.pause = pause
+        # Operator presses the cancel button (and confirms or withdraws it with equal chance)
+        self.cancel = cancel
+        # Operator releases the button before the next rope is confirmed
+        self.early_release = early_release
+        # Rope pulled by hand while the winder is stopped
+        self.rope_pull = rope_pull
+
+
+class SimulationResult:
+    """
+    Result of one simulated order
+    """
+
+    def __init__(self, completed: bool, quantity: int, time: float, transitions: int, dispatched: int, stuck_state: STATES = None):
+        # `True` if accepted, `False` if rejected, `None` if stuck
+        self.completed = completed
+        self.quantity = quantity
+        # Simulated time of the order [s]
+        self.time = time
+        self.transitions = transitions
+        self.dispatched = dispatched
+        # State in which the simulation stopped without any pending event
+        self.stuck_state = stuck_state
+
+
+class SimulatedMachine:
+    """
+    SimulatedMachine
+    ---
+
+    Machine, monitor and operator simulated with a virtual clock, which drive `WindingEngine` as fast as possible.
+    Effects of the engine schedule triggers (e.g. `cut_rope` schedules `cut_done` after the guillotine times),
+    the operator reacts to the rendered state after `operator_reaction`. Triggers scheduled for a state
+    which was left in the meantime are dropped, as the operator reacts only to the current screen.
+
+    An order is stuck if there is no pending event and the dialog was neither accepted nor rejected.
+    """
+    # Limit of dispatched triggers per order, protects against loops
+    MAX_EVENTS = 100_000
+
+    def __init__(self, timings: SimulationTimings = None, faults: SimulationFaults = None, seed: int = 0):
+        self.timings = timings or SimulationTimings()
+        self.faults = faults or SimulationFaults()
+        self.__random = random.Random(seed)
+
+    def run_order(self, length_target: int, quantity_target: int, stop_offset: int = 50,
+                  print_labels: bool = False, print_every_other: bool = False) -> SimulationResult:
+        self.__now = 0.0
+        self.__events = []
+        self.__sequence = 0
+        self.__result: bool = None
+        self.__transitions = 0
+        self.__dispatched = 0
+        # Number of the rendered screen, events of the operator are valid only for one screen
+        self.__screen = 0
+        # Number of the machine run, stopping the winder invalidates scheduled lengths
+        self.__motion = 0
+        self.__wound = 0.0
+        self.__winding_since: float = None
+
+        context = WindingContext(length_target, quantity_target, stop_offset,
+                                 print_labels, print_every_other)
+        self.__engine = WindingEngine(context, self.__on_effect, verbose=False)
+        self.__effects = {
+            Effect.render: self.__render,
+            Effect.message: self.__message,
+            Effect.start_winder: self.__start_winder,
+            Effect.stop_winder: self.__stop_winder,
+            Effect.stop_winder_now: self.__stop_winder,
+            Effect.cut_rope: self.__cut_rope,
+            Effect.cancel_cut: self.__cancel_cut,
+            Effect.reset_position: self.__reset_position,
+            Effect.begin_measurement: self.__begin_measurement,
+            Effect.start_confirmation: self.__start_confirmation,
+            Effect.cancel_confirmation: lambda: self.__schedule(
+                0.0, Trigger.confirmation_failed),
+            Effect.accept: lambda: self.__finish(True),
+            Effect.reject: lambda: self.__finish(False),
+        }
+        self.__engine.start()
+
+        while self.__result is None and self.__events and self.__dispatched < self.MAX_EVENTS:
+            self.__now, _, screen, motion, trigger, args = heapq.heappop(
+                self.__events)
+            if screen is not None and screen != self.__screen:
+                continue
+            if motion is not None and motion != self.__motion:
+                continue
+            self.__dispatched += 1
+            self.__engine.dispatch(trigger, *args)
+
+        stuck_state = self.__engine.state if self.__result is None else None
+        return SimulationResult(self.__result, context.quantity, self.__now,
+                                self.__transitions, self.__dispatched, stuck_state)
+
+    # Scheduling
+
+    def __schedule(self, delay: float, trigger: Trigger, *args, screen: int = None, motion: int = None):
+        self.__sequence += 1
+        heapq.heappush(self.__events, (self.__now + delay, self.__sequence,
+                                       screen, motion, trigger, args))
+
+    def __operator(self, delay: float, trigger: Trigger, *args):
+        # Operator reacts to the current screen only
+        self.__schedule(delay, trigger, *args, screen=self.__screen)
+
+    def __chance(self, probability: float) -> bool:
+        return probability > 0 and self.__random.random() < probability
+
+    # Effects
+
+    def __on_effect(self, effect: Effect, *args):
+        handler = self.__effects.get(effect)
+        if handler is not None:
+            handler(*args)
+
+    def __finish(self, completed: bool):
+        self.__result = completed
+
+    def __render(self):
+        self.__transitions += 1
+        self.__screen += 1
+        engine, ctx, reaction = self.__engine, self.__engine.context, self.timings.operator_reaction
+        state = engine.state
+        if ctx.buttons_blocked:
+            # Operator pulls the rope back below the target
+            self.__operator(reaction, Trigger.length, 0)
+            return
+        if ctx.cut_pending:
+            # Buttons are disabled until the guillotine is restored
+            return
+
+        if self.__chance(self.faults.cancel) and state not in (STATES.cancel, STATES.summary):
+            self.__operator(self.__random.uniform(0, reaction),
+                            Trigger.second_clicked)
+            return
+
+        if state == STATES.next_run_confirmation:
+            self.__operator(reaction, Trigger.first_pressed)
+            if self.__chance(self.faults.rope_pull):
+                self.__schedule(reaction / 2, Trigger.length,
+                                ctx.length_target, screen=self.__screen)
+        elif state in (STATES.winding, STATES.cut_rope, STATES.reset_position):
+            if self.__chance(self.faults.pause):
+                self.__operator(self.__random.uniform(0, reaction),
+                                Trigger.first_clicked)
+        elif state == STATES.paused:
+            self.__operator(reaction, Trigger.first_clicked)
+        elif state == STATES.cancel:
+            # Confirm the cancel or withdraw it
+            confirm = self.__random.random() < 0.5
+            self.__operator(reaction, Trigger.first_clicked if confirm
+                            else Trigger.second_clicked)
+        elif state in (STATES.winding_fail, STATES.cut_rope_fail, STATES.reset_position_fail):
+            self.__operator(reaction, Trigger.first_clicked)
+        elif state == STATES.summary:
+            self.__operator(reaction, Trigger.second_clicked)
+
+    def __message(self, text: str, color: str):
+        # Next rope confirmed, the operator releases the button
+        self.__operator(0.1, Trigger.first_clicked)
+
+    def __start_confirmation(self):
+        confirm = self.timings.confirm_new_line
+        if self.__chance(self.faults.early_release):
+            # Released too early, pressed again after the failure
+            self.__operator(self.__random.uniform(0, confirm),
+                            Trigger.first_clicked)
+            self.__operator(confirm + self.timings.operator_reaction,
+                            Trigger.first_pressed)
+        else:
+            self.__operator(confirm, Trigger.confirmation_done)
+
+    def __begin_measurement(self):
+        self.__wound = float(self.timings.start_length)
+
+    def __start_winder(self):
+        timings = self.timings
+        if self.__chance(self.faults.winder_fail):
+            self.__schedule(timings.motor_start, Trigger.winder_failed,
+                            "Awaria silnika", "Symulacja")
+            return
+        self.__motion += 1
+        self.__winding_since = self.__now + timings.motor_start
+        self.__schedule(timings.motor_start,
+                        Trigger.winder_started, motion=self.__motion)
+        ctx = self.__engine.context
+        remaining = max(ctx.length_target - ctx.stop_offset -
+                        self.__wound, 0.0) + 1
+        duration = timings.motor_start + remaining / timings.winding_speed
+        if self.__chance(self.faults.monitor_error):
+            self.__schedule(self.__random.uniform(timings.motor_start, duration), Trigger.monitor_error,
+                            "Brak ciśnienia", "Symulacja", motion=self.__motion)
+        self.__schedule(duration, Trigger.length, int(self.__wound + remaining),
+                        motion=self.__motion)
+
+    def __stop_winder(self):
+        if self.__winding_since is not None and self.__now > self.__winding_since:
+            self.__wound += (self.__now - self.__winding_since) * \
+                self.timings.winding_speed
+        self.__winding_since = None
+        self.__motion += 1
+
+    def __cut_rope(self):
+        timings = self.timings
+        duration = timings.guillotine_up + timings.guillotine_down
+        self.__motion += 1
+        if self.__chance(self.faults.cut_fail):
+            self.__schedule(duration, Trigger.cut_failed, "Awaria gilotyny", "Symulacja",
+                            motion=self.__motion)
+        else:
+            self.__schedule(duration, Trigger.cut_done, motion=self.__motion)
+
+    def __cancel_cut(self):
+        self.__motion += 1
+        self.__schedule(self.timings.guillotine_up, Trigger.cut_cancelled)
+
+    def __reset_position(self):
+        self.__motion += 1
+        if self.__chance(self.faults.reset_fail):
+            self.__schedule(self.timings.reset_position, Trigger.reset_failed,
+                            "Awaria czujnika", "Symulacja", motion=self.__motion)
+        else:
+            self.__schedule(self.timings.reset_position,
+                            Trigger.reset_done, motion=self.__motion)
@@ -0,0 +1,500 @@
+from enum import Enum, auto
+from loguru import logger
+
+from winding_in_progress_operations.states import STATES
+
+
+class Trigger(Enum):
+    """
+    Inputs of the `WindingEngine`:
+    - operator: `first_pressed`, `first_clicked`, `second_clicked`,
+    - monitor: `length` (current length [mm]), `monitor_error` (title, description),
+    - machine workers: `winder_started`, `winder_failed`, `cut_done`, `cut_failed`, `cut_cancelled`,
+      `reset_done`, `reset_failed` (failures with title and description),
+    - next rope confirmation: `confirmation_done`, `confirmation_failed`.
+    """
+    first_pressed = auto()
+    first_clicked = auto()
+    second_clicked = auto()
+    length = auto()
+    monitor_error = auto()
+    winder_started = auto()
+    winder_failed = auto()
+    cut_done = auto()
+    cut_failed = auto()
+    cut_cancelled = auto()
+    reset_done = auto()
+    reset_failed = auto()
+    confirmation_done = auto()
+    confirmation_failed = auto()
+
+
+class Effect(Enum):
+    """
+    Events emitted by the `WindingEngine`, executed by the host (dialog or simulation):
+    - view: `render` (state), `message` (text, color), `progress` (current, target), `alert` (title, description),
+    - machine: `start_winder`, `stop_winder`, `stop_winder_now`, `cut_rope`, `cancel_cut`, `reset_position`,
+      `guillotine_circuit` (active), `release_guillotine_circuit`,
+    - monitor and measurement: `error_checks` (enabled), `resume_error_checks`, `emit_length` (enabled),
+      `begin_measurement`, `pause_measurement`,
+    - next rope confirmation: `start_confirmation`, `cancel_confirmation`,
+    - runtime: `runtime_run`, `runtime_pause`, `finish` (stop monitor, store and reset the runtime),
+    - other: `buzzer` (signal name), `print_label`, `rope_finished` (number of the rope, trigger length),
+      `accept`, `reject`.
+    """
+    render = auto()
+    message = auto()
+    progress = auto()
+    alert = auto()
+    start_winder = auto()
+    stop_winder = auto()
+    stop_winder_now = auto()
+    cut_rope = auto()
+    cancel_cut = auto()
+    reset_position = auto()
+    guillotine_circuit = auto()
+    release_guillotine_circuit = auto()
+    error_checks = auto()
+    resume_error_checks = auto()
+    emit_length = auto()
+    begin_measurement = auto()
+    pause_measurement = auto()
+    start_confirmation = auto()
+    cancel_confirmation = auto()
+    runtime_run = auto()
+    runtime_pause = auto()
+    finish = auto()
+    buzzer = auto()
+    print_label = auto()
+    rope_finished = auto()
+    accept = auto()
+    reject = auto()
+
+
+class WindingContext:
+    """
+    Data of the winding process shared by guards and updates of the transition table
+    """
+
+    def __init__(
+            self,
+            length_target: int,
+            quantity_target: int,
+            stop_offset: int,
+            print_labels: bool = False,
+            print_every_other: bool = False
+    ):
+        self.length_target = length_target
+        self.quantity_target = quantity_target
+        self.stop_offset = stop_offset
+        self.print_labels = print_labels
+        self.print_every_other = print_every_other
+        # Number of finished ropes
+        self.quantity = 0
+        # State paused or canceled, set back after continuing
+        self.paused_state: STATES = None
+        # Prevents length condition multiple activation
+        self.rope_length_accepted = False
+        # Length at which the winder was stopped for the current rope
+        self.trigger_length: int = None
+        # Buttons blocked in case of unexpected rope pulling
+        self.buttons_blocked = False
+        # Guillotine is being restored after the cut was stopped, buttons are disabled
+        self.cut_pending = False
+        self.confirmation_started = False
+        self.next_rope_confirmed = False
+        # `True` if all ropes were made, `False` if canceled, `None` before summary
+        self.completed: bool = None
+
+
+class Rule:
+    """
+    Row of the transition table. The first rule with passing `guard` is used.
+
+    - `target` - next state, `None` keeps the state (without entry actions), `RESUME` sets the paused state back,
+    - `guard` - `guard(context, *args)` returns `True` if the rule applies,
+    - `update` - `update(context, *args)` changes the context before effects,
+    - `effects` - effects emitted before entry effects of the target; items are `Effect`, `(Effect, *args)`
+      or functions `fcn(context, *args)` which return a list of those items.
+    """
+    __slots__ = ("target", "guard", "update", "effects")
+
+    def __init__(self, target: STATES = None, guard=None, update=None, effects=()):
+        self.target = target
+        self.guard = guard
+        self.update = update
+        self.effects = effects
+
+
+# Target which sets back the state which was paused or canceled
+RESUME = "RESUME"
+# Rules of triggers which may come in any state
+ANY = "ANY"
+
+# States in which the machine is stopped and waits for the operator, workers may still finish there
+HALTED = (STATES.paused, STATES.cancel)
+# Operator triggers, ignored while buttons are blocked or disabled
+BUTTONS = (Trigger.first_pressed, Trigger.first_clicked, Trigger.second_clicked)
+
+
+def _length_over_target(ctx: WindingContext, length: int) -> bool:
+    return length > ctx.length_target - ctx.stop_offset \
+        and not ctx.rope_length_accepted and not ctx.buttons_blocked
+
+
+def _after_reset(ctx: WindingContext) -> STATES:
+    """
+    Count the finished rope and return the state which goes after `reset_position`
+    """
+    ctx.quantity += 1
+    if ctx.quantity >= ctx.quantity_target:
+        ctx.completed = True
+        return STATES.summary
+    return STATES.next_run_confirmation
+
+
+def _reset_effects(ctx: WindingContext) -> list:
+    effects = [(Effect.buzzer, "end"),
+               (Effect.progress, ctx.quantity, ctx.quantity_target),
+               (Effect.rope_finished, ctx.quantity, ctx.trigger_length)]
+    if ctx.paused_state != STATES.summary and ctx.quantity < ctx.quantity_target \
+            and ctx.print_labels and ctx.print_every_other and ctx.quantity % 2 == 0:
+        effects.append(Effect.print_label)
+    return effects
+
+
+def _set(**values):
+    """
+    Returns update which sets context attributes
+    """
+    def update(ctx: WindingContext, *args):
+        for name, value in values.items():
+            setattr(ctx, name, value)
+    return update
+
+
+def _halt(state: STATES):
+    """
+    Returns update which replaces the paused state with `state` (worker finished while the machine was halted)
+    """
+    def update(ctx: WindingContext, *args):
+        ctx.cut_pending = False
+        ctx.paused_state = state
+    return update
+
+
+def _accept_length(ctx: WindingContext, length: int):
+    ctx.rope_length_accepted = True
+    ctx.trigger_length = length
+
+
+def _alert(ctx: WindingContext, title: str, description: str) -> list:
+    return [(Effect.alert, title, description)]
+
+
+def _halted_reset_done(ctx: WindingContext, *args):
+    ctx.paused_state = _after_reset(ctx)
+
+
+def _confirm_cancel(ctx: WindingContext):
+    ctx.paused_state = None
+    # Summary after a cancel always rejects the dialog (order interrupted), even after the last rope
+    ctx.completed = False
+
+
+def _rope_pulled(ctx: WindingContext, *args) -> list:
+    return [Effect.render, (Effect.alert, "Lina przeciągnięta bez udziału silnika",
+                            "Cofnij linę na poniżej docelowej długości z zapasem")]
+
+
+def _finish_effects(ctx: WindingContext) -> list:
+    effects = [Effect.finish, Effect.pause_measurement,
+               (Effect.guillotine_circuit, True)]
+    if ctx.print_labels and ctx.quantity > 0 \
+            and (ctx.completed or ctx.quantity % 2 != 0):
+        effects.append(Effect.print_label)
+    return effects
+
+
+# Transition table `(state, trigger): [Rule, ...]`. Rules of `(ANY, trigger)` are checked after rules of the state.
+TRANSITIONS: dict[tuple, list[Rule]] = {
+    # next_run_confirmation - the operator holds the first button for `CONFIRM_NEW_LINE_TIME` and releases it
+    (STATES.next_run_confirmation, Trigger.first_pressed): [
+        Rule(guard=lambda ctx: not ctx.confirmation_started,
+             update=_set(confirmation_started=True),
+             effects=[Effect.start_confirmation]),
+    ],
+    (STATES.next_run_confirmation, Trigger.first_clicked): [
+        Rule(STATES.winding,
+             guard=lambda ctx: ctx.next_rope_confirmed,
+             update=_set(rope_length_accepted=False, trigger_length=None,
+                         next_rope_confirmed=False, confirmation_started=False),
+             effects=[Effect.begin_measurement, (Effect.emit_length, True), (Effect.buzzer, "start")]),
+        Rule(guard=lambda ctx: ctx.confirmation_started,
+             effects=[Effect.cancel_confirmation]),
+    ],
+    (STATES.next_run_confirmation, Trigger.confirmation_done): [
+        Rule(update=_set(next_rope_confirmed=True),
+             effects=[(Effect.message, "Puść przycisk aby rozpocząć nawijanie", "yellow")]),
+    ],
+    (STATES.next_run_confirmation, Trigger.confirmation_failed): [
+        Rule(update=_set(confirmation_started=False)),
+    ],
+    (STATES.next_run_confirmation, Trigger.second_clicked): [Rule(STATES.cancel)],
+
+    # winding
+    (STATES.winding, Trigger.first_clicked): [Rule(STATES.paused)],
+    (STATES.winding, Trigger.second_clicked): [Rule(STATES.cancel)],
+    (STATES.winding, Trigger.length): [
+        Rule(STATES.cut_rope,
+             guard=_length_over_target,
+             update=_accept_length,
+             effects=[(Effect.error_checks, False), Effect.stop_winder_now]),
+    ],
+    (STATES.winding, Trigger.winder_failed): [
+        Rule(STATES.winding_fail, effects=[_alert]),
+    ],
+    (STATES.winding_fail, Trigger.first_clicked): [Rule(STATES.winding)],
+    (STATES.winding_fail, Trigger.second_clicked): [Rule(STATES.cancel)],
+
+    # cut_rope
+    (STATES.cut_rope, Trigger.first_clicked): [Rule(STATES.paused)],
+    (STATES.cut_rope, Trigger.second_clicked): [Rule(STATES.cancel)],
+    (STATES.cut_rope, Trigger.cut_done): [
+        Rule(STATES.reset_position,
+             effects=[Effect.pause_measurement, (Effect.emit_length, False)]),
+    ],
+    (STATES.cut_rope, Trigger.cut_failed): [
+        Rule(STATES.cut_rope_fail, effects=[_alert]),
+    ],
+    (STATES.cut_rope_fail, Trigger.first_clicked): [Rule(STATES.cut_rope)],
+    (STATES.cut_rope_fail, Trigger.second_clicked): [Rule(STATES.cancel)],
+
+    # reset_position
+    (STATES.reset_position, Trigger.first_clicked): [Rule(STATES.paused)],
+    (STATES.reset_position, Trigger.second_clicked): [Rule(STATES.cancel)],
+    (STATES.reset_position, Trigger.reset_done): [
+        Rule(STATES.summary,
+             guard=lambda ctx: ctx.quantity + 1 >= ctx.quantity_target,
+             update=lambda ctx: _after_reset(ctx),
+             effects=[_reset_effects]),
+        Rule(STATES.next_run_confirmation,
+             update=lambda ctx: _after_reset(ctx),
+             effects=[_reset_effects]),
+    ],
+    (STATES.reset_position, Trigger.reset_failed): [
+        Rule(STATES.reset_position_fail, effects=[_alert]),
+    ],
+    (STATES.reset_position_fail, Trigger.first_clicked): [Rule(STATES.reset_position)],
+    (STATES.reset_position_fail, Trigger.second_clicked): [Rule(STATES.cancel)],
+
+    # paused
+    (STATES.paused, Trigger.first_clicked): [
+        Rule(RESUME, effects=[Effect.resume_error_checks, Effect.runtime_run]),
+    ],
+    (STATES.paused, Trigger.second_clicked): [Rule(STATES.cancel)],
+
+    # cancel - first button confirms, second goes back to pause
+    (STATES.cancel, Trigger.first_clicked): [
+        Rule(STATES.summary, update=_confirm_cancel),
+    ],
+    (STATES.cancel, Trigger.second_clicked): [Rule(STATES.paused)],
+
+    # Winder started just before the pause, errors are not checked while halted
+    (STATES.paused, Trigger.winder_started): [
+        Rule(effects=[Effect.release_guillotine_circuit]),
+    ],
+    (STATES.cancel, Trigger.winder_started): [
+        Rule(effects=[Effect.release_guillotine_circuit]),
+    ],
+
+    # summary
+    (STATES.summary, Trigger.second_clicked): [
+        Rule(guard=lambda ctx: ctx.completed, effects=[Effect.accept]),
+        Rule(effects=[Effect.reject]),
+    ],
+    (STATES.summary, Trigger.monitor_error): [Rule()],
+
+    # Triggers which may come in any state
+    (ANY, Trigger.length): [
+        # Rope pulled while the winder is not winding
+        Rule(guard=_length_over_target,
+             update=_set(buttons_blocked=True),
+             effects=[(Effect.error_checks, False), Effect.stop_winder_now, _rope_pulled]),
+        Rule(guard=lambda ctx, length: ctx.buttons_blocked and length < ctx.length_target - 500,
+             update=_set(buttons_blocked=False),
+             effects=[Effect.render]),
+    ],
+    (ANY, Trigger.monitor_error): [
+        Rule(STATES.paused,
+             guard=lambda ctx, *args: ctx.paused_state is None,
+             effects=[_alert]),
+        Rule(effects=[_alert]),
+    ],
+    (ANY, Trigger.winder_started): [
+        Rule(effects=[(Effect.error_checks, True),
+                      Effect.release_guillotine_circuit]),
+    ],
+    # Workers which finish while the machine is halted change the state set back after continuing
+    (ANY, Trigger.winder_failed): [
+        Rule(guard=lambda ctx, *args: ctx.paused_state == STATES.winding,
+             update=_halt(STATES.winding_fail), effects=[Effect.render, _alert]),
+    ],
+    (ANY, Trigger.cut_done): [
+        Rule(guard=lambda ctx: ctx.paused_state == STATES.cut_rope,
+             update=_halt(STATES.reset_position),
+             effects=[Effect.pause_measurement, (Effect.emit_length, False), Effect.render]),
+    ],
+    (ANY, Trigger.cut_failed): [
+        Rule(guard=lambda ctx, *args: ctx.paused_state == STATES.cut_rope,
+             update=_halt(STATES.cut_rope_fail), effects=[Effect.render, _alert]),
+    ],
+    (ANY, Trigger.cut_cancelled): [
+        Rule(update=_set(cut_pending=False), effects=[Effect.render]),
+    ],
+    (ANY, Trigger.reset_done): [
+        Rule(guard=lambda ctx: ctx.paused_state == STATES.reset_position,
+             update=_halted_reset_done, effects=[_reset_effects]),
+    ],
+    (ANY, Trigger.reset_failed): [
+        Rule(guard=lambda ctx, *args: ctx.paused_state == STATES.reset_position,
+             update=_halt(STATES.reset_position_fail), effects=[Effect.render, _alert]),
+    ],
+}
+
+
+def _enter_paused(ctx: WindingContext, previous: STATES) -> list:
+    effects = [(Effect.error_checks, False)]
+    if previous in (STATES.winding, STATES.reset_position):
+        effects += [Effect.runtime_pause, Effect.stop_winder]
+    elif previous == STATES.cut_rope:
+        ctx.cut_pending = True
+        effects += [Effect.runtime_pause, Effect.cancel_cut]
+    return effects + [Effect.render]
+
+
+def _enter_cancel(ctx: WindingContext, previous: STATES) -> list:
+    effects = []
+    if previous in (STATES.winding, STATES.reset_position):
+        effects += [(Effect.error_checks, False),
+                    Effect.runtime_pause, Effect.stop_winder]
+    elif previous in (STATES.reset_position_fail, STATES.next_run_confirmation):
+        effects += [Effect.runtime_pause]
+    elif previous == STATES.cut_rope:
+        ctx.cut_pending = True
+        effects += [Effect.runtime_pause, Effect.cancel_cut]
+    return effects + [Effect.render]
+
+
+# Entry effects of states `state: fcn(context, previous state)`
+ON_ENTER = {
+    STATES.next_run_confirmation: lambda ctx, previous: [
+        Effect.render, (Effect.guillotine_circuit, True)],
+    STATES.winding: lambda ctx, previous: [Effect.render, Effect.start_winder],
+    STATES.winding_fail: lambda ctx, previous: [Effect.render],
+    STATES.cut_rope: lambda ctx, previous: [
+        Effect.render, (Effect.buzzer, "stop"), Effect.cut_rope],
+    STATES.cut_rope_fail: lambda ctx, previous: [Effect.render],
+    STATES.reset_position: lambda ctx, previous: [Effect.render, Effect.reset_position],
+    STATES.reset_position_fail: lambda ctx, previous: [Effect.render],
+    STATES.paused: _enter_paused,
+    STATES.cancel: _enter_cancel,
+    STATES.summary: lambda ctx, previous: _finish_effects(ctx) + [Effect.render],
+}
+
+
+class WindingEngine:
+    """
+    WindingEngine
+    ---
+
+    Table driven state machine of the winding process, without Qt and hardware.
+    Triggers are passed to `dispatch`, the state and the context are changed according to `TRANSITIONS`
+    and effects are emitted to `listener(effect, *args)`, which executes them (dialog, simulation).
+
+    The state is changed before effects are emitted, so triggers dispatched by the listener
+    (e.g. while a modal alert is open) see the new state. Alerts are always the last effects of a transition.
+
+    Parameters
+    ---
+
+    :context: `WindingContext` of the order
+    :listener: function `listener(effect: Effect, *args)`
+    :verbose: write state changes to the log
+    """
+
+    def __init__(self, context: WindingContext, listener, verbose: bool = True):
+        self.context = context
+        self.state: STATES = None
+        self.previous_state: STATES = None
+        self.__listener = listener
+        self.__verbose = verbose
+
+    def start(self):
+        """
+        Start the process, the first rope waits for the operator's confirmation
+        """
+        self.__emit([(Effect.runtime_run,)] +
+                    self.__change_state(STATES.next_run_confirmation))
+
+    def dispatch(self, trigger: Trigger, *args) -> bool:
+        """
+        Handle the trigger. Returns `False` if the trigger does not apply to the current state.
+        """
+        ctx = self.context
+        if trigger in BUTTONS and (ctx.buttons_blocked or ctx.cut_pending):
+            return False
+
+        rule = self.__find_rule(self.state, trigger, args) \
+            or self.__find_rule(ANY, trigger, args)
+        if rule is None:
+            return False
+
+        if rule.update is not None:
+            rule.update(ctx, *args)
+        effects = self.__expand(rule.effects, args)
+
+        target = rule.target
+        if target == RESUME:
+            target, ctx.paused_state = ctx.paused_state, None
+        if target is not None and target != self.state:
+            effects += self.__change_state(target)
+
+        # Alerts go last, they may open a modal dialog
+        effects.sort(key=lambda effect: effect[0] == Effect.alert)
+        self.__emit(effects)
+        return True
+
+    def __find_rule(self, state, trigger: Trigger, args: tuple) -> Rule:
+        for rule in TRANSITIONS.get((state, trigger), ()):
+            if rule.guard is None or rule.guard(self.context, *args):
+                return rule
+        return None
+
+    def __change_state(self, target: STATES) -> list:
+        ctx = self.context
+        previous = self.state
+        if target in HALTED and ctx.paused_state is None:
+            ctx.paused_state = previous
+        self.previous_state, self.state = previous, target
+        if self.__verbose:
+            logger.info(f"STATE change: {previous} ---> {target}")
+        return self.__expand([ON_ENTER[target]], (previous,))
+
+    def __expand(self, items, args: tuple) -> list[tuple]:
+        """
+        Returns effects as tuples `(Effect, *args)`
+        """
+        effects = []
+        for item in items:
+            if isinstance(item, Effect):
+                effects.append((item,))
+            elif isinstance(item, tuple):
+                effects.append(item)
+            else:
+                effects += self.__expand(item(self.context, *args), ())
+        return effects
+
+    def __emit(self, effects: list[tuple]):
+        for effect, *args in effects:
+            self.__listener(effect, *args)